@@ -0,0 +1,64 @@
+"""Metric history rollup throughput, range-query latency and per-vehicle footprint
+
+Usage: python benchmarks/bench_history.py [--vehicles 1000] [--samples 2000000] [--days 3] [--mmap DIR]
+"""
+
+import argparse
+import shutil
+import tempfile
+
+import numpy as np
+
+from common import report, timed
+from nexaserve.config import HISTORY_TIERS, TELEMETRY_BATCH_FRAMES
+from nexaserve.history import MetricHistoryStore
+from nexaserve.telemetry import TELEMETRY_SIGNALS
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--vehicles", type=int, default=1000)
+    parser.add_argument("--samples", type=int, default=2000000)
+    parser.add_argument("--days", type=float, default=3)
+    parser.add_argument("--mmap", action="store_true", help="back the rollups with memory-mapped files in a temp dir")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    keys = rng.integers(0, 2 ** 32, args.vehicles, dtype=np.uint32)
+    vehicles = keys[rng.integers(0, args.vehicles, args.samples)]
+    signals = rng.integers(0, len(TELEMETRY_SIGNALS), args.samples).astype(np.uint16)
+    ts = 1.7e9 + np.sort(rng.random(args.samples)) * args.days * 86400
+    values = (rng.random(args.samples) * 100).astype(np.float32)
+
+    directory = tempfile.mkdtemp() if args.mmap else None
+    try:
+        history = MetricHistoryStore(TELEMETRY_SIGNALS, directory)
+        batch = TELEMETRY_BATCH_FRAMES
+
+        def record_all():
+            for start in range(0, args.samples, batch):
+                end = start + batch
+                history.record(vehicles[start:end], signals[start:end], ts[start:end], values[start:end])
+
+        _, elapsed = timed(record_all)
+        report(f"record into {len(HISTORY_TIERS)} tiers", args.samples, elapsed, "samples")
+
+        queries = 2000
+        picks = rng.integers(0, args.vehicles, queries)
+        for tier in HISTORY_TIERS:
+            def query_all():
+                points = 0
+                for pick in picks:
+                    points += len(history.query(int(keys[pick]), 'engine.health', tier)['ts'])
+                return points
+
+            points, elapsed = timed(query_all)
+            report(f"query {tier} series ({points // queries} points each)", queries, elapsed, "queries")
+
+        print(f"history footprint {history.bytes_per_vehicle() / 1024:,.0f} KiB per vehicle, independent of sample count")
+    finally:
+        if directory:
+            shutil.rmtree(directory)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Cold-start import cost of the app, measured with python -X importtime
+
+Usage: python benchmarks/bench_import.py [--runs 5] [--budget-ms 400] [--top 10]
+
+Each run imports streamlit and then the app shell plus the landing chat page in a fresh
+interpreter, as the first script run of a new server process does. The app's cost is what it
+adds on top of streamlit. Exits non-zero when that cost is over budget or when any heavy library
+that only a secondary page needs is imported at cold start, or by a page that neither charts nor
+tabulates. Secondary pages are timed for reference.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+from common import REPO_ROOT
+
+COLD_START_MODULES = ["nexaserve.ui", "nexaserve.ui.chat"]
+PAGE_MODULES = [
+    "nexaserve.ui.dashboards", "nexaserve.ui.service_history", "nexaserve.ui.booking", "nexaserve.ui.ar", "nexaserve.ui.about"
+]
+
+# Only the pages that chart, tabulate, decode images or call the API may load these.
+# streamlit itself imports the lazy plotly.graph_objects shim, so the figure classes are checked instead
+LAZY_MODULES = ["pandas", "plotly.express", "plotly.graph_objs._figure", "PIL.Image", "openai", "httpx"]
+
+# Pages that render only widgets and HTML; they may not load any of LAZY_MODULES either
+PLAIN_PAGE_MODULES = ["nexaserve.ui.service_history", "nexaserve.ui.ar"]
+
+COLD_START_BUDGET_MS = 400
+
+def import_times(modules):
+    """Imports in a fresh interpreter after streamlit: [(depth, name, self_us, cumulative_us)]"""
+    code = "import streamlit; " + "; ".join(f"import {module}" for module in modules)
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [str(REPO_ROOT), os.environ.get("PYTHONPATH")])))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=REPO_ROOT, env=env, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        rows.append((depth, name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+def app_imports(rows):
+    """Every import after streamlit's (importtime lists children before their parent)"""
+    start = next(i for i, (depth, name, _, _) in enumerate(rows) if depth == 0 and name == "streamlit") + 1
+    return rows[start:]
+
+def cost_ms(modules, runs):
+    """Fastest of several runs of the app's own import time, with that run's rows"""
+    best = None
+    for _ in range(runs):
+        rows = import_times(modules)
+        total = sum(cumulative for depth, _, _, cumulative in app_imports(rows) if depth == 0) / 1000
+        if best is None or total < best[0]:
+            best = (total, rows)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=COLD_START_BUDGET_MS)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    total, rows = cost_ms(COLD_START_MODULES, args.runs)
+    print(f"cold start ({', '.join(COLD_START_MODULES)}): {total:.1f} ms on top of streamlit, best of {args.runs}")
+    for _, name, _, cumulative in sorted(app_imports(rows), key=lambda row: -row[3])[:args.top]:
+        print(f"  {cumulative / 1000:>8.1f} ms cumulative  {name}")
+
+    imported = {name for _, name, _, _ in app_imports(rows)}
+    eager = [module for module in LAZY_MODULES if module in imported]
+
+    failures = []
+    if eager:
+        failures.append(f"imported at cold start: {', '.join(eager)}")
+
+    for module in PAGE_MODULES:
+        _, page_rows = cost_ms(COLD_START_MODULES + [module], args.runs)
+        page = next(cumulative for depth, name, _, cumulative in page_rows if depth == 0 and name == module)
+        print(f"first visit to {module:<32} +{page / 1000:>7.1f} ms")
+        if module in PLAIN_PAGE_MODULES:
+            loaded = {name for _, name, _, _ in app_imports(page_rows)}
+            heavy = [lazy for lazy in LAZY_MODULES if lazy in loaded]
+            if heavy:
+                failures.append(f"{module} imported {', '.join(heavy)}")
+    if total > args.budget_ms:
+        failures.append(f"cold start {total:.1f} ms is over the {args.budget_ms:.0f} ms budget")
+    for failure in failures:
+        print(f"REGRESSION: {failure}")
+    if failures:
+        sys.exit(1)
+    print(f"within the {args.budget_ms:.0f} ms budget, no lazy library loaded at cold start")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Append and verify throughput of the hash-chained service ledger
+
+Usage: python benchmarks/bench_ledger.py [--records 1000000] [--vehicles 1000]
+"""
+
+import argparse
+import os
+import tempfile
+
+from common import report, timed
+from nexaserve.config import LEDGER_CHECKPOINT_INTERVAL
+from nexaserve.ledger import ServiceLedger
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--records", type=int, default=1_000_000)
+    parser.add_argument("--vehicles", type=int, default=1000)
+    args = parser.parse_args()
+    
+    
+    with tempfile.TemporaryDirectory() as workdir:
+        path = os.path.join(workdir, "ledger.jsonl")
+        ledger = ServiceLedger(path, LEDGER_CHECKPOINT_INTERVAL)
+        
+        def append_all():
+            for i in range(args.records):
+                ledger.append({
+                    'record_id': f"rec-{i}",
+                    'vehicle_id': f"VW-{i % args.vehicles:08d}",
+                    'timestamp': "2025-01-01T10:00:00",
+                    'service_type': "Oil Change",
+                    'details': f"Routine service #{i}",
+                    'cost': 4500,
+                    'technician': "Service Center",
+                    'status': "completed"
+                })
+        
+        _, elapsed = timed(append_all)
+        report("append", args.records, elapsed, "records")
+        
+        _, elapsed = timed(ServiceLedger, path, LEDGER_CHECKPOINT_INTERVAL)
+        report("reload (index rebuild, no rehash)", args.records, elapsed, "records")
+        
+        result, elapsed = timed(ledger.verify, full=True)
+        assert result['valid'], result
+        report("verify full (rehash every entry)", result['entries_rehashed'], elapsed, "records")
+        
+        result, elapsed = timed(ledger.verify)
+        assert result['valid'], result
+        report("verify incremental (since checkpoint)", result['entries_rehashed'], elapsed, "records")
+        
+        ledger.verified_blocks.clear()
+        result, elapsed = timed(ledger.verify_vehicle, "VW-00000007")
+        assert result['valid'], result
+        report("verify one vehicle (cold block roots)", result['entries_rehashed'], elapsed, "records")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""Rule evaluation cost as the maintenance rule count grows
+
+Usage: python benchmarks/bench_rules.py [--vehicles 100000] [--rule-counts 3 30 300]
+"""
+
+import argparse
+
+from common import report, timed
+from nexaserve.rules import CompiledRuleSet
+from nexaserve.twin import FleetTwinStore, TWIN_METRICS
+
+def synthetic_spec(count):
+    """count threshold rules spread over every twin metric, plus one compound rule per 50"""
+    metrics = list(TWIN_METRICS)
+    rules = []
+    for i in range(count):
+        metric = metrics[i % len(metrics)]
+        low, high, _ = TWIN_METRICS[metric]
+        rule = {
+            'id': f"rule_{i}",
+            'component': metric,
+            'metric': metric,
+            'predicate': {'op': '<' if i % 2 else '>', 'value': low + (high - low) * ((i * 7) % 10) / 10},
+            'severity': 'Medium',
+            'message': "{component} at {value}"
+        }
+        if i % 50 == 49:
+            rule['predicate'] = {'all': [rule['predicate'], {'metric': 'battery.health', 'op': '<', 'value': 90}]}
+        rules.append(rule)
+    return {'rules': rules}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--vehicles", type=int, default=100000)
+    parser.add_argument("--rule-counts", type=int, nargs="+", default=[3, 30, 300])
+    args = parser.parse_args()
+    
+    fleet = FleetTwinStore.generate(args.vehicles)
+    
+    for count in args.rule_counts:
+        rules, elapsed = timed(CompiledRuleSet, synthetic_spec(count))
+        report(f"compile {count} rules", count, elapsed, "rules")
+        fired, elapsed = timed(rules.evaluate, fleet)
+        report(f"evaluate {count} rules x {args.vehicles:,} vehicles", args.vehicles, elapsed, "vehicles")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Voice input pipeline cost per second of audio: chunked decode, resample and transcription
+
+Usage: python benchmarks/bench_stt.py [--seconds 60] [--rate 48000] [--channels 2] [--seed 7]
+
+A synthetic recording (speech-like bursts over background noise) is written as 16-bit WAV,
+then decoded and resampled block by block and transcribed with the local stub backend.
+Latency is reported per second of audio; chunked resampling is checked against one pass.
+"""
+
+import argparse
+import io
+import wave
+
+import numpy as np
+
+from common import report, timed
+from nexaserve.config import STT_CHUNK_SECONDS, STT_SAMPLE_RATE
+from nexaserve.voice import (
+    StreamingResampler, StubTranscriptionBackend, audio_blocks, pcm_to_float, transcribe_audio
+)
+
+def recording(rng, seconds, rate, channels):
+    """16-bit WAV bytes: tone bursts every other second over low background noise"""
+    t = np.arange(int(seconds * rate)) / rate
+    voiced = (t.astype(int) % 2 == 0) * np.sin(2 * np.pi * rng.uniform(120, 220) * t) * 0.4
+    signal = voiced + rng.normal(0, 0.003, t.size)
+    pcm = (np.clip(np.repeat(signal[:, None], channels, axis=1), -1, 1) * 32767).astype('<i2')
+
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as writer:
+        writer.setnchannels(channels)
+        writer.setsampwidth(2)
+        writer.setframerate(rate)
+        writer.writeframes(pcm.tobytes())
+    return buffer.getvalue()
+
+def decode_and_resample(data):
+    """Every block through the resampler, as transcribe_audio does, without a backend"""
+    resampler = None
+    out = []
+    for samples, rate, _ in audio_blocks(io.BytesIO(data), STT_CHUNK_SECONDS):
+        resampler = resampler or StreamingResampler(rate, STT_SAMPLE_RATE)
+        out.append(resampler.process(samples))
+    out.append(resampler.flush())
+    return np.concatenate(out)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=60)
+    parser.add_argument("--rate", type=int, default=48000)
+    parser.add_argument("--channels", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    data = recording(np.random.default_rng(args.seed), args.seconds, args.rate, args.channels)
+    print(f"{args.seconds:.0f} s at {args.rate} Hz x{args.channels}: {len(data) / 2**20:.1f} MiB WAV")
+
+    chunked, elapsed = timed(decode_and_resample, data)
+    report(f"decode + resample to {STT_SAMPLE_RATE} Hz", round(args.seconds), elapsed, "audio s")
+
+    whole_resampler = StreamingResampler(args.rate, STT_SAMPLE_RATE)
+    whole = np.concatenate([whole_resampler.process(pcm_to_float(data[44:], 2, args.channels)), whole_resampler.flush()])
+    assert chunked.size == whole.size and np.allclose(chunked, whole, atol=1e-6)
+    assert whole.size == int(np.ceil(len(pcm_to_float(data[44:], 2, args.channels)) * STT_SAMPLE_RATE / args.rate))
+
+    partials = []
+    result, elapsed = timed(
+        transcribe_audio, io.BytesIO(data),
+        report=lambda progress, text: partials.append(progress), backend=StubTranscriptionBackend()
+    )
+    report("transcribe_audio (stub backend)", round(result['audio_seconds']), elapsed, "audio s")
+    print(f"latency {elapsed / result['audio_seconds'] * 1000:.2f} ms per audio second  "
+          f"partial transcripts {len(partials)}  words {len(result['transcript'].split())}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Telemetry ingestion throughput replayed from a recorded frame fixture
+
+Usage: python benchmarks/bench_telemetry.py [--vehicles 10000] [--frames 1000000] [--fixture PATH] [--seed 7]
+
+Without --fixture a deterministic recording is generated for the seeded fleet and
+replayed from a temporary file; with --fixture an existing recording is replayed
+(vehicles are regenerated from the same seed, so keep --vehicles and --seed matching).
+"""
+
+import argparse
+import os
+import tempfile
+
+import numpy as np
+
+from common import report, timed
+from nexaserve.rules import get_rule_engine
+from nexaserve.twin import FleetTwinStore, TWIN_METRICS, TWIN_VEHICLE_FIELDS
+from nexaserve.telemetry import (
+    TELEMETRY_FRAME_DTYPE, TELEMETRY_SIGNALS, TelemetryIngestor, encode_telemetry_frames,
+    file_frame_source
+)
+
+TARGET_FRAMES_PER_S = 50000
+
+def record_fixture(fleet, frames, rng, path):
+    """Write a replayable recording: random vehicles and signals, values spanning each metric's range"""
+    signals = rng.integers(0, len(TELEMETRY_SIGNALS), frames)
+    bounds = np.array([
+        TWIN_METRICS[name][:2] if name in TWIN_METRICS else TWIN_VEHICLE_FIELDS[name][:2]
+        for name in TELEMETRY_SIGNALS
+    ], dtype=float)
+    # Widen each range by 20% on both sides so readings cross the rule thresholds
+    span = bounds[:, 1] - bounds[:, 0]
+    low, high = bounds[:, 0] - span * 0.2, bounds[:, 1] + span * 0.2
+    values = low[signals] + rng.random(frames) * (high - low)[signals]
+    vehicles = fleet.vehicle_keys[rng.integers(0, fleet.size, frames)]
+    ts = 1.7e9 + np.arange(frames) * 0.001
+    with open(path, 'wb') as f:
+        f.write(encode_telemetry_frames(ts, vehicles, signals, values))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--vehicles", type=int, default=10000)
+    parser.add_argument("--frames", type=int, default=1000000)
+    parser.add_argument("--fixture", help="replay this recording instead of generating one")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    fleet = FleetTwinStore.generate(args.vehicles, rng=rng)
+    rules = get_rule_engine().rules()
+
+    path = args.fixture
+    if path is None:
+        handle, path = tempfile.mkstemp(suffix=".telemetry")
+        os.close(handle)
+        _, elapsed = timed(record_fixture, fleet, args.frames, rng, path)
+        report("record fixture", args.frames, elapsed, "frames")
+    frames = os.path.getsize(path) // TELEMETRY_FRAME_DTYPE.itemsize
+
+    try:
+        ingestor = TelemetryIngestor(fleet, rules=rules)
+        stats, elapsed = timed(ingestor.run, file_frame_source(path))
+        report(f"ingest into {args.vehicles:,} vehicles", frames, elapsed, "frames")
+        print(f"batches {stats['batches']:,}  dropped {stats['dropped']:,}  threshold crossings {stats['crossed']:,}")
+
+        rate = frames / elapsed if elapsed else float('inf')
+        verdict = "meets" if rate >= TARGET_FRAMES_PER_S else "MISSES"
+        print(f"{verdict} the {TARGET_FRAMES_PER_S:,} frames/s target")
+
+        # Incremental state must match a full re-evaluation of the final fleet
+        assert (ingestor.fired == rules.evaluate(fleet)).all()
+    finally:
+        if args.fixture is None:
+            os.remove(path)
+
+if __name__ == "__main__":
+    main()
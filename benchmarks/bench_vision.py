@@ -0,0 +1,110 @@
+"""Image diagnosis preprocessing latency and memory for phone-camera uploads
+
+Usage: python benchmarks/bench_vision.py [--images 8] [--width 4000] [--height 3000] [--seed 7]
+
+Synthetic 12MP JPEGs tagged with a rotated EXIF orientation are pushed through a naive
+full-resolution decode, through prepare_image one at a time and through the image pool as
+one multi-photo upload. They are then diagnosed with the local stub backend to show that
+re-uploads (exact and recompressed) are served from the hash cache.
+Memory is reported as the size of the largest pixel buffer each path decodes.
+"""
+
+import argparse
+import io
+
+import numpy as np
+from PIL import Image, ImageOps
+
+from common import report, timed
+from nexaserve.config import (
+    IMAGE_POOL_MAX_WORKERS, VISION_CACHE_SIZE, VISION_HASH_MAX_DISTANCE, VISION_MAX_EDGE
+)
+from nexaserve.vision import (
+    StubVisionBackend, VisionResultCache, diagnose_image_batch, diagnose_images, prepare_image,
+    preprocess_images
+)
+
+def phone_photo(rng, width, height):
+    """Random low-resolution scene upscaled to full size, saved as a camera JPEG held in portrait orientation"""
+    scene = rng.integers(0, 256, (height // 32, width // 32, 3), dtype=np.uint8)
+    image = Image.fromarray(scene).resize((width, height), Image.BICUBIC)
+
+    exif = Image.Exif()
+    exif[0x0112] = 6
+    buffer = io.BytesIO()
+    image.save(buffer, "JPEG", quality=92, exif=exif)
+    return buffer.getvalue()
+
+def naive_prepare(data, max_edge):
+    """What the upload path used to do: decode at full resolution, then shrink"""
+    image = ImageOps.exif_transpose(Image.open(io.BytesIO(data))).convert('RGB')
+    decoded = image.width * image.height * 3
+    image.thumbnail((max_edge, max_edge), Image.LANCZOS)
+    buffer = io.BytesIO()
+    image.save(buffer, "JPEG", quality=85)
+    return buffer, decoded
+
+def draft_decoded_bytes(data, max_edge):
+    """Pixel buffer size of the reduced-scale decode prepare_image starts from"""
+    image = Image.open(io.BytesIO(data))
+    image.draft('RGB', (max_edge, max_edge))
+    return image.width * image.height * 3
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--images", type=int, default=8)
+    parser.add_argument("--width", type=int, default=4000)
+    parser.add_argument("--height", type=int, default=3000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    photos, elapsed = timed(lambda: [phone_photo(rng, args.width, args.height) for _ in range(args.images)])
+    report(f"generate {args.width}x{args.height} JPEGs", args.images, elapsed, "images")
+    print(f"upload size {np.mean([len(p) for p in photos]) / 2**20:.1f} MiB avg")
+
+    prepared, elapsed = timed(lambda: [prepare_image(io.BytesIO(p)) for p in photos])
+    report("prepare_image (draft decode + resize)", args.images, elapsed, "images")
+    print(f"decoded {draft_decoded_bytes(photos[0], VISION_MAX_EDGE) / 2**20:.1f} MiB/image  "
+          f"payload {np.mean([p.nbytes for p in prepared]) / 1024:.0f} KiB  "
+          f"size {prepared[0].size}")
+
+    preprocess_images(photos[:1])  # start the pool workers outside the timing
+    pooled, elapsed = timed(preprocess_images, photos)
+    report(f"preprocess_images (pool of {IMAGE_POOL_MAX_WORKERS})", args.images, elapsed, "images")
+    assert [p.phash for p in pooled] == [p.phash for p in prepared]
+
+    naive, elapsed = timed(lambda: [naive_prepare(p, VISION_MAX_EDGE) for p in photos])
+    report("naive full decode + resize", args.images, elapsed, "images")
+    print(f"decoded {naive[0][1] / 2**20:.1f} MiB/image")
+    assert prepared[0].size[0] < prepared[0].size[1], "EXIF orientation was not applied"
+
+    backend = StubVisionBackend()
+    cache = VisionResultCache(VISION_CACHE_SIZE, VISION_HASH_MAX_DISTANCE)
+    diagnose = lambda images: [diagnose_images([i], backend=backend, cache=cache)[1] for i in images]
+
+    cached, elapsed = timed(diagnose, prepared)
+    report("diagnose (cold cache)", args.images, elapsed, "images")
+    assert not any(cached)
+
+    # A re-upload is prepared again (new file) but never reaches the backend
+    reuploads = [prepare_image(io.BytesIO(p)) for p in photos]
+    cached, elapsed = timed(diagnose, reuploads)
+    report("diagnose re-uploads", args.images, elapsed, "images")
+    assert all(cached)
+
+    finding, elapsed = timed(diagnose_image_batch, prepared, backend=backend, cache=VisionResultCache(8, 4))
+    report("diagnose upload as one batch request", args.images, elapsed, "images")
+    print(f"consolidated finding: {finding['component']} ({finding['severity']})")
+
+    recompressed = []
+    for p in photos:
+        buffer = io.BytesIO()
+        Image.open(io.BytesIO(p)).save(buffer, "JPEG", quality=60, exif=Image.open(io.BytesIO(p)).getexif())
+        recompressed.append(prepare_image(buffer))
+    cached = diagnose(recompressed)
+    print(f"recompressed copies served from cache: {sum(cached)}/{args.images}  "
+          f"(hits {cache.hits}, misses {cache.misses})")
+
+if __name__ == "__main__":
+    main()
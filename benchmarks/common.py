@@ -0,0 +1,29 @@
+"""Shared helpers for the benchmark scripts
+
+Importing this module puts the repository root on sys.path, so the benchmarks run against
+the working tree's nexaserve package whether or not it is installed.
+"""
+
+import pathlib
+import sys
+import time
+
+REPO_ROOT = pathlib.Path(__file__).resolve().parent.parent
+
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+# Subsystems run in bare mode here, without a Streamlit runtime; keep its warnings out of the results
+from streamlit import logger
+logger.set_log_level("error")
+
+def timed(fn, *args, **kwargs):
+    """Run fn once and return (result, elapsed seconds)"""
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+def report(label, count, elapsed, unit="ops"):
+    """Print one benchmark line"""
+    rate = count / elapsed if elapsed else float('inf')
+    print(f"{label:<44} {count:>10,} {unit:<8} {elapsed:>9.3f} s {rate:>14,.0f} {unit}/s")
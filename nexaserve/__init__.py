@@ -0,0 +1,5 @@
+"""VW NexaServe AI - multimodal after-sales assistant
+
+Subsystems are plain modules (twin, rules, telemetry, chat, vision, voice, ...) that import
+without touching the UI; the Streamlit pages live in nexaserve.ui and are loaded on demand.
+"""
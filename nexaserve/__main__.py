@@ -0,0 +1,14 @@
+"""Launch the app with Streamlit: python -m nexaserve [streamlit run options]"""
+
+import os
+import sys
+
+def main():
+    """Hand over to `streamlit run` on the packaged app script"""
+    from streamlit.web import cli
+    
+    sys.argv = ["streamlit", "run", os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")] + sys.argv[1:]
+    sys.exit(cli.main())
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,6 @@
+"""Streamlit script behind `python -m nexaserve` and the `nexaserve` command"""
+
+from nexaserve.ui import main
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,406 @@
+"""Smart appointment booking: slot inventory, ranked search and transactional booking"""
+
+import streamlit as st
+import json
+import numpy as np
+from datetime import datetime, timedelta
+import hashlib
+import uuid
+import sqlite3
+import threading
+
+from .config import (
+    SLOT_HORIZON_DAYS, SLOT_TIMES, SLOT_SEARCH_WINDOW_DAYS, SLOT_SEARCH_RESULTS, SLOT_SCORE_WEIGHTS,
+    PARTS_RESTOCK_DAYS, BOOKING_STORE_PATH, BOOKING_BUSY_TIMEOUT_S
+)
+from .session import json_default
+from .jobs import inject_latency
+from .ledger import create_service_record
+
+SERVICE_CATALOG = {
+    "Regular Maintenance": {'duration': '2-3 hours', 'cost': (3000, 6000), 'part': 'service_kit'},
+    "Engine Diagnostics": {'duration': '1-2 hours', 'cost': (1500, 4000), 'part': None},
+    "Brake Service": {'duration': '2-3 hours', 'cost': (4000, 9000), 'part': 'brake_pads'},
+    "Oil Change": {'duration': '1 hour', 'cost': (2500, 4500), 'part': 'oil_filter'},
+    "Tire Replacement": {'duration': '1-2 hours', 'cost': (8000, 15000), 'part': 'tires'},
+    "Battery Replacement": {'duration': '1 hour', 'cost': (6000, 12000), 'part': 'battery'},
+    "AC Service": {'duration': '2-3 hours', 'cost': (2500, 6000), 'part': 'refrigerant'},
+    "Transmission Service": {'duration': '3-4 hours', 'cost': (6000, 14000), 'part': 'transmission_fluid'},
+    "Other": {'duration': '2-3 hours', 'cost': (2000, 8000), 'part': None}
+}
+
+SERVICE_TYPES = list(SERVICE_CATALOG)
+SERVICE_PARTS = sorted({entry['part'] for entry in SERVICE_CATALOG.values() if entry['part']})
+
+# One bay per technician; skills are 1-5 per service type, 3 where unlisted
+SERVICE_CENTERS = {
+    "VW Service Center - Whitefield, Bangalore": [
+        ("Amit Sharma", "Senior Technician", {"Engine Diagnostics": 5, "Transmission Service": 4, "Brake Service": 4}),
+        ("Priya Nair", "EV & Electrical Specialist", {"Battery Replacement": 5, "AC Service": 4}),
+        ("Rahul Verma", "Technician", {"Tire Replacement": 5, "Brake Service": 4}),
+        ("Sneha Iyer", "Service Technician", {"Regular Maintenance": 4, "Oil Change": 5})
+    ],
+    "VW Service Center - Koramangala, Bangalore": [
+        ("Vikram Rao", "Senior Technician", {"Engine Diagnostics": 4, "Transmission Service": 5}),
+        ("Anjali Menon", "Service Technician", {"Regular Maintenance": 5, "Oil Change": 4}),
+        ("Karthik Reddy", "Technician", {"Brake Service": 5, "Tire Replacement": 4})
+    ],
+    "VW Service Center - Hebbal, Bangalore": [
+        ("Suresh Kumar", "Senior Technician", {"Brake Service": 5, "Engine Diagnostics": 4}),
+        ("Deepa Pillai", "EV & Electrical Specialist", {"Battery Replacement": 5, "AC Service": 5}),
+        ("Arjun Das", "Service Technician", {"Regular Maintenance": 4, "Oil Change": 4})
+    ],
+    "VW Service Center - Electronic City, Bangalore": [
+        ("Manoj Gupta", "Senior Technician", {"Transmission Service": 5, "Engine Diagnostics": 5}),
+        ("Kavya Shetty", "Technician", {"AC Service": 4, "Battery Replacement": 4}),
+        ("Rohan Joshi", "Service Technician", {"Tire Replacement": 4, "Regular Maintenance": 4}),
+        ("Farhan Ali", "Technician", {"Brake Service": 4, "Oil Change": 4})
+    ]
+}
+
+BOOKING_CREATED = 'created'
+BOOKING_REPLAYED = 'replayed'
+BOOKING_CONFLICT = 'conflict'
+
+class BookingStore:
+    """Transactional booking ledger in SQLite with optimistic slot versions and idempotency keys
+    
+    Each thread gets its own connection so concurrent bookings genuinely contend in SQLite,
+    as separate replicas would. A booking reads the slot's version, then conditionally bumps
+    it and inserts the booking in one IMMEDIATE transaction; a changed version means someone
+    else won the slot. Reusing an idempotency key returns the original booking.
+    """
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS slots (
+            slot_key INTEGER PRIMARY KEY, version INTEGER NOT NULL DEFAULT 0, booking_id TEXT
+        );
+        CREATE TABLE IF NOT EXISTS bookings (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, booking_id TEXT NOT NULL UNIQUE,
+            idempotency_key TEXT NOT NULL UNIQUE, slot_key INTEGER NOT NULL UNIQUE,
+            session_id TEXT, payload TEXT NOT NULL, ledger_seq INTEGER, created_at TEXT NOT NULL
+        );
+    """
+    
+    def __init__(self, path):
+        self.path = path
+        self.local = threading.local()
+        self._connection().executescript(self.SCHEMA)
+    
+    def _connection(self):
+        db = getattr(self.local, 'db', None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=BOOKING_BUSY_TIMEOUT_S, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            self.local.db = db
+        return db
+    
+    def find(self, idempotency_key):
+        """Booking previously made with this idempotency key, or None"""
+        row = self._connection().execute(
+            "SELECT payload, ledger_seq FROM bookings WHERE idempotency_key = ?", (idempotency_key,)
+        ).fetchone()
+        if row is None:
+            return None
+        booking = json.loads(row[0])
+        booking['ledger_seq'] = row[1]
+        return booking
+    
+    def reserve(self, slot_key, idempotency_key, booking, session_id=None):
+        """Book a slot in one transaction; returns (booking, BOOKING_CREATED / BOOKING_REPLAYED / BOOKING_CONFLICT)"""
+        existing = self.find(idempotency_key)
+        if existing is not None:
+            return existing, BOOKING_REPLAYED
+        
+        db = self._connection()
+        db.execute("INSERT OR IGNORE INTO slots (slot_key) VALUES (?)", (slot_key,))
+        version, holder = db.execute("SELECT version, booking_id FROM slots WHERE slot_key = ?", (slot_key,)).fetchone()
+        if holder is not None:
+            return None, BOOKING_CONFLICT
+        
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            claimed = db.execute(
+                "UPDATE slots SET version = version + 1, booking_id = ? "
+                "WHERE slot_key = ? AND version = ? AND booking_id IS NULL",
+                (booking['booking_id'], slot_key, version)
+            ).rowcount
+            if claimed != 1:
+                db.execute("ROLLBACK")
+                return None, BOOKING_CONFLICT
+            db.execute(
+                "INSERT INTO bookings (booking_id, idempotency_key, slot_key, session_id, payload, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (booking['booking_id'], idempotency_key, slot_key, session_id,
+                 json.dumps(booking, default=json_default), datetime.now().isoformat())
+            )
+            db.execute("COMMIT")
+        except sqlite3.IntegrityError:
+            # The same idempotency key committed concurrently: hand back that booking
+            db.execute("ROLLBACK")
+            return self.find(idempotency_key), BOOKING_REPLAYED
+        except sqlite3.Error:
+            if db.in_transaction:
+                db.execute("ROLLBACK")
+            raise
+        return dict(booking, ledger_seq=None), BOOKING_CREATED
+    
+    def claim_ledger(self, booking_id):
+        """True for exactly one caller per booking: the one that must write its ledger entry"""
+        return self._connection().execute(
+            "UPDATE bookings SET ledger_seq = -1 WHERE booking_id = ? AND ledger_seq IS NULL", (booking_id,)
+        ).rowcount == 1
+    
+    def attach_ledger(self, booking_id, seq):
+        self._connection().execute("UPDATE bookings SET ledger_seq = ? WHERE booking_id = ?", (seq, booking_id))
+    
+    def booked_since(self, last_id):
+        """(max id, slot keys) of bookings committed after last_id, by any replica"""
+        rows = self._connection().execute(
+            "SELECT id, slot_key FROM bookings WHERE id > ? ORDER BY id", (last_id,)
+        ).fetchall()
+        return (rows[-1][0] if rows else last_id), [slot_key for _, slot_key in rows]
+
+@st.cache_resource
+def get_booking_store():
+    """Process-wide booking store"""
+    return BookingStore(BOOKING_STORE_PATH)
+
+class SlotInventory:
+    """Bookable (day, center, time block, bay) slots over the booking horizon
+    
+    Slots live in flat NumPy columns laid out day-major, so a date window is a contiguous
+    slice. The free mask plus per-(day, center) free counts form the in-process index the
+    optimal-slot search scores in one vectorized pass. The BookingStore is the source of
+    truth: a reservation only counts once its transaction commits, and bookings made by
+    other replicas are folded into the index before each search.
+    """
+    
+    def __init__(self, start_date, store, days=SLOT_HORIZON_DAYS, occupancy=0.3, seed=0):
+        self.start_date = start_date
+        self.store = store
+        self.days = days
+        self.centers = list(SERVICE_CENTERS)
+        self.technicians = []
+        tech_centers = []
+        for center_index, center in enumerate(self.centers):
+            for name, title, _ in SERVICE_CENTERS[center]:
+                self.technicians.append((name, title))
+                tech_centers.append(center_index)
+        tech_centers = np.array(tech_centers)
+        self.bays = np.bincount(tech_centers, minlength=len(self.centers))
+        self.skill = np.array([
+            [skills.get(service_type, 3) for service_type in SERVICE_TYPES]
+            for center in self.centers for _, _, skills in SERVICE_CENTERS[center]
+        ], dtype=np.int8)
+        
+        # Day-major layout: within a day, each technician's bay repeats for every time block
+        per_day = len(self.technicians) * len(SLOT_TIMES)
+        techs = np.tile(np.repeat(np.arange(len(self.technicians)), len(SLOT_TIMES)), days)
+        self.slot_day = np.repeat(np.arange(days, dtype=np.int32), per_day)
+        self.slot_tech = techs
+        self.slot_center = tech_centers[techs]
+        self.slot_time = np.tile(np.arange(len(SLOT_TIMES)), len(self.technicians) * days)
+        self.day_offsets = np.arange(days + 1) * per_day
+        # Slot keys are absolute (day ordinal based) so every replica names a slot the same way
+        self.base_key = start_date.toordinal() * per_day
+        
+        # Walk-in and phone bookings outside the app, derived from the slot key so replicas agree
+        keys = (self.base_key + np.arange(len(self.slot_day))).astype(np.uint64)
+        walk_in = ((keys * np.uint64(2654435761)) % np.uint64(2 ** 32)) / 2 ** 32 < occupancy
+        self.free = ~walk_in
+        self.free_count = np.zeros((days, len(self.centers)), dtype=np.int32)
+        np.add.at(self.free_count, (self.slot_day[self.free], self.slot_center[self.free]), 1)
+        self.stock = np.random.default_rng(seed).integers(0, 6, (len(self.centers), len(SERVICE_PARTS)))
+        self.synced_id = 0
+        self.lock = threading.Lock()
+        self.sync()
+    
+    def day_index(self, date):
+        return (date - self.start_date).days
+    
+    def _take_locked(self, slot, service_type=None):
+        if not self.free[slot]:
+            return
+        self.free[slot] = False
+        self.free_count[self.slot_day[slot], self.slot_center[slot]] -= 1
+        part = service_type and SERVICE_CATALOG[service_type]['part']
+        if part:
+            index = (self.slot_center[slot], SERVICE_PARTS.index(part))
+            self.stock[index] = max(self.stock[index] - 1, 0)
+    
+    def sync(self):
+        """Fold in bookings committed since the last sync, including other replicas'"""
+        last_id, slot_keys = self.store.booked_since(self.synced_id)
+        with self.lock:
+            for slot_key in slot_keys:
+                slot = slot_key - self.base_key
+                if 0 <= slot < len(self.free):
+                    self._take_locked(slot)
+            self.synced_id = max(self.synced_id, last_id)
+    
+    def search(self, preferred_date, service_type, center=None, window=SLOT_SEARCH_WINDOW_DAYS, limit=SLOT_SEARCH_RESULTS):
+        """Best free slots around preferred_date, ranked by proximity, skill, parts and bay utilization"""
+        today = max(self.day_index(datetime.now().date()), 0)
+        day = min(max(self.day_index(preferred_date), today), self.days - 1)
+        low, high = max(day - window, today), min(day + window + 1, self.days)
+        if low >= high:
+            return []
+        self.sync()
+        
+        start = self.day_offsets[low]
+        # Snapshot the index so concurrent reservations cannot shift it mid-scoring
+        with self.lock:
+            free = self.free[start:self.day_offsets[high]].copy()
+            free_count = self.free_count.copy()
+            stock = self.stock.copy()
+        candidates = np.flatnonzero(free) + start
+        if center is not None:
+            candidates = candidates[self.slot_center[candidates] == self.centers.index(center)]
+        if not len(candidates):
+            return []
+        
+        service_index = SERVICE_TYPES.index(service_type)
+        days = self.slot_day[candidates]
+        centers = self.slot_center[candidates]
+        weights = SLOT_SCORE_WEIGHTS
+        score = weights['proximity'] * np.abs(days - day)
+        score = score + weights['skill'] * (5 - self.skill[self.slot_tech[candidates], service_index]) / 4
+        score = score + weights['utilization'] * (1 - free_count[days, centers] / (self.bays[centers] * len(SLOT_TIMES)))
+        part = SERVICE_CATALOG[service_type]['part']
+        if part:
+            out_of_stock = stock[centers, SERVICE_PARTS.index(part)] <= 0
+            score = score + weights['parts'] * (out_of_stock & (days < today + PARTS_RESTOCK_DAYS))
+        
+        if len(candidates) > limit:
+            top = np.argpartition(score, limit - 1)[:limit]
+        else:
+            top = np.arange(len(candidates))
+        top = top[np.lexsort((candidates[top], score[top]))]
+        return [self.slot_view(int(candidates[i]), service_type, float(score[i])) for i in top]
+    
+    def slot_view(self, slot, service_type, score=None):
+        """Appointment-shaped dict for one slot"""
+        name, title = self.technicians[self.slot_tech[slot]]
+        center = self.slot_center[slot]
+        date = self.start_date + timedelta(days=int(self.slot_day[slot]))
+        part = SERVICE_CATALOG[service_type]['part']
+        parts_availability = 'Confirmed'
+        if part and self.stock[center, SERVICE_PARTS.index(part)] <= 0:
+            restock = datetime.now().date() + timedelta(days=PARTS_RESTOCK_DAYS)
+            parts_availability = f"Ordered - arrives by {restock.strftime('%Y-%m-%d')}"
+        low, high = SERVICE_CATALOG[service_type]['cost']
+        return {
+            'slot_id': slot,
+            'slot_key': int(self.base_key + slot),
+            'date': date.strftime('%Y-%m-%d'),
+            'time': SLOT_TIMES[self.slot_time[slot]],
+            'service_center': self.centers[center],
+            'estimated_duration': SERVICE_CATALOG[service_type]['duration'],
+            'assigned_technician': f"{title} - {name}",
+            'parts_availability': parts_availability,
+            'total_estimated_cost': f"₹{low:,} - ₹{high:,}",
+            'score': score
+        }
+    
+    def reserve(self, option, service_type, idempotency_key, session_id=None):
+        """Commit one ranked option; returns (booking, status) from the BookingStore"""
+        booking = dict(option, booking_id='VW-APT-' + str(uuid.uuid4())[:8].upper(), service_type=service_type)
+        booking, status = self.store.reserve(option['slot_key'], idempotency_key, booking, session_id)
+        if status != BOOKING_REPLAYED:
+            # Won or lost, the slot is no longer free
+            with self.lock:
+                self._take_locked(option['slot_id'], service_type if status == BOOKING_CREATED else None)
+        return booking, status
+    
+    def book(self, preferred_date, service_type, idempotency_key, center=None, session_id=None):
+        """Reserve the best available slot, falling through the ranking when another booking wins a slot"""
+        existing = self.store.find(idempotency_key)
+        if existing is not None:
+            return existing, BOOKING_REPLAYED
+        for _ in range(3):
+            options = self.search(preferred_date, service_type, center)
+            if not options:
+                return None, BOOKING_CONFLICT
+            for option in options:
+                booking, status = self.reserve(option, service_type, idempotency_key, session_id)
+                if status != BOOKING_CONFLICT:
+                    return booking, status
+        return None, BOOKING_CONFLICT
+    
+    def availability(self, center, days=5):
+        """Morning/afternoon/evening availability for the next few days at one center"""
+        center_index = self.centers.index(center)
+        blocks = {'morning': (0, 1), 'afternoon': (2, 3), 'evening': (4,)}
+        today = max(self.day_index(datetime.now().date()), 0)
+        rows = []
+        for day in range(today, min(today + days, self.days)):
+            window = slice(self.day_offsets[day], self.day_offsets[day + 1])
+            at_center = self.slot_center[window] == center_index
+            row = {'date': (self.start_date + timedelta(days=day)).strftime('%Y-%m-%d')}
+            for block, times in blocks.items():
+                free = int(np.count_nonzero(self.free[window] & at_center & np.isin(self.slot_time[window], times)))
+                row[block] = 'Busy' if free == 0 else 'Limited' if free <= 2 else 'Available'
+            rows.append(row)
+        return rows
+
+@st.cache_resource
+def get_slot_inventory():
+    """Process-wide slot inventory shared by every session"""
+    return SlotInventory(datetime.now().date(), get_booking_store())
+
+def booking_idempotency_key(*request):
+    """Stable key for one booking request in this session, so resubmits replay instead of rebooking"""
+    payload = json.dumps([st.session_state.session_id, *request], default=json_default)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def reserve_appointment(inventory, preferred_date, service_type, location, idempotency_key, session_id):
+    """Find and reserve the optimal slot; touches no session state, so it can run off the script thread"""
+    return inventory.book(
+        datetime.strptime(preferred_date, '%Y-%m-%d').date(), service_type, idempotency_key,
+        center=location, session_id=session_id
+    )
+
+def schedule_appointment(preferred_date, service_type, location=None, idempotency_key=None):
+    """AI-powered appointment scheduling"""
+    
+    idempotency_key = idempotency_key or booking_idempotency_key(preferred_date, service_type, location)
+    
+    optimal_slot, status = reserve_appointment(
+        get_slot_inventory(), preferred_date, service_type, location, idempotency_key, st.session_state.session_id
+    )
+    return finalize_appointment(optimal_slot, status, service_type)
+
+def booking_job(report, inventory, preferred_date, service_type, location, idempotency_key, session_id):
+    """Background half of a booking: latency injection plus the transactional reservation"""
+    inject_latency('booking', report)
+    return reserve_appointment(inventory, preferred_date, service_type, location, idempotency_key, session_id)
+
+def finish_booking_job(result, service_type):
+    """Script-thread half of a booking: ledger entry and the confirmation shown on the next run"""
+    appointment = finalize_appointment(*result, service_type)
+    st.session_state.last_appointment = (
+        dict(appointment, found=True, service_type=service_type) if appointment
+        else {'found': False, 'service_type': service_type}
+    )
+
+def finalize_appointment(optimal_slot, status, service_type):
+    """Record a reserved appointment in the session and, once per booking, on the ledger"""
+    if optimal_slot is None:
+        return None
+    
+    st.session_state.appointment_scheduled = True
+    
+    # Exactly one request per booking writes its ledger entry, even across retries and replicas
+    store = get_booking_store()
+    if store.claim_ledger(optimal_slot['booking_id']):
+        record = create_service_record(
+            'Appointment Scheduled',
+            f"{service_type} - {optimal_slot['date']} at {optimal_slot['time']}, "
+            f"{optimal_slot['service_center']} ({optimal_slot['booking_id']})",
+            0
+        )
+        store.attach_ledger(optimal_slot['booking_id'], record['ledger_seq'])
+    
+    return dict(optimal_slot, replayed=status == BOOKING_REPLAYED)
@@ -0,0 +1,898 @@
+"""Chat turns: sentiment, issue classification, reply context and the concurrent turn pipeline"""
+
+import streamlit as st
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+import json
+import numpy as np
+from datetime import datetime
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+from .config import (
+    TURN_POOL_MAX_WORKERS, TURN_ANALYSIS_MODE, LOCAL_ANALYSIS_MIN_CONFIDENCE,
+    CONTEXT_HISTORY_TOKEN_BUDGET, CONTEXT_MESSAGE_MAX_TOKENS, CONTEXT_SUMMARY_MAX_TOKENS
+)
+from .llm import get_llm_client, get_llm_cache, cached_chat_completion
+from .session import get_session_store, save_session_profile
+
+# ================================
+# SENTIMENT ANALYSIS
+# ================================
+
+SENTIMENT_VALUES = ("positive", "neutral", "negative")
+EMOTION_VALUES = ("satisfied", "neutral", "concerned", "frustrated", "angry")
+
+def default_sentiment():
+    """Neutral sentiment used when analysis is unavailable"""
+    return {
+        "sentiment": "neutral",
+        "emotion": "neutral",
+        "frustration_score": 0,
+        "key_concerns": [],
+        "escalation_needed": False
+    }
+
+def normalize_sentiment(data):
+    """Validate model output into the dict update_sentiment_tracking consumes"""
+    sentiment = default_sentiment()
+    if not isinstance(data, dict):
+        return sentiment
+    
+    if data.get("sentiment") in SENTIMENT_VALUES:
+        sentiment["sentiment"] = data["sentiment"]
+    if data.get("emotion") in EMOTION_VALUES:
+        sentiment["emotion"] = data["emotion"]
+    try:
+        sentiment["frustration_score"] = min(max(int(data.get("frustration_score", 0)), 0), 100)
+    except (TypeError, ValueError):
+        pass
+    if isinstance(data.get("key_concerns"), list):
+        sentiment["key_concerns"] = [str(concern) for concern in data["key_concerns"]]
+    sentiment["escalation_needed"] = data.get("escalation_needed") is True
+    return sentiment
+
+def analyze_sentiment(text):
+    """Analyze sentiment and emotion from user input using GPT-4"""
+    local = local_turn_analysis(text)
+    if local['sentiment_confidence'] >= LOCAL_ANALYSIS_MIN_CONFIDENCE:
+        return local['sentiment']
+    
+    try:
+        sentiment_data = cached_chat_completion(
+            'sentiment',
+            model="gpt-4",
+            messages=[
+                {
+                    "role": "system",
+                    "content": """You are an emotional intelligence AI specialized in analyzing customer sentiment in automotive service contexts. 
+                    Analyze the user's message and respond ONLY with a JSON object containing:
+                    {
+                        "sentiment": "positive" | "neutral" | "negative",
+                        "emotion": "satisfied" | "neutral" | "concerned" | "frustrated" | "angry",
+                        "frustration_score": 0-100,
+                        "key_concerns": ["list", "of", "concerns"],
+                        "escalation_needed": true/false
+                    }"""
+                },
+                {
+                    "role": "user",
+                    "content": text
+                }
+            ],
+            temperature=0.3,
+            max_tokens=200,
+            parse=json.loads
+        )
+        
+        return normalize_sentiment(sentiment_data)
+    except Exception as e:
+        # Fallback sentiment analysis
+        return local['sentiment']
+
+def update_sentiment_tracking(sentiment_data):
+    """Update sentiment history and track frustration levels"""
+    entry = {
+        'timestamp': datetime.now().isoformat(),
+        'sentiment': sentiment_data['sentiment'],
+        'emotion': sentiment_data['emotion'],
+        'frustration_score': sentiment_data['frustration_score']
+    }
+    get_session_store().append_sentiment(st.session_state.session_id, entry)
+    if st.session_state.sentiment_history is not None:
+        st.session_state.sentiment_history.append(entry)
+    
+    st.session_state.current_sentiment = sentiment_data['sentiment']
+    st.session_state.frustration_score = sentiment_data['frustration_score']
+    save_session_profile()
+    
+    # Escalation logic
+    if sentiment_data['escalation_needed'] or sentiment_data['frustration_score'] > 70:
+        st.session_state.escalation_triggered = True
+        return True
+    return False
+
+# ================================
+# CONVERSATION CONTEXT BUILDER
+# ================================
+
+@st.cache_resource
+def get_token_encoding():
+    """tiktoken encoding for GPT-4 when tiktoken is installed and its data can be loaded"""
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.encoding_for_model("gpt-4")
+    except Exception:
+        # The encoding data is downloaded on first use; offline, token counts fall back to the estimate
+        return None
+
+def count_tokens(text):
+    """Exact token count with tiktoken, otherwise a ~4 characters per token estimate"""
+    encoding = get_token_encoding()
+    if encoding is None:
+        return len(text) // 4 + 1
+    return len(encoding.encode(text))
+
+def truncate_to_tokens(text, max_tokens):
+    """Trim text to roughly max_tokens, keeping the beginning"""
+    if count_tokens(text) <= max_tokens:
+        return text
+    encoding = get_token_encoding()
+    if encoding is None:
+        return text[:max_tokens * 4].rstrip() + " …"
+    return encoding.decode(encoding.encode(text)[:max_tokens]).rstrip() + " …"
+
+def strip_ui_suffixes(content):
+    """Remove recommendation and escalation banners that only exist for the chat UI"""
+    for suffix in TURN_RECOMMENDATION_SUFFIXES.values():
+        content = content.replace(suffix, "")
+    return content.strip()
+
+def compact_history_message(message):
+    """History entry as sent to the model: banners stripped and long content capped"""
+    content = strip_ui_suffixes(message["content"])
+    return {"role": message["role"], "content": truncate_to_tokens(content, CONTEXT_MESSAGE_MAX_TOKENS)}
+
+def summarize_turns(previous_summary, turns):
+    """Fold turns that fell out of the context window into the running summary"""
+    transcript = "\n".join(f"{turn['role']}: {turn['content']}" for turn in turns)
+    
+    try:
+        return cached_chat_completion(
+            'summary',
+            model="gpt-4",
+            messages=[
+                {
+                    "role": "system",
+                    "content": """Maintain a running summary of a customer's conversation with a Volkswagen after-sales assistant.
+                    Merge the new turns into the existing summary. Keep vehicle symptoms, decisions, bookings and open questions.
+                    Respond with the updated summary only, in at most 120 words."""
+                },
+                {
+                    "role": "user",
+                    "content": f"EXISTING SUMMARY:\n{previous_summary or '(none)'}\n\nNEW TURNS:\n{transcript}"
+                }
+            ],
+            temperature=0.2,
+            max_tokens=CONTEXT_SUMMARY_MAX_TOKENS
+        )
+    except Exception as e:
+        # Extractive fallback: keep the customer's own words, newest last
+        customer_lines = [turn['content'] for turn in turns if turn['role'] == 'user']
+        merged = " ".join(filter(None, [previous_summary] + customer_lines))
+        return truncate_to_tokens(merged, CONTEXT_SUMMARY_MAX_TOKENS)
+
+def fit_conversation_history(messages, summary_state, budget):
+    """Pick the newest messages that fit the budget next to the stored summary
+    
+    summary_state is {'covered': n, 'text': str}: the first n messages are represented by text.
+    Returns the fitted history and, when older messages no longer fit but are not summarized yet,
+    {'covered': new n, 'turns': [...]} for submit_context_summary to fold in after the reply.
+    """
+    covered = summary_state['covered']
+    summary_text = summary_state['text']
+    budget -= count_tokens(summary_text) if summary_text else 0
+    
+    fitted = []
+    window_start = len(messages)
+    for index in range(len(messages) - 1, covered - 1, -1):
+        compact = compact_history_message(messages[index])
+        cost = count_tokens(compact["content"]) + 4
+        if cost > budget:
+            break
+        fitted.append(compact)
+        budget -= cost
+        window_start = index
+    fitted.reverse()
+    
+    evicted = None
+    if window_start > covered:
+        evicted = {
+            'covered': window_start,
+            'turns': [compact_history_message(message) for message in messages[covered:window_start]]
+        }
+    
+    return fitted, evicted
+
+def collect_context_summary():
+    """Adopt a finished background summary; one still running is left alone rather than waited on"""
+    job = st.session_state.get('context_summary_job')
+    if job is None or not job[1].done():
+        return
+    covered, future = job
+    st.session_state.context_summary = {'covered': covered, 'text': future.result()}
+    st.session_state.context_summary_job = None
+
+def submit_context_summary(context):
+    """Fold the turns this reply's window dropped into the running summary on the turn pool
+    
+    Called once the reply is out, so the summary call never delays the turn's fan-out or first
+    token; the next turn picks the result up if it is ready, and meanwhile uses the previous summary.
+    """
+    evicted = context.get('evicted')
+    if evicted is None or st.session_state.get('context_summary_job') is not None:
+        return
+    future = get_turn_executor().submit(summarize_turns, context['summary'], evicted['turns'])
+    st.session_state.context_summary_job = (evicted['covered'], future)
+
+# ================================
+# AI CHATBOT CORE
+# ================================
+
+def build_response_context():
+    """Snapshot the session data the reply prompt needs so it can be built off the script thread"""
+    history = st.session_state.messages
+    
+    # The turn's own user message is sent separately as the final prompt message
+    if history and history[-1]["role"] == "user":
+        history = history[:-1]
+    
+    collect_context_summary()
+    fitted, evicted = fit_conversation_history(
+        history, st.session_state.context_summary, CONTEXT_HISTORY_TOKEN_BUDGET
+    )
+    
+    return {
+        'twin': dict(st.session_state.digital_twin_data),
+        'summary': st.session_state.context_summary['text'],
+        'history': fitted,
+        'evicted': evicted
+    }
+
+SYSTEM_PROMPT_PREFIX = """You are VW NexaServe AI, an intelligent after-sales assistant for Volkswagen India.
+
+YOUR CAPABILITIES:
+1. Diagnose vehicle issues using digital twin data
+2. Provide instant solutions for common problems
+3. Schedule service appointments
+4. Explain technical issues in simple language
+5. Offer AR remote assistance when needed
+6. Access blockchain-verified service history
+
+RESPONSE GUIDELINES:
+- Be empathetic and professional
+- Provide specific, actionable solutions
+- Reference the vehicle's actual data when relevant
+- Offer to escalate to human expert if issue is complex
+- Suggest AR guidance for visual problems
+- Always prioritize customer safety
+
+The customer's vehicle context follows in the next message.
+Respond conversationally and helpfully to the customer's query."""
+
+@st.cache_resource
+def get_static_system_prompt():
+    """Byte-identical system prompt prefix shared by every session in the process"""
+    return SYSTEM_PROMPT_PREFIX
+
+def vehicle_context_block(twin_context):
+    """Compact per-session vehicle context sent after the static prefix"""
+    return (
+        "CUSTOMER CONTEXT:\n"
+        f"- Vehicle: {twin_context['model']} ({twin_context['year']})\n"
+        f"- Vehicle ID: {twin_context['vehicle_id']}\n"
+        f"- Mileage: {twin_context['mileage']} km\n"
+        f"- Health Score: {twin_context['health_score']}/100\n"
+        f"- Last Service: {twin_context['last_service']}\n"
+        f"- Next Service Due: {twin_context['next_service_due']}"
+    )
+
+def build_response_messages(user_message, context):
+    """Assemble the GPT-4 chat messages for a reply from a context snapshot"""
+    
+    # Build context from digital twin
+    twin_context = context['twin']
+    
+    # Static prefix first so the provider can reuse its prompt cache across customers
+    messages = [
+        {"role": "system", "content": get_static_system_prompt()},
+        {"role": "system", "content": vehicle_context_block(twin_context)}
+    ]
+    
+    # Summary of turns that no longer fit the token budget
+    if context.get('summary'):
+        messages.append({"role": "system", "content": f"Summary of the earlier conversation: {context['summary']}"})
+    
+    # Add recent conversation history that fits the token budget
+    for msg in context['history']:
+        messages.append({
+            "role": msg["role"],
+            "content": msg["content"]
+        })
+    
+    # Add current message
+    messages.append({"role": "user", "content": user_message})
+    
+    return messages
+
+def generate_ai_response(user_message, context=None):
+    """Generate AI response using GPT-4 with vehicle context"""
+    
+    if context is None:
+        context = build_response_context()
+    
+    try:
+        messages = build_response_messages(user_message, context)
+        
+        # Generate response
+        return cached_chat_completion(
+            'response',
+            model="gpt-4",
+            messages=messages,
+            temperature=0.7,
+            max_tokens=500
+        )
+        
+    except Exception as e:
+        return response_error_message(e)
+
+def stream_ai_response(user_message, context=None):
+    """Yield GPT-4 reply text deltas as they arrive"""
+    
+    if context is None:
+        context = build_response_context()
+    
+    try:
+        messages = build_response_messages(user_message, context)
+        
+        cache = get_llm_cache()
+        key = cache.make_key("gpt-4", messages, 0.7, 500)
+        cached = cache.get('response', key)
+        if cached is not None:
+            yield cached
+            return
+        
+        llm = get_llm_client()
+        stream = llm.chat_completion(
+            'response',
+            model="gpt-4",
+            messages=messages,
+            temperature=0.7,
+            max_tokens=500,
+            stream=True,
+            stream_options={"include_usage": True}
+        )
+        
+        parts = []
+        for chunk in stream:
+            # The final chunk carries usage and no choices
+            if getattr(chunk, 'usage', None):
+                llm.usage.record('response', chunk.usage)
+            if chunk.choices and chunk.choices[0].delta.content:
+                parts.append(chunk.choices[0].delta.content)
+                yield chunk.choices[0].delta.content
+        
+        cache.put('response', key, "".join(parts))
+        
+    except Exception as e:
+        yield response_error_message(e)
+
+def response_error_message(error):
+    """Apology shown in place of a reply when generation fails"""
+    return f"⚠️ I apologize, but I'm experiencing technical difficulties. Error: {str(error)}. Please try again or contact our support team."
+
+# ================================
+# ISSUE CLASSIFICATION
+# ================================
+
+ISSUE_CATEGORIES = ("mechanical", "electrical", "maintenance", "warranty", "general_inquiry")
+ISSUE_SEVERITIES = ("low", "medium", "high", "critical")
+SUGGESTED_ACTIONS = ("ai_resolution", "ar_assistance", "service_center", "emergency")
+
+def default_classification():
+    """General inquiry classification used when classification is unavailable"""
+    return {
+        "category": "general_inquiry",
+        "severity": "low",
+        "requires_physical_inspection": False,
+        "suggested_action": "ai_resolution",
+        "estimated_resolution_time": "minutes"
+    }
+
+def normalize_classification(data):
+    """Validate model output into the dict the chat suffix logic consumes"""
+    classification = default_classification()
+    if not isinstance(data, dict):
+        return classification
+    
+    if data.get("category") in ISSUE_CATEGORIES:
+        classification["category"] = data["category"]
+    if data.get("severity") in ISSUE_SEVERITIES:
+        classification["severity"] = data["severity"]
+    if data.get("suggested_action") in SUGGESTED_ACTIONS:
+        classification["suggested_action"] = data["suggested_action"]
+    classification["requires_physical_inspection"] = data.get("requires_physical_inspection") is True
+    if isinstance(data.get("estimated_resolution_time"), str):
+        classification["estimated_resolution_time"] = data["estimated_resolution_time"]
+    return classification
+
+def classify_issue(user_message):
+    """Classify customer issue into categories"""
+    local = local_turn_analysis(user_message)
+    if local['classification_confidence'] >= LOCAL_ANALYSIS_MIN_CONFIDENCE:
+        return local['classification']
+    
+    try:
+        classification = cached_chat_completion(
+            'classification',
+            model="gpt-4",
+            messages=[
+                {
+                    "role": "system",
+                    "content": """Classify the automotive service issue into one of these categories.
+                    Respond ONLY with a JSON object:
+                    {
+                        "category": "mechanical" | "electrical" | "maintenance" | "warranty" | "general_inquiry",
+                        "severity": "low" | "medium" | "high" | "critical",
+                        "requires_physical_inspection": true/false,
+                        "suggested_action": "ai_resolution" | "ar_assistance" | "service_center" | "emergency",
+                        "estimated_resolution_time": "minutes/hours/days"
+                    }"""
+                },
+                {
+                    "role": "user",
+                    "content": user_message
+                }
+            ],
+            temperature=0.2,
+            max_tokens=150,
+            parse=json.loads
+        )
+        
+        return normalize_classification(classification)
+        
+    except Exception as e:
+        return local['classification']
+
+# ================================
+# FUSED TURN ANALYSIS
+# ================================
+
+def analyze_turn(user_message):
+    """Analyze sentiment and classify the issue in a single GPT-4 request"""
+    local = local_turn_analysis(user_message)
+    if min(local['sentiment_confidence'], local['classification_confidence']) >= LOCAL_ANALYSIS_MIN_CONFIDENCE:
+        return local['sentiment'], local['classification']
+    
+    try:
+        analysis = cached_chat_completion(
+            'turn_analysis',
+            model="gpt-4",
+            messages=[
+                {
+                    "role": "system",
+                    "content": """You are an emotional intelligence and triage AI for automotive after-sales service.
+                    Analyze the customer's sentiment and classify their issue.
+                    Respond ONLY with a JSON object:
+                    {
+                        "sentiment": {
+                            "sentiment": "positive" | "neutral" | "negative",
+                            "emotion": "satisfied" | "neutral" | "concerned" | "frustrated" | "angry",
+                            "frustration_score": 0-100,
+                            "key_concerns": ["list", "of", "concerns"],
+                            "escalation_needed": true/false
+                        },
+                        "classification": {
+                            "category": "mechanical" | "electrical" | "maintenance" | "warranty" | "general_inquiry",
+                            "severity": "low" | "medium" | "high" | "critical",
+                            "requires_physical_inspection": true/false,
+                            "suggested_action": "ai_resolution" | "ar_assistance" | "service_center" | "emergency",
+                            "estimated_resolution_time": "minutes/hours/days"
+                        }
+                    }"""
+                },
+                {
+                    "role": "user",
+                    "content": user_message
+                }
+            ],
+            temperature=0.2,
+            max_tokens=300,
+            parse=json.loads
+        )
+        
+        return normalize_sentiment(analysis.get("sentiment")), normalize_classification(analysis.get("classification"))
+        
+    except Exception as e:
+        return local['sentiment'], local['classification']
+
+# ================================
+# LOCAL FAST-PATH ANALYSIS
+# ================================
+
+LOCAL_FEATURE_BUCKETS = 2 ** 12
+
+SENTIMENT_LEXICON = {
+    'thanks': 2.0, 'thank': 2.0, 'great': 2.0, 'excellent': 2.5, 'perfect': 2.5, 'happy': 2.0,
+    'good': 1.0, 'awesome': 2.5, 'love': 2.0, 'helpful': 2.0, 'smooth': 1.0, 'fixed': 1.5,
+    'bad': -1.5, 'worst': -3.0, 'terrible': -3.0, 'horrible': -3.0, 'angry': -3.0, 'frustrated': -2.5,
+    'frustrating': -2.5, 'annoyed': -2.0, 'disappointed': -2.5, 'unacceptable': -3.0, 'ridiculous': -2.5,
+    'useless': -2.5, 'again': -1.0, 'still': -0.5, 'never': -1.0, 'problem': -1.0, 'issue': -0.5,
+    'broken': -1.5, 'noise': -0.5, 'worried': -1.5, 'scared': -2.0, 'waste': -2.0, 'complaint': -2.0
+}
+
+ESCALATION_PHRASES = (
+    'manager', 'supervisor', 'complaint', 'third time', 'legal', 'refund', 'consumer court',
+    'unacceptable', 'speak to a human', 'real person'
+)
+
+ISSUE_KEYWORDS = {
+    'mechanical': ('engine', 'brake', 'brakes', 'noise', 'clicking', 'grinding', 'squeak', 'squeaking', 'vibration',
+                   'clutch', 'gear', 'gearbox', 'transmission', 'suspension', 'steering', 'tyre', 'tire', 'leak', 'smoke'),
+    'electrical': ('battery', 'light', 'lights', 'warning', 'check engine', 'infotainment', 'screen', 'sensor',
+                   'start', 'starting', 'wiring', 'fuse', 'bluetooth', 'ac', 'charging'),
+    'maintenance': ('service', 'oil', 'schedule', 'appointment', 'maintenance', 'filter', 'due', 'regular',
+                    'checkup', 'wash', 'alignment'),
+    'warranty': ('warranty', 'claim', 'guarantee', 'covered', 'coverage', 'extended', 'free replacement'),
+    'general_inquiry': ('price', 'cost', 'hours', 'location', 'history', 'status', 'show', 'how', 'what', 'where')
+}
+
+SEVERITY_KEYWORDS = {
+    'critical': ('smoke', 'fire', 'brakes failed', 'brake failure', 'no brakes', 'accident', 'fuel leak',
+                 'steering locked', 'airbag'),
+    'high': ('burning smell', 'grinding', 'check engine', 'warning light', 'overheating', "won't start",
+             'not starting', 'leak'),
+    'medium': ('noise', 'clicking', 'squeak', 'squeaking', 'vibration', 'rattle', 'wear', 'battery')
+}
+
+# A keyword or lexicon word preceded within NEGATION_WINDOW tokens of its clause by one of these is negated
+NEGATION_WORDS = ('not', 'no', 'never', 'without', 'nothing', 'none', 'neither', 'nor')
+NEGATION_WINDOW = 3
+CLAUSE_PUNCTUATION = ".,;:!?"
+
+# Temperature and keyword-evidence weight grids searched when calibrating on the seed corpus. The seed
+# texts were written around the keyword lists, so evidence is capped at the model's own score scale (±1 targets)
+# rather than left to outweigh it
+CALIBRATION_TEMPERATURES = np.linspace(0.5, 6.0, 23)
+CALIBRATION_EVIDENCE_WEIGHTS = np.linspace(0.0, 2.0, 9)
+
+AR_GUIDANCE_PHRASES = ('how do i check', 'where is', 'show me how', 'visual', 'guide me', 'dipstick', 'locate')
+
+# Small labelled seed corpus the hashed n-gram model is fitted on at startup
+LOCAL_SEED_CORPUS = [
+    ("Thanks a lot, the service was excellent", 'positive', 'general_inquiry'),
+    ("Great job, my car runs smooth now", 'positive', 'maintenance'),
+    ("I love the new infotainment update", 'positive', 'electrical'),
+    ("Perfect, that fixed the problem, thank you", 'positive', 'general_inquiry'),
+    ("Very happy with the brake replacement", 'positive', 'mechanical'),
+    ("The warranty claim was processed quickly, thanks", 'positive', 'warranty'),
+    ("Can you show me my vehicle's current health status?", 'neutral', 'general_inquiry'),
+    ("Show me my service history", 'neutral', 'general_inquiry'),
+    ("What are your service center hours?", 'neutral', 'general_inquiry'),
+    ("How much does a regular service cost?", 'neutral', 'general_inquiry'),
+    ("I want to schedule a service appointment", 'neutral', 'maintenance'),
+    ("I need to schedule my regular service", 'neutral', 'maintenance'),
+    ("When is my next oil change due?", 'neutral', 'maintenance'),
+    ("Please book a wheel alignment and oil filter change", 'neutral', 'maintenance'),
+    ("Is the battery covered under warranty?", 'neutral', 'warranty'),
+    ("How do I extend my warranty coverage?", 'neutral', 'warranty'),
+    ("I need visual guidance for my issue", 'neutral', 'general_inquiry'),
+    ("Where is the oil dipstick located?", 'neutral', 'maintenance'),
+    ("My car's engine is making a clicking sound", 'negative', 'mechanical'),
+    ("There's a burning smell from the brakes", 'negative', 'mechanical'),
+    ("The brakes are squeaking when I stop", 'negative', 'mechanical'),
+    ("Grinding noise from the gearbox when shifting", 'negative', 'mechanical'),
+    ("Steering wheel vibrates at high speed", 'negative', 'mechanical'),
+    ("The clutch feels hard and slips", 'negative', 'mechanical'),
+    ("Oil is leaking under the engine", 'negative', 'mechanical'),
+    ("The check engine light came on this morning", 'negative', 'electrical'),
+    ("Car won't start, battery seems dead", 'negative', 'electrical'),
+    ("Infotainment screen keeps freezing", 'negative', 'electrical'),
+    ("Headlights flicker at night", 'negative', 'electrical'),
+    ("Parking sensor warning keeps beeping", 'negative', 'electrical'),
+    ("AC is not cooling at all", 'negative', 'electrical'),
+    ("My warranty claim was rejected, this is unacceptable", 'negative', 'warranty'),
+    ("You charged me for a part that should be covered by warranty", 'negative', 'warranty'),
+    ("This is the third time the same problem came back, I'm furious", 'negative', 'mechanical'),
+    ("Worst service ever, nobody fixed my car", 'negative', 'general_inquiry'),
+    ("I am very frustrated, I want to speak to a manager", 'negative', 'general_inquiry'),
+    ("The service center kept my car for two months, terrible", 'negative', 'maintenance'),
+    ("Smoke is coming out of the bonnet", 'negative', 'mechanical'),
+    ("My brakes failed on the highway", 'negative', 'mechanical'),
+    ("The oil change was overpriced and disappointing", 'negative', 'maintenance')
+]
+
+def tokenize_text(text):
+    """Lowercase word tokens used by the local analyzer, with clause punctuation kept as "." tokens"""
+    return "".join(
+        ch if ch.isalnum() or ch == "'" else " . " if ch in CLAUSE_PUNCTUATION else " " for ch in text.lower()
+    ).split()
+
+def is_negated(tokens, index):
+    """Whether a negation word appears shortly before tokens[index] in the same clause"""
+    for token in reversed(tokens[max(index - NEGATION_WINDOW, 0):index]):
+        if token == ".":
+            return False
+        if token in NEGATION_WORDS or token.endswith("n't"):
+            return True
+    return False
+
+def mark_negation(tokens):
+    """Prefix tokens in a negation's scope with not_, so a negated keyword is its own feature"""
+    return ["not_" + token if is_negated(tokens, i) else token for i, token in enumerate(tokens)]
+
+def hashed_ngram_features(texts):
+    """Vectorize texts into L2-normalized hashed unigram + bigram counts"""
+    features = np.zeros((len(texts), LOCAL_FEATURE_BUCKETS), dtype=np.float32)
+    
+    for row, text in enumerate(texts):
+        tokens = [token for token in mark_negation(tokenize_text(text)) if token != "."]
+        grams = tokens + [a + " " + b for a, b in zip(tokens, tokens[1:])]
+        if not grams:
+            continue
+        buckets = [zlib.crc32(gram.encode()) % LOCAL_FEATURE_BUCKETS for gram in grams]
+        features[row] = np.bincount(buckets, minlength=LOCAL_FEATURE_BUCKETS)
+    
+    norms = np.linalg.norm(features, axis=1, keepdims=True)
+    return features / np.maximum(norms, 1e-9)
+
+def softmax(scores):
+    """Row-wise softmax"""
+    shifted = np.exp(scores - scores.max(axis=-1, keepdims=True))
+    return shifted / shifted.sum(axis=-1, keepdims=True)
+
+def mentions_keyword(tokens, keyword):
+    """Whether the keyword (a word or phrase) occurs at least once without being negated"""
+    parts = keyword.split()
+    return any(
+        tokens[i:i + len(parts)] == parts and not is_negated(tokens, i)
+        for i in range(len(tokens) - len(parts) + 1)
+    )
+
+def lexicon_polarity(tokens):
+    """Summed lexicon polarity, flipping words under negation ("not happy", "not bad")"""
+    return sum(
+        SENTIMENT_LEXICON.get(token, 0.0) * (-1 if is_negated(tokens, i) else 1)
+        for i, token in enumerate(tokens)
+    )
+
+def sentiment_evidence(tokens):
+    """Lexicon polarity as bounded (positive, neutral, negative) evidence"""
+    polarity = np.tanh(lexicon_polarity(tokens) / 2)
+    return np.array([max(polarity, 0.0), -abs(polarity) / 2, max(-polarity, 0.0)], dtype=np.float32)
+
+def category_evidence(tokens):
+    """Unnegated keyword hits per issue category, grown sublinearly so hits cannot swamp the model"""
+    return np.log1p(np.array([
+        sum(1 for keyword in ISSUE_KEYWORDS[category] if mentions_keyword(tokens, keyword))
+        for category in ISSUE_CATEGORIES
+    ], dtype=np.float32))
+
+class LocalTurnAnalyzer:
+    """Keyword lexicon plus hashed n-gram linear model producing sentiment and classification offline
+    
+    Model scores and keyword evidence are combined with a temperature and evidence weight chosen
+    to minimize leave-one-out log loss on the seed corpus, so the reported confidences track how
+    often the fast path is actually right. The model has no severity or action head: those come
+    from keyword rules only, so a turn that would raise a banner is never answered locally.
+    """
+    
+    def __init__(self, corpus, ridge=0.1):
+        texts = [text for text, _, _ in corpus]
+        features = hashed_ngram_features(texts)
+        tokens = [tokenize_text(text) for text in texts]
+        
+        sentiment_labels = [SENTIMENT_VALUES.index(label) for _, label, _ in corpus]
+        category_labels = [ISSUE_CATEGORIES.index(label) for _, _, label in corpus]
+        sentiment_targets = self._one_hot(sentiment_labels, len(SENTIMENT_VALUES))
+        category_targets = self._one_hot(category_labels, len(ISSUE_CATEGORIES))
+        targets = np.hstack([sentiment_targets, category_targets])
+        
+        # Ridge regression in dual form: the corpus is far smaller than the feature space
+        kernel = features @ features.T
+        inverse = np.linalg.inv(kernel + ridge * np.eye(len(texts), dtype=np.float32))
+        weights = features.T @ (inverse @ targets)
+        self.sentiment_weights = weights[:, :len(SENTIMENT_VALUES)]
+        self.category_weights = weights[:, len(SENTIMENT_VALUES):]
+        
+        # Closed-form leave-one-out scores: each text scored by a model fitted without it
+        hat = kernel @ inverse
+        leverage = np.diag(hat)[:, None]
+        loo_scores = (hat @ targets - leverage * targets) / (1 - leverage)
+        
+        self.sentiment_temperature, self.sentiment_evidence_weight = self._calibrate(
+            loo_scores[:, :len(SENTIMENT_VALUES)], np.array([sentiment_evidence(t) for t in tokens]), sentiment_labels
+        )
+        self.category_temperature, self.category_evidence_weight = self._calibrate(
+            loo_scores[:, len(SENTIMENT_VALUES):], np.array([category_evidence(t) for t in tokens]), category_labels
+        )
+    
+    @staticmethod
+    def _one_hot(labels, classes):
+        targets = np.full((len(labels), classes), -1.0, dtype=np.float32)
+        targets[np.arange(len(labels)), labels] = 1.0
+        return targets
+    
+    @staticmethod
+    def _calibrate(scores, evidence, labels):
+        """(temperature, evidence weight) minimizing log loss of held-out predictions"""
+        best = None
+        for weight in CALIBRATION_EVIDENCE_WEIGHTS:
+            for temperature in CALIBRATION_TEMPERATURES:
+                probs = softmax((scores + weight * evidence) * temperature)
+                loss = -np.log(np.maximum(probs[np.arange(len(labels)), labels], 1e-9)).mean()
+                if best is None or loss < best[0]:
+                    best = (loss, float(temperature), float(weight))
+        return best[1], best[2]
+    
+    def analyze(self, text):
+        """Return sentiment and classification dicts with a confidence for each"""
+        lowered = text.lower()
+        tokens = tokenize_text(text)
+        features = hashed_ngram_features([text])[0]
+        
+        polarity = lexicon_polarity(tokens)
+        sentiment_probs = softmax(
+            (features @ self.sentiment_weights + self.sentiment_evidence_weight * sentiment_evidence(tokens))
+            * self.sentiment_temperature
+        )
+        category_probs = softmax(
+            (features @ self.category_weights + self.category_evidence_weight * category_evidence(tokens))
+            * self.category_temperature
+        )
+        
+        sentiment = SENTIMENT_VALUES[int(sentiment_probs.argmax())]
+        category = ISSUE_CATEGORIES[int(category_probs.argmax())]
+        severity = self._severity(tokens)
+        
+        # Frustration grows with negative polarity, shouting and repeat-contact language
+        frustration = float(sentiment_probs[2]) * 40 + max(-polarity, 0.0) * 12
+        frustration += 10 * min(text.count("!"), 3)
+        if len(text) > 8 and text.isupper():
+            frustration += 20
+        escalation_phrase = any(phrase in lowered for phrase in ESCALATION_PHRASES)
+        if escalation_phrase:
+            frustration += 25
+        frustration_score = int(min(frustration, 100))
+        
+        if frustration_score >= 75:
+            emotion = "angry"
+        elif frustration_score >= 50:
+            emotion = "frustrated"
+        elif sentiment == "positive":
+            emotion = "satisfied"
+        elif sentiment == "negative" or severity != "low":
+            emotion = "concerned"
+        else:
+            emotion = "neutral"
+        
+        if severity == "critical":
+            suggested_action = "emergency"
+        elif any(phrase in lowered for phrase in AR_GUIDANCE_PHRASES):
+            suggested_action = "ar_assistance"
+        elif category in ("mechanical", "electrical") and severity in ("medium", "high"):
+            suggested_action = "service_center"
+        else:
+            suggested_action = "ai_resolution"
+        
+        return {
+            'sentiment': normalize_sentiment({
+                "sentiment": sentiment,
+                "emotion": emotion,
+                "frustration_score": frustration_score,
+                "key_concerns": [
+                    keyword for category_name in ("mechanical", "electrical", "maintenance", "warranty")
+                    for keyword in ISSUE_KEYWORDS[category_name] if mentions_keyword(tokens, keyword)
+                ],
+                "escalation_needed": escalation_phrase or frustration_score > 70
+            }),
+            'sentiment_confidence': float(sentiment_probs.max()),
+            'classification': normalize_classification({
+                "category": category,
+                "severity": severity,
+                "requires_physical_inspection": suggested_action in ("service_center", "emergency"),
+                "suggested_action": suggested_action,
+                "estimated_resolution_time": {
+                    "ai_resolution": "minutes", "ar_assistance": "hours", "service_center": "days", "emergency": "hours"
+                }[suggested_action]
+            }),
+            # Severity and action drive the inspection and emergency banners but come from keyword
+            # rules alone, so any turn that would raise one is left to GPT-4 to confirm
+            'classification_confidence': float(category_probs.max()) if suggested_action == "ai_resolution" else 0.0
+        }
+    
+    @staticmethod
+    def _severity(tokens):
+        for severity in ("critical", "high", "medium"):
+            if any(mentions_keyword(tokens, keyword) for keyword in SEVERITY_KEYWORDS[severity]):
+                return severity
+        return "low"
+
+@st.cache_resource
+def get_local_analyzer():
+    """Local analyzer fitted once per process on the seed corpus"""
+    return LocalTurnAnalyzer(LOCAL_SEED_CORPUS)
+
+def local_turn_analysis(text):
+    """Offline sentiment and classification with per-field confidence"""
+    return get_local_analyzer().analyze(text)
+
+# ================================
+# CONCURRENT TURN PIPELINE
+# ================================
+
+@st.cache_resource
+def get_turn_executor():
+    """Process-wide bounded thread pool shared by every session's chat turns"""
+    return ThreadPoolExecutor(max_workers=TURN_POOL_MAX_WORKERS, thread_name_prefix="nexaserve-turn")
+
+def submit_turn_analysis(user_message):
+    """Start sentiment and classification on the shared pool and return a join callable"""
+    executor = get_turn_executor()
+    
+    if TURN_ANALYSIS_MODE == "split":
+        sentiment_future = executor.submit(analyze_sentiment, user_message)
+        classification_future = executor.submit(classify_issue, user_message)
+        return lambda: (sentiment_future.result(), classification_future.result())
+    
+    return executor.submit(analyze_turn, user_message).result
+
+def run_chat_turn(user_message):
+    """Fan out sentiment, classification and reply generation for one turn and join them"""
+    
+    # Session state is only readable on the script thread, so snapshot it before fanning out
+    context = build_response_context()
+    
+    response_future = get_turn_executor().submit(generate_ai_response, user_message, context)
+    join_analysis = submit_turn_analysis(user_message)
+    sentiment_data, issue_classification = join_analysis()
+    response = response_future.result()
+    submit_context_summary(context)
+    
+    return {
+        'sentiment': sentiment_data,
+        'classification': issue_classification,
+        'response': response
+    }
+
+def apply_turn_analysis(sentiment_data, issue_classification):
+    """Record a turn's sentiment and classification in session state"""
+    update_sentiment_tracking(sentiment_data)
+    st.session_state.current_issue = issue_classification
+
+TURN_RECOMMENDATION_SUFFIXES = {
+    'ar_assistance': "\n\n🎥 **Recommendation:** This issue would benefit from AR visual guidance. Would you like to start an AR session with our expert?",
+    'service_center': "\n\n🔧 **Recommendation:** This requires physical inspection. I can help you schedule an appointment at the nearest service center.",
+    'critical': "\n\n🚨 **URGENT:** This appears to be a safety-critical issue. I'm escalating this to our emergency support team immediately.",
+    'escalation': "\n\n👨‍💼 **Auto-Escalation:** I've detected your frustration. Connecting you with a senior service advisor now..."
+}
+
+def append_turn_recommendations(ai_response, sentiment_data, issue_classification):
+    """Append classification and escalation suffixes to the assistant reply"""
+    
+    # Add contextual information based on classification
+    if issue_classification['suggested_action'] == 'ar_assistance':
+        ai_response += TURN_RECOMMENDATION_SUFFIXES['ar_assistance']
+    elif issue_classification['suggested_action'] == 'service_center':
+        ai_response += TURN_RECOMMENDATION_SUFFIXES['service_center']
+    elif issue_classification['severity'] == 'critical':
+        ai_response += TURN_RECOMMENDATION_SUFFIXES['critical']
+    
+    # Check for escalation
+    if sentiment_data.get('escalation_needed'):
+        ai_response += TURN_RECOMMENDATION_SUFFIXES['escalation']
+    
+    return ai_response
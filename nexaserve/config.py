@@ -0,0 +1,167 @@
+"""Runtime configuration: tunables and NEXASERVE_* environment overrides"""
+
+import os
+import warnings
+
+# Concurrent chat turn pipeline: sentiment, classification and reply run side by side
+TURN_POOL_MAX_WORKERS = 8
+
+# "fused" sends one combined sentiment + classification request per turn, "split" keeps the two-call path
+TURN_ANALYSIS_MODE = os.getenv("NEXASERVE_TURN_ANALYSIS_MODE", "fused")
+
+# Stream reply tokens into the chat bubble instead of waiting for the full completion
+STREAM_AI_RESPONSES = os.getenv("NEXASERVE_STREAM_RESPONSES", "1") == "1"
+
+# Background jobs (image analysis, voice, booking): pool size and how often the UI polls their progress (seconds)
+JOB_POOL_MAX_WORKERS = 4
+JOB_POLL_INTERVAL_S = 0.5
+
+# Latency injection for demos and load tests, e.g. "image_analysis=2,voice=1,booking=2" or "*=0.5" (seconds)
+def parse_injected_latency(spec):
+    """Operation -> delay seconds from a latency spec; malformed entries are skipped with a warning"""
+    delays = {}
+    for part in spec.split(','):
+        if not part.strip():
+            continue
+        name, _, seconds = part.partition('=')
+        try:
+            delay = float(seconds)
+        except ValueError:
+            delay = None
+        if not name.strip() or delay is None or not 0 <= delay < float('inf'):
+            warnings.warn(f"NEXASERVE_INJECT_LATENCY: ignoring {part.strip()!r}, expected operation=seconds")
+            continue
+        delays[name.strip()] = delay
+    return delays
+
+INJECTED_LATENCY_S = parse_injected_latency(os.getenv("NEXASERVE_INJECT_LATENCY", ""))
+
+# Content-addressed LLM response cache: size bound, per-call-type TTLs (seconds) and optional SQLite file
+LLM_CACHE_MAX_ENTRIES = 2048
+LLM_CACHE_TTLS = {
+    'sentiment': 24 * 3600,
+    'classification': 24 * 3600,
+    'turn_analysis': 24 * 3600,
+    'response': 15 * 60,
+    'summary': 24 * 3600
+}
+LLM_CACHE_DB_PATH = os.getenv("NEXASERVE_LLM_CACHE_DB")
+
+# Local fast-path answers without GPT-4 when its confidence reaches this level
+LOCAL_ANALYSIS_MIN_CONFIDENCE = 0.75
+
+# OpenAI client: credentials, connection pool, per-call deadlines (seconds), retries and circuit breaker
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL")
+LLM_POOL_MAX_CONNECTIONS = 20
+LLM_POOL_MAX_KEEPALIVE = 10
+LLM_KEEPALIVE_EXPIRY_S = 30
+LLM_CONNECT_TIMEOUT_S = 5
+LLM_DEADLINES = {
+    'sentiment': 8,
+    'classification': 8,
+    'turn_analysis': 10,
+    'response': 30,
+    'summary': 10,
+    'vision': 45,
+    'transcription': 20,
+    'default': 30
+}
+LLM_MAX_RETRIES = 3
+LLM_BACKOFF_BASE_S = 0.5
+LLM_BACKOFF_MAX_S = 8
+LLM_BREAKER_FAILURE_THRESHOLD = 5
+LLM_BREAKER_RESET_S = 30
+
+# Image diagnosis: "openai" (vision model) or "stub" (local, deterministic); images are sent at most
+# VISION_MAX_EDGE px on the long side, re-encoded as VISION_FORMAT
+VISION_BACKEND = os.getenv("NEXASERVE_VISION_BACKEND", "openai" if OPENAI_API_KEY else "stub")
+VISION_MODEL = os.getenv("NEXASERVE_VISION_MODEL", "gpt-4o")
+VISION_MAX_EDGE = 1024
+VISION_FORMAT = os.getenv("NEXASERVE_VISION_FORMAT", "JPEG")
+VISION_QUALITY = 85
+# Diagnosis cache keyed by perceptual hash; re-uploads within this many differing hash bits are hits
+VISION_CACHE_SIZE = 512
+VISION_HASH_MAX_DISTANCE = 4
+# Photos per diagnosis, images per model request and worker processes decoding uploads
+VISION_MAX_UPLOADS = 8
+VISION_BATCH_SIZE = 8
+IMAGE_POOL_MAX_WORKERS = min(4, os.cpu_count() or 1)
+
+# Voice input: "openai" (Whisper) or "stub" (local, deterministic); audio is resampled to STT_SAMPLE_RATE
+# mono and transcribed STT_CHUNK_SECONDS at a time so partial transcripts show while it is processed.
+# Chunks overlap by STT_CHUNK_OVERLAP_SECONDS so words cut at a boundary are heard whole in one of them
+STT_BACKEND = os.getenv("NEXASERVE_STT_BACKEND", "openai" if OPENAI_API_KEY else "stub")
+STT_MODEL = os.getenv("NEXASERVE_STT_MODEL", "whisper-1")
+STT_SAMPLE_RATE = 16000
+STT_CHUNK_SECONDS = 5.0
+STT_CHUNK_OVERLAP_SECONDS = 1.0
+STT_MAX_SECONDS = 120
+STT_SILENCE_RMS = 0.01
+
+# Reply context: token budget for history, per-message cap and running summary size
+CONTEXT_HISTORY_TOKEN_BUDGET = 1200
+CONTEXT_MESSAGE_MAX_TOKENS = 300
+CONTEXT_SUMMARY_MAX_TOKENS = 160
+
+# Session storage: "memory" (process-local) or "sqlite" (WAL file shared by replicas on the host)
+SESSION_STORE_BACKEND = os.getenv("NEXASERVE_STORE", "memory")
+SESSION_STORE_PATH = os.getenv("NEXASERVE_STORE_PATH", "nexaserve.db")
+STORE_BATCH_SIZE = 50
+HISTORY_PAGE_SIZE = 20
+
+# Chat transcript: messages rendered live, the rest collapsed into pages; rendered-bubble cache size
+CHAT_LIVE_WINDOW = 12
+CHAT_HTML_CACHE_SIZE = 4096
+
+# Hash-chained service ledger: append-only file and Merkle checkpoint spacing (entries)
+LEDGER_PATH = os.getenv("NEXASERVE_LEDGER_PATH", "nexaserve-ledger.jsonl")
+LEDGER_CHECKPOINT_INTERVAL = 1024
+LEDGER_DERIVED_FIELDS = ('blockchain_hash', 'prev_hash', 'ledger_seq')
+
+# Service history view: records per page and size of the rendered-card cache
+SERVICE_HISTORY_PAGE_SIZE = 10
+SERVICE_CARD_CACHE_SIZE = 4096
+SERVICE_RECORD_TYPES = ["Appointment Scheduled", "AR Remote Assistance", "AI Visual Diagnosis"]
+
+# Predictive maintenance rules: JSON or YAML spec, checked for changes at most this often (seconds)
+MAINTENANCE_RULES_PATH = os.getenv(
+    "NEXASERVE_RULES_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "maintenance_rules.json")
+)
+RULES_RELOAD_CHECK_S = 2.0
+
+# Memoized twin predictions and dashboard figures, keyed by twin fingerprint
+TWIN_VIEW_CACHE_ENTRIES = 256
+
+# Telemetry feed: "file:<path>", "tcp:<host>:<port>" or "queue" (in-process); empty disables ingestion
+TELEMETRY_SOURCE = os.getenv("NEXASERVE_TELEMETRY_SOURCE", "")
+TELEMETRY_BATCH_FRAMES = 4096
+
+# Twin metric history: rollup tiers as (bucket width seconds, buckets kept); a path keeps them in memory-mapped files
+HISTORY_TIERS = {
+    '1m': (60, 180),
+    '1h': (3600, 168),
+    '1d': (86400, 365)
+}
+HISTORY_PATH = os.getenv("NEXASERVE_HISTORY_PATH", "")
+# Vehicles per rollup block; the fleet grows a block at a time without copying existing history
+HISTORY_BLOCK_VEHICLES = 1024
+
+# Remaining-useful-life forecasting over the metric history
+RUL_DEFAULT_TIER = '1h'
+RUL_MIN_POINTS = 3
+RUL_ROBUST_ITERATIONS = 3
+RUL_CONFIDENCE_Z = 1.96
+RUL_MAX_DAYS = 730
+
+# Appointment slot inventory: bookable horizon, daily time blocks and optimal-slot ranking weights (lower score wins)
+SLOT_HORIZON_DAYS = 60
+SLOT_TIMES = ['09:00 AM', '11:00 AM', '02:00 PM', '04:00 PM', '06:00 PM']
+SLOT_SEARCH_WINDOW_DAYS = 14
+SLOT_SEARCH_RESULTS = 5
+SLOT_SCORE_WEIGHTS = {'proximity': 1.0, 'skill': 2.0, 'parts': 6.0, 'utilization': 3.0}
+PARTS_RESTOCK_DAYS = 3
+
+# Bookings commit transactionally to SQLite so replicas on the host cannot double-book a slot
+BOOKING_STORE_PATH = os.getenv("NEXASERVE_BOOKING_PATH", SESSION_STORE_PATH)
+BOOKING_BUSY_TIMEOUT_S = 10.0
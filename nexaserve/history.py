@@ -0,0 +1,398 @@
+"""Per-vehicle metric history rollups and remaining-useful-life forecasting"""
+
+import streamlit as st
+import os
+import time
+import numpy as np
+from array import array
+import threading
+
+from .config import (
+    HISTORY_TIERS, HISTORY_BLOCK_VEHICLES, RUL_DEFAULT_TIER, RUL_MIN_POINTS, RUL_ROBUST_ITERATIONS, RUL_CONFIDENCE_Z,
+    RUL_MAX_DAYS
+)
+
+# ================================
+# METRIC HISTORY
+# ================================
+
+class RollupRing:
+    """Fixed-size ring of time buckets per (vehicle, metric) holding mean/min/max/count
+    
+    Slot = bucket % slots, so a vehicle's footprint never grows: a newer bucket landing
+    on a slot evicts the old one for every metric, as a vehicle's metrics share one bucket
+    per slot. A cell is a float32 mean/min/max and a uint16 count; once the count saturates
+    the mean keeps tracking new samples at that weight. Vehicles are allocated in zero-filled
+    blocks of HISTORY_BLOCK_VEHICLES, so slots that were never written take no resident memory
+    and a growing fleet never copies existing history. With a directory the blocks are
+    memory-mapped .npy segments that survive restarts.
+    """
+    
+    FIELDS = {
+        'mean': np.float32,
+        'min': np.float32,
+        'max': np.float32,
+        'count': np.uint16
+    }
+    BUCKET_DTYPE = np.int32
+    COUNT_MAX = np.iinfo(np.uint16).max
+    
+    def __init__(self, width, slots, metrics, directory=None, name=None, block_rows=HISTORY_BLOCK_VEHICLES):
+        self.width = width
+        self.slots = slots
+        self.metrics = metrics
+        self.directory = directory
+        self.name = name
+        self.block_rows = block_rows
+        self.blocks = []
+        # A block's count segment is created last, so its presence means the block is whole
+        while self.directory and os.path.exists(self._segment_path(len(self.blocks), 'count')):
+            index = len(self.blocks)
+            self.blocks.append({
+                field: np.lib.format.open_memmap(self._segment_path(index, field), mode='r+')
+                for field in self._layout()
+            })
+    
+    def _segment_path(self, index, field):
+        return os.path.join(self.directory, f"{self.name}.{index:04d}.{field}.npy") if self.directory else None
+    
+    def _layout(self):
+        layout = {'bucket': (self.BUCKET_DTYPE, (self.block_rows, self.slots))}
+        for field, dtype in self.FIELDS.items():
+            layout[field] = (dtype, (self.block_rows, self.metrics, self.slots))
+        return layout
+    
+    def _allocate(self, index):
+        """A zero-filled block; pages are only backed once written"""
+        block = {}
+        for field, (dtype, shape) in self._layout().items():
+            path = self._segment_path(index, field)
+            if path:
+                segment = np.lib.format.open_memmap(path + '.tmp', mode='w+', dtype=dtype, shape=shape)
+                del segment
+                os.replace(path + '.tmp', path)
+                segment = np.lib.format.open_memmap(path, mode='r+')
+            else:
+                segment = np.zeros(shape, dtype=dtype)
+            block[field] = segment
+        return block
+    
+    @property
+    def capacity(self):
+        return len(self.blocks) * self.block_rows
+    
+    def reserve(self, rows):
+        """Grow to hold at least rows vehicles"""
+        while self.capacity < rows:
+            self.blocks.append(self._allocate(len(self.blocks)))
+    
+    def bytes_per_row(self):
+        """Footprint of one vehicle in this ring"""
+        cell = sum(np.dtype(dtype).itemsize for dtype in self.FIELDS.values())
+        return self.slots * (np.dtype(self.BUCKET_DTYPE).itemsize + self.metrics * cell)
+    
+    def _by_block(self, rows):
+        """(block, run, block-local rows) for each run of sorted rows that share a block"""
+        blocks = rows // self.block_rows
+        edges = np.flatnonzero(np.r_[True, blocks[1:] != blocks[:-1], True])
+        for start, end in zip(edges[:-1].tolist(), edges[1:].tolist()):
+            block = int(blocks[start])
+            yield self.blocks[block], slice(start, end), rows[start:end] - block * self.block_rows
+    
+    def add(self, rows, metrics, ts, values):
+        """Fold samples into their buckets; samples older than the slot's current bucket are dropped"""
+        if not len(ts):
+            return
+        buckets = np.floor(ts / self.width).astype(np.int64)
+        lanes = rows * self.slots + buckets % self.slots
+        order = np.argsort(lanes * self.metrics + metrics)
+        lanes, metrics, buckets, values = lanes[order], metrics[order], buckets[order], values[order]
+        
+        # Each vehicle slot moves to the newest bucket it sees, clearing what every metric held there
+        starts = np.flatnonzero(np.r_[True, lanes[1:] != lanes[:-1]])
+        slot_rows = lanes[starts] // self.slots
+        newest = np.maximum.reduceat(buckets, starts)
+        for block, run, local in self._by_block(slot_rows):
+            lane = local * self.slots + lanes[starts[run]] % self.slots
+            stored = block['bucket'].reshape(-1)[lane]
+            newest[run] = np.maximum(newest[run], stored)
+            claimed = newest[run] > stored
+            block['bucket'].reshape(-1)[lane[claimed]] = newest[run][claimed]
+            block['count'][local[claimed], :, lane[claimed] % self.slots] = 0
+        
+        keep = buckets == np.repeat(newest, np.diff(np.r_[starts, len(lanes)]))
+        lanes, metrics, values = lanes[keep], metrics[keep], values[keep]
+        if not len(lanes):
+            return
+        
+        # One group per (vehicle slot, metric), merged into the stored cell
+        starts = np.flatnonzero(np.r_[True, (lanes[1:] != lanes[:-1]) | (metrics[1:] != metrics[:-1])])
+        sums = np.add.reduceat(values, starts, dtype=np.float64)
+        mins = np.minimum.reduceat(values, starts)
+        maxs = np.maximum.reduceat(values, starts)
+        counts = np.diff(np.r_[starts, len(values)])
+        lanes, metrics = lanes[starts], metrics[starts]
+        for block, run, local in self._by_block(lanes // self.slots):
+            cells = (local * self.metrics + metrics[run]) * self.slots + lanes[run] % self.slots
+            flat = {field: segment.reshape(-1) for field, segment in block.items()}
+            stored = flat['count'][cells].astype(np.int64)
+            empty = stored == 0
+            total = stored + counts[run]
+            mean = flat['mean'][cells].astype(np.float64)
+            flat['mean'][cells] = mean + (sums[run] - counts[run] * mean) / total
+            flat['min'][cells] = np.where(empty, mins[run], np.minimum(flat['min'][cells], mins[run]))
+            flat['max'][cells] = np.where(empty, maxs[run], np.maximum(flat['max'][cells], maxs[run]))
+            flat['count'][cells] = np.minimum(total, self.COUNT_MAX)
+    
+    def query(self, row, metric, start=None, end=None):
+        """Buckets of one series overlapping [start, end] seconds, oldest first"""
+        block = self.blocks[row // self.block_rows]
+        local = row % self.block_rows
+        buckets = block['bucket'][local].astype(np.int64)
+        valid = block['count'][local, metric] > 0
+        if start is not None:
+            valid &= buckets >= int(start // self.width)
+        if end is not None:
+            valid &= buckets <= int(end // self.width)
+        slots = np.flatnonzero(valid)
+        slots = slots[np.argsort(buckets[slots])]
+        return {
+            'ts': buckets[slots] * self.width,
+            'mean': block['mean'][local, metric, slots].astype(np.float64),
+            'min': block['min'][local, metric, slots].astype(np.float64),
+            'max': block['max'][local, metric, slots].astype(np.float64),
+            'count': block['count'][local, metric, slots].astype(np.int64)
+        }
+    
+    def series(self, rows, metric):
+        """Bucket, mean and count arrays of shape (len(rows), slots) for one metric of sorted rows"""
+        buckets = np.empty((len(rows), self.slots), dtype=np.int64)
+        means = np.empty((len(rows), self.slots), dtype=np.float64)
+        counts = np.empty((len(rows), self.slots), dtype=np.int64)
+        for block, run, local in self._by_block(rows):
+            buckets[run] = block['bucket'][local]
+            means[run] = block['mean'][local, metric]
+            counts[run] = block['count'][local, metric]
+        return buckets, means, counts
+    
+    def flush(self):
+        for block in self.blocks:
+            for segment in block.values():
+                if isinstance(segment, np.memmap):
+                    segment.flush()
+
+class MetricHistoryStore:
+    """Per-vehicle, per-metric rollups at every HISTORY_TIERS resolution, addressed by telemetry vehicle key"""
+    
+    def __init__(self, signals, directory=None, tiers=HISTORY_TIERS):
+        self.signals = signals
+        self.signal_codes = {name: code for code, name in enumerate(signals)}
+        self.directory = directory or None
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+        self.tiers = {
+            name: RollupRing(width, slots, len(signals), directory=self.directory, name=name)
+            for name, (width, slots) in tiers.items()
+        }
+        self.row_index = {}
+        self.keys = array('I')
+        if self.directory and os.path.exists(self._keys_path()):
+            with open(self._keys_path(), 'rb') as f:
+                self.keys.frombytes(f.read())
+            self.row_index = {key: row for row, key in enumerate(self.keys)}
+        # Bumped whenever a vehicle receives samples so derived fits know what to refresh
+        self.row_versions = np.zeros(len(self.keys), dtype=np.int64)
+        self.lock = threading.Lock()
+    
+    def _keys_path(self):
+        return os.path.join(self.directory, 'vehicles.u32')
+    
+    def _rows(self, vehicle_keys):
+        unique, inverse = np.unique(vehicle_keys, return_inverse=True)
+        rows = np.empty(len(unique), dtype=np.int64)
+        added = []
+        for i, key in enumerate(unique.tolist()):
+            row = self.row_index.get(key)
+            if row is None:
+                row = self.row_index[key] = len(self.keys)
+                self.keys.append(key)
+                added.append(key)
+            rows[i] = row
+        if added:
+            for ring in self.tiers.values():
+                ring.reserve(len(self.keys))
+            self.row_versions = np.concatenate([self.row_versions, np.zeros(len(added), dtype=np.int64)])
+            if self.directory:
+                with open(self._keys_path(), 'ab') as f:
+                    f.write(array('I', added).tobytes())
+        return rows[inverse]
+    
+    def record(self, vehicle_keys, signals, ts, values):
+        """Fold a batch of readings into every rollup tier"""
+        with self.lock:
+            rows = self._rows(vehicle_keys)
+            for ring in self.tiers.values():
+                ring.add(rows, signals.astype(np.int64), ts, values)
+            self.row_versions[np.unique(rows)] += 1
+    
+    def row_version(self, vehicle_key):
+        """Sample-arrival counter for one vehicle, 0 if it has no history"""
+        row = self.row_index.get(vehicle_key)
+        return 0 if row is None else int(self.row_versions[row])
+    
+    def query(self, vehicle_key, metric, tier='1h', start=None, end=None):
+        """Rolled-up series for one vehicle metric: dict of ts/mean/min/max/count arrays"""
+        with self.lock:
+            row = self.row_index.get(vehicle_key)
+            if row is None or metric not in self.signal_codes:
+                return None
+            return self.tiers[tier].query(row, self.signal_codes[metric], start, end)
+    
+    def bytes_per_vehicle(self):
+        """Fixed history footprint of one vehicle across all tiers"""
+        return sum(ring.bytes_per_row() for ring in self.tiers.values())
+    
+    def flush(self):
+        with self.lock:
+            for ring in self.tiers.values():
+                ring.flush()
+
+# ================================
+# REMAINING USEFUL LIFE FORECASTING
+# ================================
+
+RUL_FIT_KINDS = ('linear', 'exponential')
+
+def weighted_linear_fit(x, y, w):
+    """Row-wise weighted least squares y = intercept + slope * x; returns (slope, intercept, slope standard error)"""
+    sw = w.sum(axis=1)
+    sx = (w * x).sum(axis=1)
+    sy = (w * y).sum(axis=1)
+    sxx = (w * x * x).sum(axis=1)
+    sxy = (w * x * y).sum(axis=1)
+    denom = sw * sxx - sx * sx
+    safe = np.where(denom > 0, denom, 1.0)
+    slope = np.where(denom > 0, (sw * sxy - sx * sy) / safe, 0.0)
+    intercept = (sy - slope * sx) / np.maximum(sw, 1e-12)
+    residuals = y - (intercept[:, None] + slope[:, None] * x)
+    dof = np.maximum((w > 0).sum(axis=1) - 2, 1)
+    variance = (w * residuals ** 2).sum(axis=1) / dof
+    stderr = np.where(denom > 0, np.sqrt(variance * sw / safe), np.inf)
+    return slope, intercept, stderr
+
+def masked_row_median(values, mask):
+    """Median of each row over its masked-in entries (0 for empty rows)"""
+    ordered = np.sort(np.where(mask, values, np.inf), axis=1)
+    count = mask.sum(axis=1)
+    lower = np.take_along_axis(ordered, np.maximum((count - 1) // 2, 0)[:, None], axis=1)[:, 0]
+    upper = np.take_along_axis(ordered, np.maximum(count // 2, 0)[:, None], axis=1)[:, 0]
+    return np.where(count > 0, (lower + upper) / 2, 0.0)
+
+class RULForecaster:
+    """Fleet-wide degradation trend fits over the metric history
+    
+    Each (metric, tier, fit kind) keeps one set of fitted arrays for every vehicle in the
+    history. Fits are robust linear regressions (Tukey bisquare IRLS) of the bucket means
+    against time, on log values for exponential decay, solved for all vehicles at once.
+    Only vehicles whose history changed since their last fit are refit.
+    """
+    
+    def __init__(self, history):
+        self.history = history
+        self.fits = {}
+        self.lock = threading.Lock()
+    
+    def _fit_rows(self, ring, code, rows, kind):
+        buckets, y, counts = ring.series(rows, code)
+        buckets = buckets.astype(np.float64)
+        valid = counts > 0
+        if kind == 'exponential':
+            valid &= y > 0
+            y = np.log(np.where(valid, y, 1.0))
+        
+        latest = np.where(valid, buckets, -np.inf).max(axis=1)
+        enough = valid.sum(axis=1) >= RUL_MIN_POINTS
+        # Time in days relative to each vehicle's newest bucket
+        x = np.where(valid, (buckets - np.where(enough, latest, 0)[:, None]) * ring.width / 86400, 0.0)
+        y = np.where(valid, y, 0.0)
+        weights = (valid & enough[:, None]).astype(np.float64)
+        
+        for _ in range(RUL_ROBUST_ITERATIONS):
+            slope, intercept, stderr = weighted_linear_fit(x, y, weights)
+            residuals = np.abs(y - (intercept[:, None] + slope[:, None] * x))
+            scale = masked_row_median(residuals, weights > 0) * 1.4826
+            u = residuals / np.maximum(4.685 * scale, 1e-9)[:, None]
+            weights = np.where(valid & enough[:, None] & (u < 1), (1 - u ** 2) ** 2, 0.0)
+        slope, intercept, stderr = weighted_linear_fit(x, y, weights)
+        
+        return {
+            'slope': np.where(enough, slope, np.nan),
+            'intercept': np.where(enough, intercept, np.nan),
+            'stderr': np.where(enough, stderr, np.nan),
+            'anchor': np.where(enough, latest * ring.width, np.nan)
+        }
+    
+    def _fit(self, metric, tier, kind):
+        # Callers hold self.lock; the history lock keeps the rings still while they are read
+        history = self.history
+        with history.lock:
+            size = len(history.keys)
+            versions = history.row_versions[:size].copy()
+            entry = self.fits.setdefault((metric, tier, kind), {
+                'versions': np.zeros(0, dtype=np.int64),
+                'slope': np.zeros(0), 'intercept': np.zeros(0), 'stderr': np.zeros(0), 'anchor': np.zeros(0)
+            })
+            grow = size - len(entry['versions'])
+            if grow > 0:
+                entry['versions'] = np.concatenate([entry['versions'], np.full(grow, -1, dtype=np.int64)])
+                for field in ('slope', 'intercept', 'stderr', 'anchor'):
+                    entry[field] = np.concatenate([entry[field], np.full(grow, np.nan)])
+            
+            dirty = np.flatnonzero(entry['versions'] != versions)
+            if dirty.size:
+                fitted = self._fit_rows(history.tiers[tier], history.signal_codes[metric], dirty, kind)
+                for field, values in fitted.items():
+                    entry[field][dirty] = values
+                entry['versions'][dirty] = versions[dirty]
+            return entry
+    
+    def forecast(self, vehicle_keys, metric, target, tier=RUL_DEFAULT_TIER, kind='linear', now=None):
+        """Days until each vehicle's trend reaches target, as (days, low, high) arrays; inf where no trend leads there"""
+        now = time.time() if now is None else now
+        rows = np.array([self.history.row_index.get(int(key), -1) for key in vehicle_keys], dtype=np.int64)
+        with self.lock:
+            entry = self._fit(metric, tier, kind)
+            if not len(entry['versions']):
+                unknown = np.full(len(rows), np.inf)
+                return unknown, unknown.copy(), unknown.copy()
+            picked = np.where(rows >= 0, rows, 0)
+            slope, intercept = entry['slope'][picked], entry['intercept'][picked]
+            stderr, anchor = entry['stderr'][picked], entry['anchor'][picked]
+        
+        missing = (rows < 0) | np.isnan(slope)
+        level = np.log(target) if kind == 'exponential' else target
+        gap = level - np.where(missing, 0.0, intercept)
+        elapsed = (now - np.where(missing, now, anchor)) / 86400
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # A trend heading away from the target (or flat) never reaches it
+            def days_at(rate):
+                days = np.where(rate * gap > 0, gap / rate, np.where(gap == 0, 0.0, np.inf)) - elapsed
+                return np.maximum(days, 0.0)
+            
+            days = days_at(slope)
+            bounds = np.stack([days_at(slope + RUL_CONFIDENCE_Z * stderr), days_at(slope - RUL_CONFIDENCE_Z * stderr)])
+        
+        low, high = bounds.min(axis=0), bounds.max(axis=0)
+        unreachable = missing | (days > RUL_MAX_DAYS)
+        days = np.where(unreachable, np.inf, days)
+        low = np.where(unreachable, np.inf, low)
+        high = np.where(unreachable | (high > RUL_MAX_DAYS), np.inf, high)
+        return days, low, high
+
+@st.cache_resource
+def get_rul_forecaster():
+    """Process-wide forecaster over the telemetry hub's metric history"""
+    from .telemetry import get_telemetry_hub  # the hub builds on twins, which forecast through here
+    
+    return RULForecaster(get_telemetry_hub().history)
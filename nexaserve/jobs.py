@@ -0,0 +1,82 @@
+"""Background jobs polled by a progress fragment"""
+
+import streamlit as st
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from .config import JOB_POOL_MAX_WORKERS, JOB_POLL_INTERVAL_S, INJECTED_LATENCY_S
+
+class BackgroundJob:
+    """Handle to work running on the job pool; the worker reports progress as it goes"""
+    
+    def __init__(self, kind, label, on_done):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.label = label
+        self.on_done = on_done
+        self.progress = 0.0
+        self.detail = ""
+        self.future = None
+    
+    def report(self, progress, detail=None):
+        self.progress = min(max(float(progress), 0.0), 1.0)
+        if detail is not None:
+            self.detail = detail
+    
+    def done(self):
+        return self.future.done()
+
+@st.cache_resource
+def get_job_executor():
+    """Process-wide pool for background jobs, separate from the chat turn pool"""
+    return ThreadPoolExecutor(max_workers=JOB_POOL_MAX_WORKERS, thread_name_prefix="nexaserve-job")
+
+def inject_latency(operation, report=None):
+    """Sleep for the operation's configured injected latency, reporting progress along the way"""
+    delay = INJECTED_LATENCY_S.get(operation, INJECTED_LATENCY_S.get('*', 0.0))
+    if delay <= 0:
+        return
+    steps = max(int(delay / 0.1), 1)
+    for step in range(steps):
+        time.sleep(delay / steps)
+        if report:
+            report(0.9 * (step + 1) / steps)
+
+def submit_job(kind, label, fn, *args, on_done=None):
+    """Run fn(report, *args) on the job pool; on_done(result) is applied on the script thread when it finishes"""
+    job = BackgroundJob(kind, label, on_done)
+    job.future = get_job_executor().submit(fn, job.report, *args)
+    st.session_state.jobs[kind] = job
+    st.session_state.job_errors.pop(kind, None)
+    return job
+
+@st.fragment(run_every=JOB_POLL_INTERVAL_S)
+def job_progress_fragment(kind):
+    """Poll one background job without rerunning the page, then hand its result or error back to the app"""
+    job = st.session_state.jobs.get(kind)
+    if job is None:
+        return
+    if not job.done():
+        st.progress(job.progress, text=job.label)
+        if job.detail:
+            st.caption(job.detail)
+        return
+    
+    del st.session_state.jobs[kind]
+    try:
+        result = job.future.result()
+    except Exception as e:
+        # Kept until the next job of this kind, so the page shows it after the rerun stops this fragment
+        st.session_state.job_errors[kind] = f"⚠️ {job.label.rstrip('.')} failed: {e}"
+        st.rerun()
+    if job.on_done:
+        job.on_done(result)
+    st.rerun()
+
+def render_job_progress(kind):
+    """Show a job's progress while it runs, or why the last one failed; nothing polls once it has finished"""
+    if kind in st.session_state.jobs:
+        job_progress_fragment(kind)
+    elif kind in st.session_state.job_errors:
+        st.error(st.session_state.job_errors[kind])
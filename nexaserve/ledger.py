@@ -0,0 +1,358 @@
+"""Hash-chained service ledger with Merkle checkpoints"""
+
+import streamlit as st
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+import os
+import json
+from datetime import datetime
+import hashlib
+import uuid
+import bisect
+from array import array
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+import html
+
+from .config import LEDGER_PATH, LEDGER_CHECKPOINT_INTERVAL, LEDGER_DERIVED_FIELDS, SERVICE_CARD_CACHE_SIZE
+from .session import json_default, get_session_store, load_service_records
+
+GENESIS_HASH = "0" * 64
+
+def merkle_root(digests):
+    """Merkle root (hex) over raw SHA-256 digests, duplicating the last node on odd levels"""
+    level = list(digests)
+    if not level:
+        return GENESIS_HASH
+    while len(level) > 1:
+        if len(level) % 2:
+            level.append(level[-1])
+        level = [hashlib.sha256(level[i] + level[i + 1]).digest() for i in range(0, len(level), 2)]
+    return level[0].hex()
+
+class ServiceLedger:
+    """Append-only, hash-chained service ledger persisted as JSON lines with Merkle checkpoints
+    
+    Entry hash = sha256(prev_hash || seq || canonical record JSON). Every checkpoint_interval
+    entries a checkpoint commits the block's Merkle root and links to the previous checkpoint,
+    so verification only has to rehash entries appended since the last checkpoint.
+    
+    Several processes may share the files: appends take an exclusive lock on path + ".lock"
+    (POSIX only) and first read whatever other writers appended, so seq numbers stay contiguous.
+    """
+    
+    def __init__(self, path, checkpoint_interval):
+        self.path = path
+        self.checkpoint_path = path + ".checkpoints"
+        self.checkpoint_interval = checkpoint_interval
+        self.hashes = bytearray()
+        self.offsets = array('Q')
+        self.vehicle_index = {}
+        self.checkpoints = []
+        self.verified_blocks = set()
+        self.end = 0
+        self.checkpoint_end = 0
+        self.lock = threading.Lock()
+        self.lock_file = open(path + ".lock", 'a') if fcntl is not None else None
+        self.file = open(self.path, 'ab')
+        with self.lock, self._file_lock():
+            self._sync()
+    
+    def __len__(self):
+        return len(self.offsets)
+    
+    @staticmethod
+    def canonical_record(record):
+        """Deterministic serialization of the hashed record fields"""
+        fields = {key: value for key, value in record.items() if key not in LEDGER_DERIVED_FIELDS}
+        return json.dumps(fields, sort_keys=True, separators=(',', ':'), ensure_ascii=False, default=json_default)
+    
+    @staticmethod
+    def entry_digest(prev_digest, seq, canonical):
+        return hashlib.sha256(prev_digest + seq.to_bytes(8, 'big') + canonical.encode()).digest()
+    
+    def _digest_at(self, seq):
+        if seq < 0:
+            return bytes.fromhex(GENESIS_HASH)
+        return bytes(self.hashes[seq * 32:(seq + 1) * 32])
+    
+    @contextmanager
+    def _file_lock(self):
+        """Exclusive lock shared with every process writing to the same ledger files"""
+        if self.lock_file is None:
+            yield
+            return
+        fcntl.flock(self.lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(self.lock_file, fcntl.LOCK_UN)
+    
+    @staticmethod
+    def _read_lines(path, start):
+        """Complete lines from byte offset start, and the offset after them
+        
+        Writers hold the file lock while they write, so a final line without its newline was
+        torn by a crash mid-write; it is truncated away before anything is appended after it.
+        """
+        try:
+            if os.stat(path).st_size == start:
+                return [], start
+        except FileNotFoundError:
+            return [], start
+        lines = []
+        with open(path, 'rb') as f:
+            f.seek(start)
+            for line in f:
+                if not line.endswith(b'\n'):
+                    os.truncate(path, start)
+                    break
+                lines.append((start, line))
+                start += len(line)
+        return lines, start
+    
+    def _sync(self):
+        """Index entries and checkpoints appended since the last sync, by this or another process (no rehashing)"""
+        lines, self.checkpoint_end = self._read_lines(self.checkpoint_path, self.checkpoint_end)
+        self.checkpoints.extend(json.loads(line) for _, line in lines if line.strip())
+        
+        lines, self.end = self._read_lines(self.path, self.end)
+        for offset, line in lines:
+            entry = json.loads(line)
+            self.offsets.append(offset)
+            self.hashes += bytes.fromhex(entry['hash'])
+            self.vehicle_index.setdefault(entry['record']['vehicle_id'], []).append(entry['seq'])
+        
+        # A writer that crashed between an entry and its block's checkpoint leaves the block uncommitted
+        self._write_due_checkpoints()
+    
+    def append(self, record):
+        """Chain a record onto the ledger; returns (seq, entry_hash, prev_hash) as hex"""
+        canonical = self.canonical_record(record)
+        
+        with self.lock, self._file_lock():
+            self._sync()
+            seq = len(self.offsets)
+            prev_digest = self._digest_at(seq - 1)
+            digest = self.entry_digest(prev_digest, seq, canonical)
+            line = f'{{"seq":{seq},"prev":"{prev_digest.hex()}","hash":"{digest.hex()}","record":{canonical}}}\n'.encode()
+            
+            self.file.write(line)
+            self.file.flush()
+            self.offsets.append(self.end)
+            self.end += len(line)
+            self.hashes += digest
+            self.vehicle_index.setdefault(record['vehicle_id'], []).append(seq)
+            self._write_due_checkpoints()
+        
+        return seq, digest.hex(), prev_digest.hex()
+    
+    def _write_due_checkpoints(self):
+        while (len(self.checkpoints) + 1) * self.checkpoint_interval <= len(self.offsets):
+            self._write_checkpoint((len(self.checkpoints) + 1) * self.checkpoint_interval)
+    
+    def _write_checkpoint(self, end):
+        start = end - self.checkpoint_interval
+        prev = self.checkpoints[-1]['hash'] if self.checkpoints else GENESIS_HASH
+        root = merkle_root(bytes(self.hashes[i * 32:(i + 1) * 32]) for i in range(start, end))
+        last_hash = self._digest_at(end - 1).hex()
+        checkpoint = {
+            'end': end,
+            'root': root,
+            'last_hash': last_hash,
+            'prev': prev,
+            'hash': hashlib.sha256(f"{prev}{end}{root}{last_hash}".encode()).hexdigest()
+        }
+        line = (json.dumps(checkpoint, sort_keys=True) + "\n").encode()
+        with open(self.checkpoint_path, 'ab') as f:
+            f.write(line)
+        self.checkpoint_end += len(line)
+        self.checkpoints.append(checkpoint)
+    
+    def _read_entries(self, reader, start, end):
+        """Yield (seq, prev_hex, hash_hex, canonical) for stored entries in [start, end)"""
+        if start < len(self.offsets):
+            reader.seek(self.offsets[start])
+        for seq in range(start, end):
+            line = reader.readline().decode('utf-8').rstrip('\n')
+            # The record is hashed exactly as written, so slice it out instead of re-serializing
+            head, canonical = line.split(',"record":', 1)
+            header = json.loads(head + "}")
+            yield header['seq'], header['prev'], header['hash'], canonical[:-1]
+    
+    def _open_reader(self):
+        self.file.flush()
+        return open(self.path, 'rb')
+    
+    def _verify_range(self, reader, start, end, prev_digest):
+        """Rehash stored entries in [start, end) starting from prev_digest; returns (ok, error)"""
+        for seq, prev_hex, hash_hex, canonical in self._read_entries(reader, start, end):
+            if seq != start or prev_hex != prev_digest.hex():
+                return False, f"Chain broken at entry {seq}"
+            digest = self.entry_digest(prev_digest, seq, canonical)
+            if digest.hex() != hash_hex or digest != self._digest_at(seq):
+                return False, f"Hash mismatch at entry {seq}"
+            prev_digest = digest
+            start += 1
+        return True, None
+    
+    def _verify_checkpoint_chain(self):
+        prev = GENESIS_HASH
+        for index, checkpoint in enumerate(self.checkpoints):
+            expected = hashlib.sha256(
+                f"{prev}{checkpoint['end']}{checkpoint['root']}{checkpoint['last_hash']}".encode()
+            ).hexdigest()
+            if checkpoint['prev'] != prev or checkpoint['hash'] != expected:
+                return False, f"Checkpoint {index} is not linked to its predecessor"
+            prev = checkpoint['hash']
+        return True, None
+    
+    def _verify_block(self, index):
+        """Check a checkpointed block's in-memory hashes against its Merkle root (cached once verified)"""
+        if index in self.verified_blocks:
+            return True
+        checkpoint = self.checkpoints[index]
+        start = checkpoint['end'] - self.checkpoint_interval
+        root = merkle_root(self._digest_at(i) for i in range(start, checkpoint['end']))
+        if root != checkpoint['root'] or self._digest_at(checkpoint['end'] - 1).hex() != checkpoint['last_hash']:
+            return False
+        self.verified_blocks.add(index)
+        return True
+    
+    def verify(self, full=False):
+        """Verify the ledger: checkpoints plus the tail since the last one, or every entry when full"""
+        with self.lock:
+            with self._file_lock():
+                self._sync()
+            ok, error = self._verify_checkpoint_chain()
+            if not ok:
+                return {'valid': False, 'error': error, 'entries_rehashed': 0}
+            
+            if full:
+                start, prev_digest = 0, bytes.fromhex(GENESIS_HASH)
+                self.verified_blocks.clear()
+                for index in range(len(self.checkpoints)):
+                    if not self._verify_block(index):
+                        return {'valid': False, 'error': f"Merkle root mismatch in block {index}", 'entries_rehashed': 0}
+            else:
+                start = self.checkpoints[-1]['end'] if self.checkpoints else 0
+                prev_digest = bytes.fromhex(self.checkpoints[-1]['last_hash']) if self.checkpoints else bytes.fromhex(GENESIS_HASH)
+            
+            with self._open_reader() as reader:
+                ok, error = self._verify_range(reader, start, len(self.offsets), prev_digest)
+            return {'valid': ok, 'error': error, 'entries_rehashed': len(self.offsets) - start}
+    
+    def verify_vehicle(self, vehicle_id):
+        """Verify one vehicle's entries: rehash each, prove it against its block root or the chain tail"""
+        with self.lock:
+            with self._file_lock():
+                self._sync()
+            ok, error = self._verify_checkpoint_chain()
+            if not ok:
+                return {'valid': False, 'error': error, 'entries_rehashed': 0}
+            
+            checkpointed_end = self.checkpoints[-1]['end'] if self.checkpoints else 0
+            # The vehicle's entries after the last checkpoint are rehashed with the tail below
+            seqs = self.vehicle_index.get(vehicle_id, [])
+            seqs = seqs[:bisect.bisect_left(seqs, checkpointed_end)]
+            
+            with self._open_reader() as reader:
+                for seq in seqs:
+                    if not self._verify_block(seq // self.checkpoint_interval):
+                        return {'valid': False, 'error': f"Merkle root mismatch for entry {seq}", 'entries_rehashed': 0}
+                    ok, error = self._verify_range(reader, seq, seq + 1, self._digest_at(seq - 1))
+                    if not ok:
+                        return {'valid': False, 'error': error, 'entries_rehashed': 0}
+                
+                # Entries after the last checkpoint are only committed through the chain itself
+                tail_start = checkpointed_end
+                tail_digest = bytes.fromhex(self.checkpoints[-1]['last_hash']) if self.checkpoints else bytes.fromhex(GENESIS_HASH)
+                ok, error = self._verify_range(reader, tail_start, len(self.offsets), tail_digest)
+            
+            return {'valid': ok, 'error': error, 'entries_rehashed': len(seqs) + len(self.offsets) - tail_start}
+
+@st.cache_resource
+def get_service_ledger():
+    """Process-wide ledger; appends are serialized through its lock"""
+    return ServiceLedger(LEDGER_PATH, LEDGER_CHECKPOINT_INTERVAL)
+
+def create_service_record(service_type, details, cost=0):
+    """Create blockchain-verified service record"""
+    
+    record = {
+        'record_id': str(uuid.uuid4()),
+        'vehicle_id': st.session_state.digital_twin_data['vehicle_id'],
+        'timestamp': datetime.now().isoformat(),
+        'service_type': service_type,
+        'details': details,
+        'cost': cost,
+        'technician': 'AI Assistant' if cost == 0 else 'Service Center',
+        'status': 'completed'
+    }
+    
+    # Chain the record onto the ledger before it becomes visible anywhere else
+    seq, entry_hash, prev_hash = get_service_ledger().append(record)
+    record['ledger_seq'] = seq
+    record['blockchain_hash'] = entry_hash
+    record['prev_hash'] = prev_hash
+    
+    get_session_store().add_service_record(record)
+    if st.session_state.service_records is not None:
+        st.session_state.service_records.append(record)
+    return record
+
+def get_service_history():
+    """Retrieve blockchain-verified service history"""
+    return load_service_records()
+
+@st.cache_resource
+def get_service_card_cache():
+    """Rendered service-record cards keyed by entry hash; ledger entries never change"""
+    return {'cards': OrderedDict(), 'lock': threading.Lock()}
+
+def service_record_card_html(record):
+    """Service history card markup, rendered and escaped once per ledger entry"""
+    cache = get_service_card_cache()
+    key = record['blockchain_hash']
+    
+    with cache['lock']:
+        card = cache['cards'].get(key)
+        if card is not None:
+            cache['cards'].move_to_end(key)
+            return card
+    
+    card = f"""
+    <div class="service-card">
+        <div style="display: flex; justify-content: space-between; align-items: center;">
+            <div>
+                <h4>📋 {html.escape(record['service_type'])}</h4>
+                <p><strong>Date:</strong> {datetime.fromisoformat(record['timestamp']).strftime('%Y-%m-%d %H:%M')}</p>
+                <p><strong>Details:</strong> {html.escape(record['details'])}</p>
+                <p><strong>Technician:</strong> {html.escape(record['technician'])}</p>
+                {f"<p><strong>Cost:</strong> ₹{record['cost']}</p>" if record['cost'] > 0 else ""}
+            </div>
+            <div>
+                <span class="blockchain-verified">🔒 Blockchain Verified</span>
+                <p style="font-size: 10px; margin-top: 5px;">Hash: {record['blockchain_hash'][:16]}</p>
+            </div>
+        </div>
+    </div>
+    """
+    
+    with cache['lock']:
+        cache['cards'][key] = card
+        while len(cache['cards']) > SERVICE_CARD_CACHE_SIZE:
+            cache['cards'].popitem(last=False)
+    return card
+
+def verify_vehicle_ledger(vehicle_id):
+    """Vehicle chain verification, recomputed only when the ledger has grown"""
+    ledger = get_service_ledger()
+    cached = st.session_state.get('ledger_verification')
+    if cached is None or cached['vehicle_id'] != vehicle_id or cached['ledger_length'] != len(ledger):
+        cached = {'vehicle_id': vehicle_id, 'ledger_length': len(ledger), 'result': ledger.verify_vehicle(vehicle_id)}
+        st.session_state.ledger_verification = cached
+    return cached['result']
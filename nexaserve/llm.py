@@ -0,0 +1,361 @@
+"""OpenAI client with deadlines, retries and a circuit breaker, and the LLM response cache"""
+
+import streamlit as st
+import json
+import time
+import random
+import hashlib
+import sqlite3
+import threading
+from collections import OrderedDict
+
+from .config import (
+    LLM_CACHE_MAX_ENTRIES, LLM_CACHE_TTLS, LLM_CACHE_DB_PATH, OPENAI_API_KEY, OPENAI_BASE_URL,
+    LLM_POOL_MAX_CONNECTIONS, LLM_POOL_MAX_KEEPALIVE, LLM_KEEPALIVE_EXPIRY_S, LLM_CONNECT_TIMEOUT_S,
+    LLM_DEADLINES, LLM_MAX_RETRIES, LLM_BACKOFF_BASE_S, LLM_BACKOFF_MAX_S,
+    LLM_BREAKER_FAILURE_THRESHOLD, LLM_BREAKER_RESET_S
+)
+
+# ================================
+# OPENAI CLIENT INITIALIZATION
+# ================================
+
+class LLMUnavailableError(Exception):
+    """Raised instead of calling upstream when the client is unconfigured or the circuit is open"""
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with a half-open probe after the reset window"""
+    
+    def __init__(self, failure_threshold, reset_after_s):
+        self.failure_threshold = failure_threshold
+        self.reset_after_s = reset_after_s
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+        self.lock = threading.Lock()
+    
+    @property
+    def state(self):
+        with self.lock:
+            if self.opened_at is None:
+                return "closed"
+            if time.monotonic() - self.opened_at >= self.reset_after_s:
+                return "half_open"
+            return "open"
+    
+    def allow(self):
+        """Whether a call may go upstream; lets a single probe through once the window elapses"""
+        with self.lock:
+            if self.opened_at is None:
+                return True
+            if time.monotonic() - self.opened_at >= self.reset_after_s and not self.probing:
+                self.probing = True
+                return True
+            return False
+    
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+            self.probing = False
+    
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            self.probing = False
+            if self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+    
+    def record_error(self, error):
+        """Settle a call that raised: a client error (4xx) means upstream answered, anything else is a failure"""
+        status = getattr(error, 'status_code', None)
+        if isinstance(status, int) and 400 <= status < 500 and status not in (408, 429):
+            self.record_success()
+        else:
+            self.record_failure()
+
+class BreakerStream:
+    """Streamed response that settles the breaker when the stream ends, fails or is dropped"""
+    
+    def __init__(self, stream, breaker):
+        self.stream = stream
+        self.breaker = breaker
+        self.settled = False
+    
+    def __iter__(self):
+        return self
+    
+    def __next__(self):
+        try:
+            return next(self.stream)
+        except StopIteration:
+            self._settle(None)
+            raise
+        except BaseException as e:
+            self._settle(e)
+            raise
+    
+    def _settle(self, error):
+        if self.settled:
+            return
+        self.settled = True
+        if error is None:
+            self.breaker.record_success()
+        else:
+            self.breaker.record_error(error)
+    
+    def close(self):
+        """Stop reading early; the upstream delivered, so this counts as a success"""
+        self._settle(None)
+        close = getattr(self.stream, 'close', None)
+        if close is not None:
+            close()
+    
+    def __del__(self):
+        # A stream abandoned mid-way must not leave a half-open probe in flight
+        self._settle(None)
+
+class PromptUsageStats:
+    """Prompt tokens sent vs. served from the provider's prompt cache, per call type"""
+    
+    def __init__(self):
+        self.prompt_tokens = {}
+        self.cached_tokens = {}
+        self.lock = threading.Lock()
+    
+    def record(self, purpose, usage):
+        """Accumulate the usage block of a completion response"""
+        if usage is None:
+            return
+        details = getattr(usage, 'prompt_tokens_details', None)
+        cached = (getattr(details, 'cached_tokens', None) or 0) if details is not None else 0
+        
+        with self.lock:
+            self.prompt_tokens[purpose] = self.prompt_tokens.get(purpose, 0) + (usage.prompt_tokens or 0)
+            self.cached_tokens[purpose] = self.cached_tokens.get(purpose, 0) + cached
+    
+    def totals(self):
+        """Total (prompt_tokens, cached_tokens) across call types"""
+        with self.lock:
+            return sum(self.prompt_tokens.values()), sum(self.cached_tokens.values())
+
+class LLMClientManager:
+    """Pooled OpenAI client with per-call deadlines, jittered retries and a circuit breaker"""
+    
+    def __init__(self, api_key, base_url=None):
+        self.breaker = CircuitBreaker(LLM_BREAKER_FAILURE_THRESHOLD, LLM_BREAKER_RESET_S)
+        self.usage = PromptUsageStats()
+        self.client = None
+        
+        if not api_key:
+            self.init_error = "OPENAI_API_KEY is not configured"
+            return
+        
+        # The SDK and its HTTP stack are only loaded once a key is configured
+        import httpx
+        from openai import OpenAI
+        
+        self.init_error = None
+        http_client = httpx.Client(
+            limits=httpx.Limits(
+                max_connections=LLM_POOL_MAX_CONNECTIONS,
+                max_keepalive_connections=LLM_POOL_MAX_KEEPALIVE,
+                keepalive_expiry=LLM_KEEPALIVE_EXPIRY_S
+            ),
+            timeout=httpx.Timeout(LLM_DEADLINES['default'], connect=LLM_CONNECT_TIMEOUT_S)
+        )
+        # Retries are handled here so they share the call's deadline and feed the breaker
+        self.client = OpenAI(api_key=api_key, base_url=base_url, http_client=http_client, max_retries=0)
+    
+    def chat_completion(self, purpose='default', **request):
+        """Create a chat completion within the deadline configured for this call type"""
+        response = self._call(
+            purpose, "chat/completions", lambda client: client.chat.completions.create(**request),
+            stream=bool(request.get('stream'))
+        )
+        if not request.get('stream'):
+            self.usage.record(purpose, getattr(response, 'usage', None))
+        return response
+    
+    def transcription(self, purpose='transcription', **request):
+        """Transcribe audio within the deadline configured for this call type"""
+        return self._call(purpose, "audio/transcriptions", lambda client: client.audio.transcriptions.create(**request))
+    
+    def _call(self, purpose, endpoint, create, stream=False):
+        """Run create(client) with retries inside the call type's deadline, feeding the breaker
+        
+        Every outcome settles the breaker, so a failed half-open probe can never leave it stuck;
+        a stream settles it once it has been read to the end or fails part-way.
+        """
+        if self.client is None:
+            raise LLMUnavailableError(self.init_error)
+        if not self.breaker.allow():
+            raise LLMUnavailableError("AI engine is degraded, serving fallback answers")
+        
+        import httpx
+        import openai
+        
+        deadline = time.monotonic() + LLM_DEADLINES.get(purpose, LLM_DEADLINES['default'])
+        attempt = 0
+        
+        while True:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining <= 0:
+                    raise openai.APITimeoutError(request=httpx.Request("POST", endpoint))
+                response = create(self.client.with_options(timeout=remaining))
+            except (openai.RateLimitError, openai.InternalServerError, openai.APIConnectionError) as e:
+                delay = self._backoff_delay(attempt, e)
+                if attempt >= LLM_MAX_RETRIES or time.monotonic() + delay >= deadline:
+                    self.breaker.record_failure()
+                    raise
+                time.sleep(delay)
+                attempt += 1
+                continue
+            except BaseException as e:
+                self.breaker.record_error(e)
+                raise
+            
+            if stream:
+                return BreakerStream(response, self.breaker)
+            self.breaker.record_success()
+            return response
+    
+    @staticmethod
+    def _backoff_delay(attempt, error):
+        """Full-jitter exponential backoff, honouring Retry-After when the server sends one"""
+        response = getattr(error, 'response', None)
+        retry_after = response.headers.get('retry-after') if response is not None else None
+        if retry_after:
+            try:
+                return min(float(retry_after), LLM_BACKOFF_MAX_S)
+            except ValueError:
+                pass
+        return random.uniform(0, min(LLM_BACKOFF_MAX_S, LLM_BACKOFF_BASE_S * (2 ** attempt)))
+    
+    def status(self):
+        """Short health label for the sidebar"""
+        if self.client is None:
+            return "unconfigured"
+        return self.breaker.state
+
+@st.cache_resource
+def get_llm_client():
+    """Shared client manager so every session reuses one connection pool and breaker"""
+    return LLMClientManager(OPENAI_API_KEY, OPENAI_BASE_URL)
+
+# ================================
+# LLM RESPONSE CACHE
+# ================================
+
+class LLMResponseCache:
+    """Process-wide LRU cache of completion text keyed on a hash of the request"""
+    
+    def __init__(self, max_entries, ttls, db_path=None):
+        self.max_entries = max_entries
+        self.ttls = ttls
+        self.entries = OrderedDict()
+        self.hits = {}
+        self.misses = {}
+        self.lock = threading.Lock()
+        self.db = None
+        
+        if db_path:
+            self.db = sqlite3.connect(db_path, check_same_thread=False)
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache (key TEXT PRIMARY KEY, content TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self.db.execute("DELETE FROM llm_cache WHERE expires_at < ?", (time.time(),))
+            self.db.commit()
+    
+    @staticmethod
+    def make_key(model, messages, temperature, max_tokens):
+        """Hash the request with whitespace-normalized message contents"""
+        normalized = [
+            {"role": msg["role"], "content": " ".join(msg["content"].split())}
+            for msg in messages
+        ]
+        payload = json.dumps([model, normalized, temperature, max_tokens], sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode()).hexdigest()
+    
+    def get(self, purpose, key):
+        """Return cached content for a key, or None on a miss"""
+        now = time.time()
+        
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] < now:
+                del self.entries[key]
+                entry = None
+            
+            if entry is None and self.db is not None:
+                row = self.db.execute(
+                    "SELECT expires_at, content FROM llm_cache WHERE key = ? AND expires_at >= ?", (key, now)
+                ).fetchone()
+                if row:
+                    entry = (row[0], row[1])
+                    self._store(key, entry)
+            
+            if entry is None:
+                self.misses[purpose] = self.misses.get(purpose, 0) + 1
+                return None
+            
+            self.entries.move_to_end(key)
+            self.hits[purpose] = self.hits.get(purpose, 0) + 1
+            return entry[1]
+    
+    def put(self, purpose, key, content):
+        """Store content under a key with the TTL configured for its call type"""
+        entry = (time.time() + self.ttls.get(purpose, 0), content)
+        
+        with self.lock:
+            self._store(key, entry)
+            if self.db is not None:
+                self.db.execute(
+                    "INSERT OR REPLACE INTO llm_cache (key, content, expires_at) VALUES (?, ?, ?)",
+                    (key, content, entry[0])
+                )
+                self.db.commit()
+    
+    def _store(self, key, entry):
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+    
+    def stats(self):
+        """Hit/miss counters per call type"""
+        with self.lock:
+            purposes = sorted(set(self.hits) | set(self.misses))
+            return {
+                purpose: {'hits': self.hits.get(purpose, 0), 'misses': self.misses.get(purpose, 0)}
+                for purpose in purposes
+            }
+
+@st.cache_resource
+def get_llm_cache():
+    """Shared response cache for every session in this process"""
+    return LLMResponseCache(LLM_CACHE_MAX_ENTRIES, LLM_CACHE_TTLS, LLM_CACHE_DB_PATH)
+
+def cached_chat_completion(purpose, model, messages, temperature, max_tokens, parse=None):
+    """Chat completion served from the response cache when an identical request was seen"""
+    cache = get_llm_cache()
+    key = cache.make_key(model, messages, temperature, max_tokens)
+    
+    content = cache.get(purpose, key)
+    if content is not None:
+        return parse(content) if parse else content
+    
+    response = get_llm_client().chat_completion(
+        purpose,
+        model=model,
+        messages=messages,
+        temperature=temperature,
+        max_tokens=max_tokens
+    )
+    content = response.choices[0].message.content
+    
+    # Only cache output that parses, so a malformed reply is retried next time
+    result = parse(content) if parse else content
+    cache.put(purpose, key, content)
+    return result
@@ -0,0 +1,267 @@
+"""Predictive maintenance rules compiled from a JSON or YAML spec"""
+
+import streamlit as st
+try:
+    import yaml
+except ImportError:
+    yaml = None
+import os
+import json
+import time
+import numpy as np
+from datetime import datetime, timedelta
+import threading
+
+from .config import MAINTENANCE_RULES_PATH, RULES_RELOAD_CHECK_S, HISTORY_TIERS, RUL_DEFAULT_TIER
+from .history import RUL_FIT_KINDS, get_rul_forecaster
+
+RULE_OPERATORS = {
+    '<': np.less,
+    '<=': np.less_equal,
+    '>': np.greater,
+    '>=': np.greater_equal,
+    '==': np.equal,
+    '!=': np.not_equal
+}
+
+RULE_SEVERITIES = ('Low', 'Medium', 'High', 'Critical')
+
+class RuleSpecError(Exception):
+    """Raised when a maintenance rule spec is malformed"""
+
+def spec_number(value, what):
+    """A numeric spec field as a float, or a RuleSpecError naming the field"""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        raise RuleSpecError(f"{what} must be a number, got {value!r}")
+
+class CompiledRuleSet:
+    """Maintenance rules compiled into vectorized predicates over FleetTwinStore columns
+    
+    Simple threshold rules sharing a (metric, operator) pair are evaluated together by
+    broadcasting the column against all their thresholds, so adding rules mostly widens
+    an array instead of adding Python-level passes over the fleet.
+    """
+    
+    def __init__(self, spec):
+        self.rules = []
+        self.threshold_groups = {}
+        self.compound = []
+        
+        if not isinstance(spec, dict) or not isinstance(spec.get('rules', []), list):
+            raise RuleSpecError("A rule spec is a mapping with a 'rules' list")
+        
+        for index, rule in enumerate(spec.get('rules', [])):
+            if not isinstance(rule, dict):
+                raise RuleSpecError(f"Rule {index} is not a mapping")
+            self.rules.append(self._validate(rule))
+            predicate = rule['predicate']
+            if predicate.get('op') in RULE_OPERATORS and 'metric' not in predicate:
+                group = self.threshold_groups.setdefault((rule['metric'], predicate['op']), ([], []))
+                group[0].append(spec_number(predicate.get('value'), f"Rule {rule['id']} predicate value"))
+                group[1].append(index)
+            else:
+                try:
+                    self.compound.append((index, self._compile_predicate(predicate, rule['metric'])))
+                except RuleSpecError as e:
+                    raise RuleSpecError(f"Rule {rule['id']}: {e}")
+        
+        self.threshold_groups = {
+            key: (np.array(thresholds), np.array(indices))
+            for key, (thresholds, indices) in self.threshold_groups.items()
+        }
+    
+    @staticmethod
+    def _validate(rule):
+        from .twin import TWIN_METRICS, TWIN_VEHICLE_FIELDS  # twins evaluate through this module
+        
+        for field in ('id', 'component', 'metric', 'predicate', 'severity', 'message'):
+            if field not in rule:
+                raise RuleSpecError(f"Rule {rule.get('id', '?')} is missing '{field}'")
+        for field in ('component', 'metric', 'message'):
+            if not isinstance(rule[field], str):
+                raise RuleSpecError(f"Rule {rule['id']} needs a string '{field}'")
+        if not isinstance(rule['predicate'], dict):
+            raise RuleSpecError(f"Rule {rule['id']} needs a mapping 'predicate'")
+        if rule['metric'] not in TWIN_METRICS and rule['metric'] not in TWIN_VEHICLE_FIELDS:
+            raise RuleSpecError(f"Rule {rule['id']} references unknown metric '{rule['metric']}'")
+        if rule['severity'] not in RULE_SEVERITIES:
+            raise RuleSpecError(f"Rule {rule['id']} has unknown severity '{rule['severity']}'")
+        try:
+            rule['message'].format(value=0.0, component=rule['component'])
+        except (AttributeError, LookupError, ValueError) as e:
+            raise RuleSpecError(f"Rule {rule['id']} has an invalid message template: {e!r}")
+        rule.setdefault('date_model', {'type': 'fixed_days', 'days': 30})
+        model = rule['date_model']
+        if not isinstance(model, dict) or model.get('type') not in RULE_DATE_MODELS:
+            raise RuleSpecError(f"Rule {rule['id']} has unknown date model {model!r}")
+        # Date models run when an alert is rendered, so their parameters are checked here
+        what = f"Rule {rule['id']} {model['type']}"
+        if model['type'] == 'fixed_days':
+            model['days'] = spec_number(model.get('days'), f"{what} 'days'")
+            if model['days'] < 0:
+                raise RuleSpecError(f"{what} 'days' must not be negative")
+        elif model['type'] == 'metric_rate':
+            model['rate_per_day'] = spec_number(model.get('rate_per_day'), f"{what} 'rate_per_day'")
+            if model['rate_per_day'] <= 0:
+                raise RuleSpecError(f"{what} 'rate_per_day' must be positive")
+            model['target'] = spec_number(model.get('target', 0), f"{what} 'target'")
+        elif model['type'] == 'rul_forecast':
+            if 'target' not in model:
+                raise RuleSpecError(f"Rule {rule['id']} needs a 'target' for its rul_forecast date model")
+            model['target'] = spec_number(model['target'], f"{what} 'target'")
+            if model.get('fit', 'linear') not in RUL_FIT_KINDS:
+                raise RuleSpecError(f"Rule {rule['id']} has unknown fit '{model['fit']}'")
+            if model.get('fit') == 'exponential' and model['target'] <= 0:
+                raise RuleSpecError(f"{what} 'target' must be positive for an exponential fit")
+            if model.get('tier', RUL_DEFAULT_TIER) not in HISTORY_TIERS:
+                raise RuleSpecError(f"Rule {rule['id']} has unknown history tier '{model['tier']}'")
+            model['fallback_days'] = spec_number(model.get('fallback_days', 30), f"{what} 'fallback_days'")
+            if model['fallback_days'] < 0:
+                raise RuleSpecError(f"{what} 'fallback_days' must not be negative")
+        return rule
+    
+    def _compile_predicate(self, predicate, default_metric):
+        """Compile a predicate tree into a function of a column accessor returning a boolean mask"""
+        if not isinstance(predicate, dict):
+            raise RuleSpecError(f"A predicate must be a mapping, got {predicate!r}")
+        if 'all' in predicate or 'any' in predicate:
+            parts = predicate.get('all', predicate.get('any'))
+            if not isinstance(parts, list) or not parts:
+                raise RuleSpecError("'all' and 'any' need a non-empty list of predicates")
+            parts = [self._compile_predicate(part, default_metric) for part in parts]
+            combine = np.logical_and if 'all' in predicate else np.logical_or
+            return lambda column: combine.reduce([part(column) for part in parts])
+        
+        from .twin import TWIN_METRICS, TWIN_VEHICLE_FIELDS
+        
+        metric = predicate.get('metric', default_metric)
+        if metric not in TWIN_METRICS and metric not in TWIN_VEHICLE_FIELDS:
+            raise RuleSpecError(f"Unknown metric '{metric}'")
+        if predicate.get('op') == 'between':
+            bounds = predicate.get('value')
+            if not isinstance(bounds, list) or len(bounds) != 2:
+                raise RuleSpecError(f"'between' needs a [low, high] value, got {bounds!r}")
+            low, high = (spec_number(bound, "'between' bound") for bound in bounds)
+            return lambda column: (column(metric) >= low) & (column(metric) <= high)
+        if predicate.get('op') not in RULE_OPERATORS:
+            raise RuleSpecError(f"Unknown operator '{predicate.get('op')}'")
+        
+        compare = RULE_OPERATORS[predicate['op']]
+        value = spec_number(predicate.get('value'), f"'{predicate['op']}' value")
+        return lambda column: compare(column(metric), value)
+    
+    def evaluate(self, store, rows=None):
+        """Boolean matrix (vehicles x rules) of which rules fire for which vehicle, optionally for a subset of rows"""
+        if rows is None:
+            column, count = store.column, store.size
+        else:
+            column, count = (lambda name: store.column(name)[rows]), len(rows)
+        # Filled rule-major so each rule writes one contiguous row, returned as a transposed view
+        matrix = np.zeros((len(self.rules), count), dtype=bool)
+        for (metric, op), (thresholds, indices) in self.threshold_groups.items():
+            matrix[indices] = RULE_OPERATORS[op](column(metric)[None, :], thresholds[:, None])
+        for index, predicate in self.compound:
+            matrix[index] = predicate(column)
+        return matrix.T
+    
+    def alerts_for_row(self, store, row, fired):
+        """Alert dicts for one vehicle given its row of the evaluation matrix"""
+        alerts = []
+        for index in np.flatnonzero(fired):
+            rule = self.rules[index]
+            value = float(store.column(rule['metric'])[row])
+            days, interval = RULE_DATE_MODELS[rule['date_model']['type']](
+                rule['date_model'], value, int(store.vehicle_keys[row]), rule['metric']
+            )
+            alert = {
+                'severity': rule['severity'],
+                'component': rule['component'],
+                'message': rule['message'].format(value=value, component=rule['component']),
+                'predicted_date': (datetime.now() + timedelta(days=days)).strftime('%Y-%m-%d')
+            }
+            if interval is not None:
+                alert['confidence_interval'] = [
+                    (datetime.now() + timedelta(days=bound)).strftime('%Y-%m-%d') for bound in interval
+                ]
+            alerts.append(alert)
+        return alerts
+
+# Date models return (days until service, (low, high) interval in days or None)
+
+def fixed_days_model(model, value, vehicle_key, metric):
+    """Service date a fixed number of days out"""
+    return model['days'], None
+
+def metric_rate_model(model, value, vehicle_key, metric):
+    """Days until the metric reaches its target at a constant daily rate"""
+    return max(abs(value - model.get('target', 0)) / model['rate_per_day'], 0), None
+
+def rul_forecast_model(model, value, vehicle_key, metric):
+    """Days until the vehicle's fitted degradation trend reaches the target, with a confidence interval"""
+    days, low, high = get_rul_forecaster().forecast(
+        np.array([vehicle_key], dtype=np.uint32), metric, model['target'],
+        tier=model.get('tier', RUL_DEFAULT_TIER), kind=model.get('fit', 'linear')
+    )
+    if not np.isfinite(days[0]):
+        return model.get('fallback_days', 30), None
+    interval = (float(low[0]), float(high[0])) if np.isfinite(high[0]) else None
+    return float(days[0]), interval
+
+RULE_DATE_MODELS = {
+    'fixed_days': fixed_days_model,
+    'metric_rate': metric_rate_model,
+    'rul_forecast': rul_forecast_model
+}
+
+class MaintenanceRuleEngine:
+    """Loads the rule spec, compiles it once and recompiles when the file changes"""
+    
+    def __init__(self, path):
+        self.path = path
+        self.mtime = None
+        self.version = 0
+        self.checked_at = 0.0
+        self.compiled = CompiledRuleSet({'rules': []})
+        self.error = None
+        self.lock = threading.Lock()
+        self.reload()
+    
+    def _read_spec(self):
+        with open(self.path, 'r', encoding='utf-8') as f:
+            if self.path.endswith(('.yaml', '.yml')):
+                if yaml is None:
+                    raise RuleSpecError("PyYAML is required for YAML rule specs")
+                return yaml.safe_load(f)
+            return json.load(f)
+    
+    def reload(self):
+        """Recompile from disk; a bad spec keeps the last good rules and records the error"""
+        with self.lock:
+            try:
+                mtime = os.stat(self.path).st_mtime
+                self.compiled = CompiledRuleSet(self._read_spec())
+                self.mtime = mtime
+                self.version += 1
+                self.error = None
+            except (OSError, ValueError, KeyError, TypeError, AttributeError, RuleSpecError) as e:
+                self.error = str(e)
+    
+    def rules(self):
+        """Current compiled rules, hot-reloaded when the spec file's mtime changes"""
+        now = time.monotonic()
+        if now - self.checked_at >= RULES_RELOAD_CHECK_S:
+            self.checked_at = now
+            try:
+                changed = os.stat(self.path).st_mtime != self.mtime
+            except OSError:
+                changed = False
+            if changed:
+                self.reload()
+        return self.compiled
+
+@st.cache_resource
+def get_rule_engine():
+    """Process-wide rule engine shared by every session"""
+    return MaintenanceRuleEngine(MAINTENANCE_RULES_PATH)
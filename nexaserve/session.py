@@ -0,0 +1,445 @@
+"""Persistent session storage and per-session state"""
+
+import streamlit as st
+import json
+import numpy as np
+from datetime import datetime
+import uuid
+import bisect
+import sqlite3
+import threading
+import base64
+
+from .config import SESSION_STORE_BACKEND, SESSION_STORE_PATH, STORE_BATCH_SIZE, HISTORY_PAGE_SIZE
+from .twin import generate_digital_twin_data
+
+# ================================
+# PERSISTENT SESSION STORAGE
+# ================================
+
+def json_default(value):
+    """JSON encoder hook for the NumPy scalars the twin simulation produces"""
+    if isinstance(value, np.integer):
+        return int(value)
+    if isinstance(value, np.floating):
+        return float(value)
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+def encode_record_cursor(record):
+    """Opaque keyset cursor pointing just past a record in newest-first order"""
+    return base64.urlsafe_b64encode(json.dumps([record['timestamp'], record['record_id']]).encode()).decode()
+
+def decode_record_cursor(cursor):
+    timestamp, record_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    return timestamp, record_id
+
+class InMemorySessionStore:
+    """Process-local store; sessions survive reloads but not restarts or other replicas"""
+    
+    def __init__(self):
+        self.sessions = {}
+        self.messages = {}
+        self.sentiment = {}
+        self.service_records = {}
+        self.records_by_id = {}
+        self.record_index = {'all': [], 'vehicle': {}, 'type': {}, 'vehicle_type': {}}
+        self.twins = {}
+        self.lock = threading.Lock()
+    
+    def save_session(self, session_id, profile):
+        with self.lock:
+            self.sessions[session_id] = dict(profile)
+    
+    def load_session(self, session_id):
+        with self.lock:
+            profile = self.sessions.get(session_id)
+            return dict(profile) if profile else None
+    
+    def append_message(self, session_id, message):
+        with self.lock:
+            self.messages.setdefault(session_id, []).append(dict(message))
+    
+    def load_messages(self, session_id, limit, before_seq=None):
+        """Page of messages (oldest first) with seq below before_seq"""
+        with self.lock:
+            history = self.messages.get(session_id, [])
+            end = len(history) if before_seq is None else bisect.bisect_left([m['seq'] for m in history], before_seq)
+            return [dict(message) for message in history[max(end - limit, 0):end]]
+    
+    def count_messages(self, session_id):
+        with self.lock:
+            return len(self.messages.get(session_id, []))
+    
+    def append_sentiment(self, session_id, entry):
+        with self.lock:
+            self.sentiment.setdefault(session_id, []).append(dict(entry))
+    
+    def load_sentiment(self, session_id):
+        with self.lock:
+            return [dict(entry) for entry in self.sentiment.get(session_id, [])]
+    
+    def add_service_record(self, record):
+        with self.lock:
+            self.service_records.setdefault(record['vehicle_id'], []).append(dict(record))
+            
+            # Secondary indexes: (timestamp, record_id) keys kept sorted for range scans
+            key = (record['timestamp'], record['record_id'])
+            self.records_by_id[record['record_id']] = dict(record)
+            bisect.insort(self.record_index['all'], key)
+            bisect.insort(self.record_index['vehicle'].setdefault(record['vehicle_id'], []), key)
+            bisect.insort(self.record_index['type'].setdefault(record['service_type'], []), key)
+            bisect.insort(
+                self.record_index['vehicle_type'].setdefault((record['vehicle_id'], record['service_type']), []), key
+            )
+    
+    def load_service_records(self, vehicle_id):
+        with self.lock:
+            return [dict(record) for record in self.service_records.get(vehicle_id, [])]
+    
+    def query_service_records(self, vehicle_id=None, service_type=None, since=None, until=None, cursor=None, limit=20):
+        """Newest-first page of records matching the filters; returns (records, next_cursor)"""
+        with self.lock:
+            if vehicle_id is not None and service_type is not None:
+                keys = self.record_index['vehicle_type'].get((vehicle_id, service_type), [])
+            elif vehicle_id is not None:
+                keys = self.record_index['vehicle'].get(vehicle_id, [])
+            elif service_type is not None:
+                keys = self.record_index['type'].get(service_type, [])
+            else:
+                keys = self.record_index['all']
+            
+            # Time range and cursor both narrow the upper/lower bounds of the sorted key list
+            low = bisect.bisect_left(keys, (since, "")) if since else 0
+            high = bisect.bisect_right(keys, (until + "\uffff",)) if until else len(keys)
+            if cursor:
+                high = min(high, bisect.bisect_left(keys, decode_record_cursor(cursor)))
+            
+            # Every key in the chosen index matches the filters, so a page is a plain slice
+            start = max(high - limit, low)
+            page = [dict(self.records_by_id[key[1]]) for key in reversed(keys[start:high])]
+            return page, encode_record_cursor(page[-1]) if page and start > low else None
+    
+    def save_twin(self, twin):
+        with self.lock:
+            self.twins[twin['vehicle_id']] = json.loads(json.dumps(twin, default=json_default))
+    
+    def load_twin(self, vehicle_id):
+        with self.lock:
+            twin = self.twins.get(vehicle_id)
+            return json.loads(json.dumps(twin)) if twin else None
+    
+    def flush(self):
+        pass
+
+class SQLiteSessionStore:
+    """SQLite (WAL) store shared by every replica on the host, with batched writes"""
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS sessions (
+            session_id TEXT PRIMARY KEY, payload TEXT NOT NULL, updated_at TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS messages (
+            session_id TEXT NOT NULL, seq INTEGER NOT NULL, message_id TEXT NOT NULL,
+            role TEXT NOT NULL, content TEXT NOT NULL, created_at TEXT NOT NULL,
+            PRIMARY KEY (session_id, seq)
+        );
+        CREATE TABLE IF NOT EXISTS sentiment (
+            session_id TEXT NOT NULL, timestamp TEXT NOT NULL, sentiment TEXT NOT NULL,
+            emotion TEXT NOT NULL, frustration_score INTEGER NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_sentiment_session ON sentiment (session_id, timestamp);
+        CREATE TABLE IF NOT EXISTS service_records (
+            record_id TEXT PRIMARY KEY, vehicle_id TEXT NOT NULL, timestamp TEXT NOT NULL,
+            service_type TEXT NOT NULL, payload TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_service_records_vehicle ON service_records (vehicle_id, timestamp, record_id);
+        CREATE INDEX IF NOT EXISTS idx_service_records_type ON service_records (service_type, timestamp, record_id);
+        CREATE INDEX IF NOT EXISTS idx_service_records_vehicle_type
+            ON service_records (vehicle_id, service_type, timestamp, record_id);
+        CREATE INDEX IF NOT EXISTS idx_service_records_time ON service_records (timestamp, record_id);
+        CREATE TABLE IF NOT EXISTS twins (
+            vehicle_id TEXT PRIMARY KEY, payload TEXT NOT NULL, updated_at TEXT NOT NULL
+        );
+    """
+    
+    def __init__(self, path, batch_size):
+        self.batch_size = batch_size
+        self.pending = []
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(self.SCHEMA)
+    
+    def _write(self, sql, params):
+        """Queue a write; the batch is committed in one transaction when full or on flush"""
+        with self.lock:
+            self.pending.append((sql, params))
+            if len(self.pending) >= self.batch_size:
+                self._flush_locked()
+    
+    def _flush_locked(self):
+        if not self.pending:
+            return
+        with self.db:
+            for sql, params in self.pending:
+                self.db.execute(sql, params)
+        self.pending = []
+    
+    def flush(self):
+        with self.lock:
+            self._flush_locked()
+    
+    def _query(self, sql, params):
+        # Reads see this process's queued writes
+        with self.lock:
+            self._flush_locked()
+            return self.db.execute(sql, params).fetchall()
+    
+    def save_session(self, session_id, profile):
+        self._write(
+            "INSERT OR REPLACE INTO sessions (session_id, payload, updated_at) VALUES (?, ?, ?)",
+            (session_id, json.dumps(profile, default=json_default), datetime.now().isoformat())
+        )
+    
+    def load_session(self, session_id):
+        rows = self._query("SELECT payload FROM sessions WHERE session_id = ?", (session_id,))
+        return json.loads(rows[0][0]) if rows else None
+    
+    def append_message(self, session_id, message):
+        self._write(
+            "INSERT OR REPLACE INTO messages (session_id, seq, message_id, role, content, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+            (session_id, message['seq'], message['id'], message['role'], message['content'], datetime.now().isoformat())
+        )
+    
+    def load_messages(self, session_id, limit, before_seq=None):
+        """Page of messages (oldest first) with seq below before_seq"""
+        rows = self._query(
+            "SELECT seq, message_id, role, content FROM messages WHERE session_id = ? AND seq < ? ORDER BY seq DESC LIMIT ?",
+            (session_id, before_seq if before_seq is not None else 2 ** 62, limit)
+        )
+        return [{'seq': seq, 'id': message_id, 'role': role, 'content': content} for seq, message_id, role, content in reversed(rows)]
+    
+    def count_messages(self, session_id):
+        return self._query("SELECT COUNT(*) FROM messages WHERE session_id = ?", (session_id,))[0][0]
+    
+    def append_sentiment(self, session_id, entry):
+        self._write(
+            "INSERT INTO sentiment (session_id, timestamp, sentiment, emotion, frustration_score) VALUES (?, ?, ?, ?, ?)",
+            (session_id, entry['timestamp'], entry['sentiment'], entry['emotion'], entry['frustration_score'])
+        )
+    
+    def load_sentiment(self, session_id):
+        rows = self._query(
+            "SELECT timestamp, sentiment, emotion, frustration_score FROM sentiment WHERE session_id = ? ORDER BY timestamp",
+            (session_id,)
+        )
+        return [
+            {'timestamp': timestamp, 'sentiment': sentiment, 'emotion': emotion, 'frustration_score': frustration_score}
+            for timestamp, sentiment, emotion, frustration_score in rows
+        ]
+    
+    def add_service_record(self, record):
+        self._write(
+            "INSERT OR REPLACE INTO service_records (record_id, vehicle_id, timestamp, service_type, payload) VALUES (?, ?, ?, ?, ?)",
+            (record['record_id'], record['vehicle_id'], record['timestamp'], record['service_type'],
+             json.dumps(record, default=json_default))
+        )
+    
+    def load_service_records(self, vehicle_id):
+        rows = self._query(
+            "SELECT payload FROM service_records WHERE vehicle_id = ? ORDER BY timestamp", (vehicle_id,)
+        )
+        return [json.loads(payload) for (payload,) in rows]
+    
+    def query_service_records(self, vehicle_id=None, service_type=None, since=None, until=None, cursor=None, limit=20):
+        """Newest-first page of records matching the filters; returns (records, next_cursor)"""
+        clauses, params = [], []
+        if vehicle_id is not None:
+            clauses.append("vehicle_id = ?")
+            params.append(vehicle_id)
+        if service_type is not None:
+            clauses.append("service_type = ?")
+            params.append(service_type)
+        if since:
+            clauses.append("timestamp >= ?")
+            params.append(since)
+        if until:
+            clauses.append("timestamp <= ?")
+            params.append(until + "\uffff")
+        if cursor:
+            clauses.append("(timestamp, record_id) < (?, ?)")
+            params.extend(decode_record_cursor(cursor))
+        
+        where = ("WHERE " + " AND ".join(clauses)) if clauses else ""
+        rows = self._query(
+            f"SELECT payload FROM service_records {where} ORDER BY timestamp DESC, record_id DESC LIMIT ?",
+            tuple(params) + (limit + 1,)
+        )
+        page = [json.loads(payload) for (payload,) in rows[:limit]]
+        return page, encode_record_cursor(page[-1]) if len(rows) > limit else None
+    
+    def save_twin(self, twin):
+        self._write(
+            "INSERT OR REPLACE INTO twins (vehicle_id, payload, updated_at) VALUES (?, ?, ?)",
+            (twin['vehicle_id'], json.dumps(twin, default=json_default), datetime.now().isoformat())
+        )
+    
+    def load_twin(self, vehicle_id):
+        rows = self._query("SELECT payload FROM twins WHERE vehicle_id = ?", (vehicle_id,))
+        return json.loads(rows[0][0]) if rows else None
+
+@st.cache_resource
+def get_session_store():
+    """Storage backend selected by NEXASERVE_STORE, shared across sessions in the process"""
+    if SESSION_STORE_BACKEND == "sqlite":
+        return SQLiteSessionStore(SESSION_STORE_PATH, STORE_BATCH_SIZE)
+    return InMemorySessionStore()
+
+def save_session_profile():
+    """Persist the small per-session fields needed to hydrate the session after a reload"""
+    get_session_store().save_session(st.session_state.session_id, {
+        'user_authenticated': st.session_state.user_authenticated,
+        'user_name': st.session_state.user_name,
+        'user_vehicle_id': st.session_state.user_vehicle_id,
+        'twin_vehicle_id': st.session_state.digital_twin_data['vehicle_id'],
+        'current_sentiment': st.session_state.current_sentiment,
+        'frustration_score': st.session_state.frustration_score
+    })
+
+def append_chat_message(role, content):
+    """Append a chat message to the session and the store"""
+    message = {
+        'id': uuid.uuid4().hex,
+        'seq': st.session_state.message_count,
+        'role': role,
+        'content': content
+    }
+    st.session_state.message_count += 1
+    st.session_state.messages.append(message)
+    get_session_store().append_message(st.session_state.session_id, message)
+    return message
+
+def load_earlier_messages():
+    """Load the next older page of the transcript for display"""
+    shown = st.session_state.earlier_messages or st.session_state.messages
+    if not shown or shown[0]['seq'] == 0:
+        return []
+    page = get_session_store().load_messages(st.session_state.session_id, HISTORY_PAGE_SIZE, shown[0]['seq'])
+    st.session_state.earlier_messages = page + st.session_state.earlier_messages
+    return page
+
+def load_sentiment_history():
+    """Sentiment history, fetched from the store the first time a page needs it"""
+    if st.session_state.sentiment_history is None:
+        st.session_state.sentiment_history = get_session_store().load_sentiment(st.session_state.session_id)
+    return st.session_state.sentiment_history
+
+def load_service_records():
+    """Service records for the current vehicle, fetched from the store on first use"""
+    if st.session_state.service_records is None:
+        st.session_state.service_records = get_session_store().load_service_records(
+            st.session_state.digital_twin_data['vehicle_id']
+        )
+    return st.session_state.service_records
+
+# ================================
+# SESSION STATE INITIALIZATION
+# ================================
+
+def initialize_session_state():
+    """Initialize all session state variables"""
+    
+    store = get_session_store()
+    profile = {}
+    new_session = False
+    
+    # User Session: the id is kept in the URL so a reload hydrates from the store
+    if 'session_id' not in st.session_state:
+        st.session_state.session_id = st.query_params.get("sid") or str(uuid.uuid4())
+        st.query_params["sid"] = st.session_state.session_id
+        profile = store.load_session(st.session_state.session_id) or {}
+        new_session = not profile
+    
+    if 'user_authenticated' not in st.session_state:
+        st.session_state.user_authenticated = profile.get('user_authenticated', False)
+    
+    if 'user_name' not in st.session_state:
+        st.session_state.user_name = profile.get('user_name', "")
+    
+    if 'user_vehicle_id' not in st.session_state:
+        st.session_state.user_vehicle_id = profile.get('user_vehicle_id', "")
+    
+    # Chat History: only the latest page, older pages load on demand. The next seq follows the
+    # stored transcript, which every append reaches, rather than the less often saved profile
+    if 'messages' not in st.session_state:
+        st.session_state.messages = store.load_messages(st.session_state.session_id, HISTORY_PAGE_SIZE)
+        st.session_state.message_count = st.session_state.messages[-1]['seq'] + 1 if st.session_state.messages else 0
+        st.session_state.earlier_messages = []
+    
+    if 'context_summary' not in st.session_state:
+        st.session_state.context_summary = {'covered': 0, 'text': ""}
+    if 'context_summary_job' not in st.session_state:
+        st.session_state.context_summary_job = None
+    
+    # Sentiment Tracking: history is loaded by the analytics page
+    if 'sentiment_history' not in st.session_state:
+        st.session_state.sentiment_history = None if profile else []
+    
+    if 'current_sentiment' not in st.session_state:
+        st.session_state.current_sentiment = profile.get('current_sentiment', "neutral")
+    
+    if 'frustration_score' not in st.session_state:
+        st.session_state.frustration_score = profile.get('frustration_score', 0)
+    
+    # Digital Twin Data
+    if 'digital_twin_data' not in st.session_state:
+        twin = store.load_twin(profile['twin_vehicle_id']) if profile.get('twin_vehicle_id') else None
+        if twin is None:
+            twin = generate_digital_twin_data()
+            store.save_twin(twin)
+        st.session_state.digital_twin_data = twin
+    
+    # Service Records (Blockchain Simulation): loaded by the pages that show them
+    if 'service_records' not in st.session_state:
+        st.session_state.service_records = None if profile else []
+    
+    if new_session:
+        save_session_profile()
+    
+    # AR Session
+    if 'ar_session_active' not in st.session_state:
+        st.session_state.ar_session_active = False
+    
+    # Issue Classification
+    if 'current_issue' not in st.session_state:
+        st.session_state.current_issue = None
+    
+    # Service Appointment
+    if 'appointment_scheduled' not in st.session_state:
+        st.session_state.appointment_scheduled = False
+    
+    # Background jobs in flight and the last failure, by kind, and the last booking they produced
+    if 'jobs' not in st.session_state:
+        st.session_state.jobs = {}
+    if 'job_errors' not in st.session_state:
+        st.session_state.job_errors = {}
+    
+    if 'last_appointment' not in st.session_state:
+        st.session_state.last_appointment = None
+    
+    # Current image uploads by file id, prepared once so reruns do not decode them again
+    if 'prepared_uploads' not in st.session_state:
+        st.session_state.prepared_uploads = {}
+    
+    # Voice transcript waiting to run as a chat turn, and timing of the last transcription
+    if 'voice_transcript' not in st.session_state:
+        st.session_state.voice_transcript = None
+    
+    if 'last_transcription' not in st.session_state:
+        st.session_state.last_transcription = None
+    
+    if 'ar_session_data' not in st.session_state:
+        st.session_state.ar_session_data = None
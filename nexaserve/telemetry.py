@@ -0,0 +1,214 @@
+"""CAN/OBD telemetry wire format, frame sources and ingestion into the twin store"""
+
+import streamlit as st
+import numpy as np
+import threading
+import socket
+from queue import Queue
+
+from .config import TELEMETRY_SOURCE, TELEMETRY_BATCH_FRAMES, HISTORY_PATH
+from .history import MetricHistoryStore
+from .rules import get_rule_engine
+from .twin import TWIN_METRICS, FleetTwinStore
+
+# Wire format for CAN/OBD readings: one fixed-width little-endian record per signal sample
+TELEMETRY_FRAME_DTYPE = np.dtype([
+    ('ts', '<f8'),
+    ('vehicle', '<u4'),
+    ('signal', '<u2'),
+    ('value', '<f4')
+])
+
+# Signal codes index into this tuple; only ever append so recorded feeds stay valid
+TELEMETRY_SIGNALS = tuple(TWIN_METRICS) + ('mileage',)
+TELEMETRY_SIGNAL_CODES = {name: code for code, name in enumerate(TELEMETRY_SIGNALS)}
+
+def encode_telemetry_frames(ts, vehicle_keys, signals, values):
+    """Pack parallel arrays of readings into wire-format bytes"""
+    frames = np.empty(len(ts), dtype=TELEMETRY_FRAME_DTYPE)
+    frames['ts'] = ts
+    frames['vehicle'] = vehicle_keys
+    frames['signal'] = signals
+    frames['value'] = values
+    return frames.tobytes()
+
+def file_frame_source(path, batch_frames=TELEMETRY_BATCH_FRAMES):
+    """Byte chunks replayed from a recorded telemetry file"""
+    chunk_size = batch_frames * TELEMETRY_FRAME_DTYPE.itemsize
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+def socket_frame_source(address, batch_frames=TELEMETRY_BATCH_FRAMES):
+    """Byte chunks read from a TCP telemetry feed until the peer closes"""
+    chunk_size = batch_frames * TELEMETRY_FRAME_DTYPE.itemsize
+    with socket.create_connection(address) as sock:
+        while True:
+            chunk = sock.recv(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+def queue_frame_source(frame_queue):
+    """Byte chunks put on a local queue by an in-process producer; None ends the stream"""
+    while True:
+        chunk = frame_queue.get()
+        if chunk is None:
+            return
+        yield chunk
+
+class TelemetryIngestor:
+    """Micro-batches telemetry frames into a FleetTwinStore
+    
+    Each batch is decoded in one np.frombuffer call, reduced to the latest reading per
+    (vehicle, signal) and scattered into the metric columns. Only the vehicles a batch
+    touched are re-scored and re-evaluated against the rules, and only those whose set of
+    firing rules changed are reported as alert changes.
+    """
+    
+    def __init__(self, store, rules=None):
+        self.store = store
+        self.rules = rules
+        self.pending = bytearray()
+        self.fired = None
+        self.fired_rules = None
+        self.updated_at = np.zeros(0)
+        self.alert_changes = set()
+        self.listeners = []
+        self.stats = {'frames': 0, 'batches': 0, 'dropped': 0, 'crossed': 0}
+        self.lock = threading.Lock()
+    
+    def feed(self, chunk):
+        """Apply the whole frames in a chunk as one micro-batch; sources size chunks by TELEMETRY_BATCH_FRAMES"""
+        self.pending += chunk
+        self.flush()
+    
+    def flush(self):
+        """Apply every complete buffered frame, keeping a trailing partial frame for the next chunk"""
+        complete = len(self.pending) // TELEMETRY_FRAME_DTYPE.itemsize
+        if not complete:
+            return
+        frames = np.frombuffer(self.pending, dtype=TELEMETRY_FRAME_DTYPE, count=complete).copy()
+        del self.pending[:complete * TELEMETRY_FRAME_DTYPE.itemsize]
+        self.apply(frames)
+    
+    def run(self, source):
+        """Consume a frame source to exhaustion; returns the ingestion stats"""
+        for chunk in source:
+            self.feed(chunk)
+        self.flush()
+        return self.stats
+    
+    def _sync_rules(self, rules):
+        # Full evaluation only when the rule set or fleet size changed since the last batch
+        store = self.store
+        if self.fired is None or self.fired_rules is not rules or len(self.fired) != store.size:
+            self.fired = np.ascontiguousarray(rules.evaluate(store))
+            self.fired_rules = rules
+        if len(self.updated_at) < store.size:
+            self.updated_at = np.concatenate([self.updated_at, np.zeros(store.size - len(self.updated_at))])
+    
+    def apply(self, frames):
+        """Apply one decoded batch of frames to the store"""
+        with self.lock:
+            store = self.store
+            rows = store.rows_for_keys(frames['vehicle'])
+            known = (rows >= 0) & (frames['signal'] < len(TELEMETRY_SIGNALS))
+            self.stats['frames'] += len(frames)
+            self.stats['batches'] += 1
+            self.stats['dropped'] += len(frames) - int(np.count_nonzero(known))
+            if not known.any():
+                return
+            rows, signals = rows[known], frames['signal'][known]
+            values, ts = frames['value'][known], frames['ts'][known]
+            for listener in self.listeners:
+                listener(frames['vehicle'][known], signals, ts, values)
+            
+            rules = self.rules or get_rule_engine().rules()
+            self._sync_rules(rules)
+            
+            # Latest reading per (vehicle, signal) wins within the batch
+            slots = rows * len(TELEMETRY_SIGNALS) + signals
+            _, last = np.unique(slots[::-1], return_index=True)
+            last = len(slots) - 1 - last
+            rows, signals, values, ts = rows[last], signals[last], values[last], ts[last]
+            
+            for code in np.unique(signals):
+                mask = signals == code
+                column = store.columns[TELEMETRY_SIGNALS[code]]
+                column[rows[mask]] = np.rint(values[mask]) if column.dtype.kind in 'iu' else values[mask]
+            
+            touched = np.unique(rows)
+            store.refresh_health_scores(touched)
+            
+            np.maximum.at(self.updated_at, rows, ts)
+            fired = rules.evaluate(store, touched)
+            crossed = touched[(fired != self.fired[touched]).any(axis=1)]
+            self.fired[touched] = fired
+            self.alert_changes.update(crossed.tolist())
+            self.stats['crossed'] += len(crossed)
+    
+    def drain_alert_changes(self):
+        """Rows whose firing rules changed since the last drain"""
+        with self.lock:
+            rows = sorted(self.alert_changes)
+            self.alert_changes.clear()
+            return rows
+
+class TelemetryHub:
+    """Process-wide fleet twin fed from the configured telemetry source on a background thread"""
+    
+    def __init__(self, source_spec):
+        self.source_spec = source_spec
+        self.store = FleetTwinStore()
+        self.ingestor = TelemetryIngestor(self.store)
+        self.history = MetricHistoryStore(TELEMETRY_SIGNALS, HISTORY_PATH)
+        self.ingestor.listeners.append(self.history.record)
+        self.queue = Queue()
+        self.error = None
+        self.thread = None
+        if source_spec:
+            self.thread = threading.Thread(target=self._consume, name='nexaserve-telemetry', daemon=True)
+            self.thread.start()
+    
+    def _source(self):
+        kind, _, target = self.source_spec.partition(':')
+        if kind == 'file':
+            return file_frame_source(target)
+        if kind == 'tcp':
+            host, _, port = target.rpartition(':')
+            return socket_frame_source((host, int(port)))
+        if kind == 'queue':
+            return queue_frame_source(self.queue)
+        raise ValueError(f"Unknown telemetry source '{self.source_spec}'")
+    
+    def _consume(self):
+        try:
+            self.ingestor.run(self._source())
+        except (OSError, ValueError) as e:
+            self.error = str(e)
+        finally:
+            self.history.flush()
+    
+    def register_twin(self, twin):
+        """Track a session's vehicle in the fleet store if it is not there yet"""
+        with self.ingestor.lock:
+            if twin['vehicle_id'] not in self.store.row_index:
+                self.store.load_views([twin])
+    
+    def twin_update(self, vehicle_id, since):
+        """(updated_at, view) if telemetry touched the vehicle after since, else None"""
+        with self.ingestor.lock:
+            row = self.store.row_index.get(vehicle_id)
+            updated_at = self.ingestor.updated_at
+            if row is None or row >= len(updated_at) or updated_at[row] <= since:
+                return None
+            return float(updated_at[row]), self.store.vehicle_view(row)
+
+@st.cache_resource
+def get_telemetry_hub():
+    """Process-wide telemetry hub shared by every session"""
+    return TelemetryHub(TELEMETRY_SOURCE)
@@ -0,0 +1,236 @@
+"""Digital twin simulation over a columnar fleet store"""
+
+import numpy as np
+from datetime import datetime
+import zlib
+
+from .config import RUL_DEFAULT_TIER
+from .history import get_rul_forecaster
+from .rules import get_rule_engine
+
+# ================================
+# DIGITAL TWIN SIMULATION
+# ================================
+
+# Component metrics stored as fleet columns: name -> (low, high, dtype); integer ranges exclude high
+TWIN_METRICS = {
+    'engine.health': (85, 100, np.int16),
+    'engine.temperature': (85, 95, np.int16),
+    'engine.oil_level': (70, 100, np.int16),
+    'engine.next_oil_change': (1000, 5000, np.int32),
+    'brakes.front_pad_wear': (20, 60, np.int16),
+    'brakes.rear_pad_wear': (25, 55, np.int16),
+    'brakes.fluid_level': (80, 100, np.int16),
+    'brakes.health': (75, 95, np.int16),
+    'transmission.health': (85, 98, np.int16),
+    'transmission.performance': (90, 100, np.int16),
+    'battery.voltage': (12.4, 12.8, np.float32),
+    'battery.health': (80, 100, np.int16),
+    'battery.estimated_life': (12, 36, np.int16),
+    'tires.front_left': (60, 95, np.int16),
+    'tires.front_right': (60, 95, np.int16),
+    'tires.rear_left': (65, 95, np.int16),
+    'tires.rear_right': (65, 95, np.int16),
+    'suspension.health': (75, 95, np.int16)
+}
+
+# Vehicle-level columns: mileage, health score and service dates as day offsets from generation
+TWIN_VEHICLE_FIELDS = {
+    'mileage': (5000, 25000, np.int32),
+    'health_score': (75, 98, np.int16),
+    'last_service_days_ago': (30, 180, np.int16),
+    'next_service_in_days': (10, 90, np.int16)
+}
+
+# Component health metrics averaged into the overall health score when telemetry updates a vehicle
+TWIN_HEALTH_METRICS = ('engine.health', 'brakes.health', 'transmission.health', 'battery.health', 'suspension.health')
+
+# Descriptive component fields the simulation does not vary
+TWIN_STATIC_FIELDS = {
+    'transmission.fluid_condition': 'Good',
+    'tires.pressure_status': 'Optimal',
+    'suspension.shock_absorbers': 'Good'
+}
+
+class FleetTwinStore:
+    """Struct-of-arrays digital twin store: one NumPy column per metric, one row per vehicle"""
+    
+    def __init__(self, capacity=1024):
+        self.size = 0
+        self.vehicle_ids = np.empty(capacity, dtype=object)
+        self.vehicle_keys = np.zeros(capacity, dtype=np.uint32)
+        self.row_index = {}
+        self._key_order = None
+        self.columns = {
+            name: np.zeros(capacity, dtype=dtype)
+            for name, (_, _, dtype) in {**TWIN_METRICS, **TWIN_VEHICLE_FIELDS}.items()
+        }
+        self.last_service = np.zeros(capacity, dtype='datetime64[D]')
+        self.next_service_due = np.zeros(capacity, dtype='datetime64[D]')
+        self.model = 'Volkswagen Taigun Highline'
+        self.year = 2023
+    
+    def _reserve(self, extra):
+        needed = self.size + extra
+        capacity = len(self.vehicle_ids)
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        self.vehicle_ids = np.resize(self.vehicle_ids, capacity)
+        self.vehicle_keys = np.resize(self.vehicle_keys, capacity)
+        for name in self.columns:
+            self.columns[name] = np.resize(self.columns[name], capacity)
+        self.last_service = np.resize(self.last_service, capacity)
+        self.next_service_due = np.resize(self.next_service_due, capacity)
+    
+    @classmethod
+    def generate(cls, count, rng=None):
+        """Simulate a fleet of count vehicles in one batched pass per column"""
+        store = cls(capacity=max(count, 1))
+        store.append_generated(count, rng)
+        return store
+    
+    def append_generated(self, count, rng=None):
+        """Append count simulated vehicles; returns their row indices"""
+        rng = rng or np.random.default_rng()
+        self._reserve(count)
+        rows = np.arange(self.size, self.size + count)
+        
+        for name, (low, high, dtype) in {**TWIN_METRICS, **TWIN_VEHICLE_FIELDS}.items():
+            if np.issubdtype(dtype, np.floating):
+                values = np.round(rng.uniform(low, high, count), 2)
+            else:
+                values = rng.integers(low, high, count)
+            self.columns[name][rows] = values
+        
+        today = np.datetime64(datetime.now().date(), 'D')
+        self.last_service[rows] = today - self.columns['last_service_days_ago'][rows].astype('timedelta64[D]')
+        self.next_service_due[rows] = today + self.columns['next_service_in_days'][rows].astype('timedelta64[D]')
+        
+        suffixes = rng.integers(0, 16 ** 8, count)
+        for row, suffix in zip(rows, suffixes):
+            vehicle_id = f"VW-{int(suffix):08X}"
+            while vehicle_id in self.row_index:
+                vehicle_id = f"VW-{int(rng.integers(0, 16 ** 8)):08X}"
+            self.vehicle_ids[row] = vehicle_id
+            self.vehicle_keys[row] = telemetry_vehicle_key(vehicle_id)
+            self.row_index[vehicle_id] = int(row)
+        
+        self.size += count
+        return rows
+    
+    @classmethod
+    def from_views(cls, twins):
+        """Columnar store built from single-vehicle dicts"""
+        store = cls(capacity=max(len(twins), 1))
+        store.load_views(twins)
+        return store
+    
+    def load_views(self, twins):
+        """Append (or overwrite, by vehicle_id) rows from single-vehicle dicts"""
+        for twin in twins:
+            row = self.row_index.get(twin['vehicle_id'])
+            if row is None:
+                self._reserve(1)
+                row = self.size
+                self.size += 1
+                self.vehicle_ids[row] = twin['vehicle_id']
+                self.vehicle_keys[row] = telemetry_vehicle_key(twin['vehicle_id'])
+                self.row_index[twin['vehicle_id']] = row
+            
+            for name in TWIN_METRICS:
+                component, metric = name.split('.')
+                self.columns[name][row] = twin['components'][component][metric]
+            self.columns['mileage'][row] = twin['mileage']
+            self.columns['health_score'][row] = twin['health_score']
+            self.last_service[row] = np.datetime64(twin['last_service'], 'D')
+            self.next_service_due[row] = np.datetime64(twin['next_service_due'], 'D')
+    
+    def column(self, name):
+        """Live slice of a metric column over the populated rows"""
+        return self.columns[name][:self.size]
+    
+    def rows_for_keys(self, keys):
+        """Row index per telemetry vehicle key, -1 for vehicles not in the store"""
+        if self.size == 0:
+            return np.full(len(keys), -1, dtype=np.int64)
+        if self._key_order is None or len(self._key_order) != self.size:
+            self._key_order = np.argsort(self.vehicle_keys[:self.size], kind='stable')
+        sorted_keys = self.vehicle_keys[self._key_order]
+        positions = np.minimum(np.searchsorted(sorted_keys, keys), self.size - 1)
+        return np.where(sorted_keys[positions] == keys, self._key_order[positions], -1)
+    
+    def refresh_health_scores(self, rows):
+        """Recompute overall health for the given rows from their component health metrics"""
+        health = np.mean([self.columns[name][rows] for name in TWIN_HEALTH_METRICS], axis=0)
+        self.columns['health_score'][rows] = np.rint(health)
+    
+    def evaluate_alerts(self, rules=None):
+        """Vectorized predictive-maintenance rules over the whole fleet: (vehicles x rules) boolean matrix"""
+        rules = rules or get_rule_engine().rules()
+        return rules.evaluate(self)
+    
+    def fleet_alert_rows(self, rules=None, fired=None):
+        """Row indices of alerting vehicles per rule id"""
+        rules = rules or get_rule_engine().rules()
+        fired = fired if fired is not None else rules.evaluate(self)
+        return {rule['id']: np.flatnonzero(fired[:, index]) for index, rule in enumerate(rules.rules)}
+    
+    def alerts_for_row(self, row, rules=None, fired=None):
+        """Materialize alert dicts for one vehicle from a fleet evaluation"""
+        rules = rules or get_rule_engine().rules()
+        fired = fired if fired is not None else rules.evaluate(self)
+        return rules.alerts_for_row(self, row, fired[row])
+    
+    def rul_forecasts(self, metric, target, tier=RUL_DEFAULT_TIER, kind='linear'):
+        """Remaining-useful-life (days, low, high) arrays for every vehicle from their metric history"""
+        return get_rul_forecaster().forecast(self.vehicle_keys[:self.size], metric, target, tier=tier, kind=kind)
+    
+    def vehicle_view(self, row, alerts=None):
+        """Single-vehicle dict in the shape the dashboards and prompts consume"""
+        components = {}
+        for name in TWIN_METRICS:
+            component, metric = name.split('.')
+            value = self.columns[name][row]
+            components.setdefault(component, {})[metric] = float(value) if np.issubdtype(value.dtype, np.floating) else int(value)
+        for name, value in TWIN_STATIC_FIELDS.items():
+            component, field = name.split('.')
+            components[component][field] = value
+        components['battery']['voltage'] = round(components['battery']['voltage'], 2)
+        
+        return {
+            'vehicle_id': self.vehicle_ids[row],
+            'model': self.model,
+            'year': self.year,
+            'mileage': int(self.columns['mileage'][row]),
+            'last_service': str(self.last_service[row]),
+            'next_service_due': str(self.next_service_due[row]),
+            'health_score': int(self.columns['health_score'][row]),
+            'components': components,
+            'predictive_alerts': alerts if alerts is not None else []
+        }
+
+def generate_digital_twin_data():
+    """Generate realistic digital twin data for vehicle"""
+    return FleetTwinStore.generate(1).vehicle_view(0)
+
+def update_digital_twin_predictions(twin_data):
+    """Generate predictive maintenance alerts"""
+    store = FleetTwinStore.from_views([twin_data])
+    twin_data['predictive_alerts'] = store.alerts_for_row(0)
+    return twin_data
+
+# ================================
+# TELEMETRY INGESTION
+# ================================
+
+def telemetry_vehicle_key(vehicle_id):
+    """32-bit key telemetry frames use to address a vehicle"""
+    suffix = vehicle_id[3:] if vehicle_id.startswith('VW-') else ''
+    if len(suffix) == 8:
+        try:
+            return int(suffix, 16)
+        except ValueError:
+            pass
+    return zlib.crc32(vehicle_id.encode('utf-8'))
@@ -0,0 +1,181 @@
+"""Session twin views: memoized alerts and figures, live telemetry sync"""
+
+import streamlit as st
+import json
+from datetime import datetime
+import hashlib
+
+from .config import TWIN_VIEW_CACHE_ENTRIES
+from .rules import get_rule_engine
+from .twin import FleetTwinStore, telemetry_vehicle_key
+from .telemetry import get_telemetry_hub
+from .session import json_default, get_session_store
+
+# ================================
+# TWIN VIEW CACHE
+# ================================
+
+TWIN_CHART_COMPONENTS = [
+    ('Engine', 'engine'),
+    ('Brakes', 'brakes'),
+    ('Transmission', 'transmission'),
+    ('Battery', 'battery'),
+    ('Suspension', 'suspension')
+]
+
+def twin_fingerprint(twin_data):
+    """Content hash of the twin, ignoring derived alerts"""
+    content = {k: v for k, v in twin_data.items() if k != 'predictive_alerts'}
+    return hashlib.sha256(
+        json.dumps(content, sort_keys=True, default=json_default).encode('utf-8')
+    ).hexdigest()
+
+def get_twin_fingerprint():
+    """Fingerprint of the session's twin, hashed once per change rather than per rerun"""
+    if st.session_state.get('twin_fingerprint') is None:
+        st.session_state.twin_fingerprint = twin_fingerprint(st.session_state.digital_twin_data)
+    return st.session_state.twin_fingerprint
+
+def invalidate_twin_cache(clear_all=False):
+    """Mark the session's twin as changed; clear_all also drops every memoized view"""
+    st.session_state.twin_fingerprint = None
+    if clear_all:
+        cached_twin_alerts.clear()
+        component_health_figure_json.clear()
+        tire_health_figure_json.clear()
+
+@st.cache_data(max_entries=TWIN_VIEW_CACHE_ENTRIES, show_spinner=False)
+def cached_twin_alerts(fingerprint, rules_version, history_version, day, _twin_data):
+    """Predictive alerts for one twin state, rule set version, metric history version and calendar day"""
+    return FleetTwinStore.from_views([_twin_data]).alerts_for_row(0)
+
+@st.cache_data(max_entries=TWIN_VIEW_CACHE_ENTRIES, show_spinner=False)
+def component_health_figure_json(fingerprint, _twin_data):
+    """Component health bar chart as Plotly JSON"""
+    import plotly.graph_objects as go
+    
+    components = _twin_data['components']
+    component_names = [label for label, _ in TWIN_CHART_COMPONENTS]
+    health_values = [components[key]['health'] for _, key in TWIN_CHART_COMPONENTS]
+    
+    fig = go.Figure()
+    
+    fig.add_trace(go.Bar(
+        x=component_names,
+        y=health_values,
+        marker=dict(
+            color=health_values,
+            colorscale='RdYlGn',
+            cmin=0,
+            cmax=100,
+            showscale=True
+        ),
+        text=[f"{v}%" for v in health_values],
+        textposition='auto',
+    ))
+    
+    fig.update_layout(
+        title='Component Health Analysis',
+        yaxis_title='Health Score (%)',
+        yaxis=dict(range=[0, 100]),
+        height=400,
+        template='plotly_white'
+    )
+    
+    return fig.to_json()
+
+@st.cache_data(max_entries=TWIN_VIEW_CACHE_ENTRIES, show_spinner=False)
+def tire_health_figure_json(fingerprint, _twin_data):
+    """Tire health polar chart as Plotly JSON"""
+    import plotly.graph_objects as go
+    
+    tire_data = _twin_data['components']['tires']
+    
+    fig_tire = go.Figure()
+    
+    fig_tire.add_trace(go.Scatterpolar(
+        r=[tire_data['front_left'], tire_data['front_right'], 
+           tire_data['rear_right'], tire_data['rear_left']],
+        theta=['Front Left', 'Front Right', 'Rear Right', 'Rear Left'],
+        fill='toself',
+        name='Tire Health'
+    ))
+    
+    fig_tire.update_layout(
+        polar=dict(radialaxis=dict(visible=True, range=[0, 100])),
+        showlegend=False,
+        height=350
+    )
+    
+    return fig_tire.to_json()
+
+def metric_label(name):
+    """Readable label for a twin metric name like 'brakes.front_pad_wear'"""
+    return ' · '.join(part.replace('_', ' ').title() for part in name.split('.'))
+
+def metric_trend_figure(series, metric):
+    """Rolled-up metric series as a mean line inside its min/max band"""
+    import pandas as pd
+    import plotly.graph_objects as go
+    
+    times = pd.to_datetime(series['ts'], unit='s')
+    
+    fig = go.Figure()
+    
+    fig.add_trace(go.Scatter(x=times, y=series['max'], mode='lines', line=dict(width=0), showlegend=False, hoverinfo='skip'))
+    fig.add_trace(go.Scatter(
+        x=times,
+        y=series['min'],
+        mode='lines',
+        line=dict(width=0),
+        fill='tonexty',
+        fillcolor='rgba(0, 30, 80, 0.15)',
+        name='Min / Max'
+    ))
+    fig.add_trace(go.Scatter(x=times, y=series['mean'], mode='lines+markers', line=dict(color='#001e50'), name='Mean'))
+    
+    fig.update_layout(
+        title=f'{metric_label(metric)} Trend',
+        height=350,
+        template='plotly_white',
+        hovermode='x unified'
+    )
+    
+    return fig
+
+def twin_figure(fig_json):
+    """Rehydrate a memoized figure for st.plotly_chart"""
+    import plotly.io as pio
+    
+    return pio.from_json(fig_json)
+
+def refresh_twin_predictions():
+    """Session twin with alerts recomputed only when the twin, rules, its history or the date changed"""
+    twin_data = st.session_state.digital_twin_data
+    engine = get_rule_engine()
+    engine.rules()
+    history_version = get_telemetry_hub().history.row_version(telemetry_vehicle_key(twin_data['vehicle_id']))
+    twin_data['predictive_alerts'] = cached_twin_alerts(
+        get_twin_fingerprint(), engine.version, history_version, datetime.now().strftime('%Y-%m-%d'), twin_data
+    )
+    return twin_data
+
+# ================================
+# TELEMETRY INGESTION
+# ================================
+
+def sync_twin_telemetry():
+    """Pull telemetry applied to the session's vehicle since the last rerun into the session twin"""
+    hub = get_telemetry_hub()
+    if not hub.source_spec:
+        return False
+    twin = st.session_state.digital_twin_data
+    hub.register_twin(twin)
+    update = hub.twin_update(twin['vehicle_id'], st.session_state.get('twin_telemetry_ts', 0.0))
+    if update is None:
+        return False
+    st.session_state.twin_telemetry_ts, view = update
+    st.session_state.digital_twin_data = view
+    get_session_store().save_twin(view)
+    invalidate_twin_cache()
+    return True
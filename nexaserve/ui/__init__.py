@@ -0,0 +1,329 @@
+"""Streamlit app shell: page setup, sidebar and page routing"""
+
+import streamlit as st
+import importlib
+
+from ..llm import get_llm_client, get_llm_cache
+from ..session import get_session_store, save_session_profile, initialize_session_state
+
+# ================================
+# PAGE SETUP
+# ================================
+
+# Custom CSS for Professional Styling
+APP_CSS = """
+<style>
+    /* Main Theme */
+    .main {
+        background: linear-gradient(135deg, #1e3c72 0%, #2a5298 100%);
+    }
+    
+    /* Card Styling */
+    .metric-card {
+        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+        padding: 20px;
+        border-radius: 15px;
+        box-shadow: 0 8px 16px rgba(0,0,0,0.2);
+        margin: 10px 0;
+        color: white;
+    }
+    
+    .service-card {
+        background: white;
+        padding: 25px;
+        border-radius: 12px;
+        box-shadow: 0 4px 12px rgba(0,0,0,0.1);
+        margin: 15px 0;
+        border-left: 4px solid #667eea;
+    }
+    
+    /* Header Styling */
+    .main-header {
+        font-size: 48px;
+        font-weight: bold;
+        background: linear-gradient(120deg, #667eea, #764ba2, #f093fb);
+        -webkit-background-clip: text;
+        -webkit-text-fill-color: transparent;
+        text-align: center;
+        padding: 20px;
+        margin-bottom: 30px;
+    }
+    
+    .sub-header {
+        font-size: 24px;
+        color: #667eea;
+        font-weight: 600;
+        margin: 20px 0;
+        border-bottom: 3px solid #667eea;
+        padding-bottom: 10px;
+    }
+    
+    /* Chat Interface */
+    .chat-message {
+        padding: 15px;
+        border-radius: 10px;
+        margin: 10px 0;
+        animation: slideIn 0.3s ease-out;
+    }
+    
+    .user-message {
+        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+        color: white;
+        margin-left: 20%;
+    }
+    
+    .assistant-message {
+        background: #f7f7f7;
+        color: #333;
+        margin-right: 20%;
+        border-left: 4px solid #667eea;
+    }
+    
+    /* Emotion Indicators */
+    .emotion-positive {
+        color: #10b981;
+        font-weight: bold;
+    }
+    
+    .emotion-neutral {
+        color: #f59e0b;
+        font-weight: bold;
+    }
+    
+    .emotion-negative {
+        color: #ef4444;
+        font-weight: bold;
+        animation: pulse 1s infinite;
+    }
+    
+    /* Animations */
+    @keyframes slideIn {
+        from {
+            opacity: 0;
+            transform: translateY(20px);
+        }
+        to {
+            opacity: 1;
+            transform: translateY(0);
+        }
+    }
+    
+    @keyframes pulse {
+        0%, 100% {
+            opacity: 1;
+        }
+        50% {
+            opacity: 0.6;
+        }
+    }
+    
+    /* Status Badges */
+    .status-badge {
+        display: inline-block;
+        padding: 5px 15px;
+        border-radius: 20px;
+        font-size: 12px;
+        font-weight: bold;
+        margin: 5px;
+    }
+    
+    .status-active {
+        background: #10b981;
+        color: white;
+    }
+    
+    .status-pending {
+        background: #f59e0b;
+        color: white;
+    }
+    
+    .status-completed {
+        background: #3b82f6;
+        color: white;
+    }
+    
+    /* Blockchain Badge */
+    .blockchain-verified {
+        background: linear-gradient(135deg, #ffd700, #ffed4e);
+        padding: 5px 10px;
+        border-radius: 5px;
+        color: #000;
+        font-weight: bold;
+        display: inline-block;
+    }
+    
+    /* AR Indicator */
+    .ar-active {
+        background: #8b5cf6;
+        color: white;
+        padding: 10px;
+        border-radius: 8px;
+        animation: pulse 2s infinite;
+    }
+    
+    /* Sidebar Enhancement */
+    .sidebar .sidebar-content {
+        background: linear-gradient(180deg, #1e3c72 0%, #2a5298 100%);
+    }
+    
+    /* Button Styling */
+    .stButton>button {
+        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+        color: white;
+        border: none;
+        border-radius: 8px;
+        padding: 10px 25px;
+        font-weight: bold;
+        transition: all 0.3s;
+    }
+    
+    .stButton>button:hover {
+        transform: translateY(-2px);
+        box-shadow: 0 6px 12px rgba(0,0,0,0.2);
+    }
+</style>
+"""
+
+def configure_page():
+    """Page configuration and styling, applied at the start of every script run"""
+    st.set_page_config(
+        page_title="VW NexaServe AI - After-Sales Revolution",
+        page_icon="🚗",
+        layout="wide",
+        initial_sidebar_state="expanded"
+    )
+    st.markdown(APP_CSS, unsafe_allow_html=True)
+
+# ================================
+# MAIN APPLICATION
+# ================================
+
+# Navigation label -> (page module, render function); a page's module, and the heavy libraries
+# it charts or tabulates with, are only imported once that page is shown
+PAGES = {
+    "🏠 Home & Chat": ("chat", "render_chat_interface"),
+    "🔧 Digital Twin Dashboard": ("dashboards", "render_digital_twin_dashboard"),
+    "📊 Sentiment Analytics": ("dashboards", "render_sentiment_dashboard"),
+    "⛓️ Service History": ("service_history", "render_blockchain_ledger"),
+    "📅 Book Appointment": ("booking", "render_appointment_booking"),
+    "🎥 AR Remote Assistance": ("ar", "render_ar_interface"),
+    "ℹ️ About NexaServe AI": ("about", "render_about_page")
+}
+
+def render_page(page):
+    """Import the page's module on first use and render it"""
+    module, render = PAGES[page]
+    getattr(importlib.import_module(f".{module}", __name__), render)()
+
+def main():
+    """Main application entry point"""
+    configure_page()
+    try:
+        run_app()
+    finally:
+        # Commit this run's batched storage writes, also when st.rerun() interrupts the script
+        get_session_store().flush()
+
+def run_app():
+    """Render the sidebar and route to the selected page"""
+    
+    # Initialize session state
+    initialize_session_state()
+    
+    # Header
+    st.markdown('<div class="main-header">🚗 VW NexaServe AI</div>', unsafe_allow_html=True)
+    st.markdown('<p style="text-align: center; font-size: 18px; color: #667eea; margin-bottom: 30px;">"Where Every Customer Conversation Becomes a Service Revolution"</p>', unsafe_allow_html=True)
+    
+    # Sidebar Navigation
+    with st.sidebar:
+        st.image("https://t4.ftcdn.net/jpg/03/67/41/07/360_F_367410748_MvYsCNThTfmCqGmvm5Zy856gseZUGHHT.jpg", width=200)
+        
+        st.markdown("---")
+        
+        page = st.radio("🧭 Navigation", list(PAGES))
+        
+        st.markdown("---")
+        
+        # User Info
+        if not st.session_state.user_authenticated:
+            st.markdown("### 👤 Customer Login")
+            user_name = st.text_input("Name", key="login_name")
+            user_vehicle = st.text_input("Vehicle Reg. No.", key="login_vehicle")
+            
+            if st.button("🔐 Login", key="login_btn"):
+                if user_name and user_vehicle:
+                    st.session_state.user_authenticated = True
+                    st.session_state.user_name = user_name
+                    st.session_state.user_vehicle_id = user_vehicle
+                    save_session_profile()
+                    st.success(f"Welcome, {user_name}!")
+                    st.rerun()
+        else:
+            st.success(f"✅ Logged in as: {st.session_state.user_name}")
+            st.info(f"🚗 Vehicle: {st.session_state.user_vehicle_id}")
+            
+            if st.button("🚪 Logout"):
+                st.session_state.user_authenticated = False
+                st.session_state.user_name = ""
+                save_session_profile()
+                st.rerun()
+        
+        st.markdown("---")
+        
+        # System Status
+        st.markdown("### 🔋 System Status")
+        llm_status = get_llm_client().status()
+        if llm_status == "closed":
+            st.success("✅ AI Engine: Online")
+        elif llm_status == "unconfigured":
+            st.warning("⚠️ AI Engine: Offline mode (no API key)")
+        else:
+            st.warning("⚠️ AI Engine: Degraded, using local fallbacks")
+        st.success("✅ Digital Twin: Active")
+        st.success("✅ Blockchain: Synced")
+        st.success("✅ AR Services: Ready")
+        
+        cache_stats = get_llm_cache().stats()
+        cache_hits = sum(counts['hits'] for counts in cache_stats.values())
+        cache_misses = sum(counts['misses'] for counts in cache_stats.values())
+        st.caption(f"🧠 LLM cache: {cache_hits} hits / {cache_misses} misses")
+        
+        prompt_tokens, cached_tokens = get_llm_client().usage.totals()
+        if prompt_tokens:
+            st.caption(f"📦 Prompt cache: {cached_tokens:,} of {prompt_tokens:,} prompt tokens cached ({cached_tokens / prompt_tokens:.0%})")
+    
+    # Main Content Area
+    if not st.session_state.user_authenticated:
+        st.warning("👈 Please login from the sidebar to access VW NexaServe AI services")
+        
+        # Feature showcase
+        col1, col2, col3 = st.columns(3)
+        
+        with col1:
+            st.markdown("""
+            <div class="service-card">
+                <h3>🤖 AI-Powered Support</h3>
+                <p>24/7 intelligent assistance with multilingual capabilities and instant problem resolution</p>
+            </div>
+            """, unsafe_allow_html=True)
+        
+        with col2:
+            st.markdown("""
+            <div class="service-card">
+                <h3>🔮 Predictive Maintenance</h3>
+                <p>Digital twin technology predicts issues before they occur, reducing emergency repairs by 60%</p>
+            </div>
+            """, unsafe_allow_html=True)
+        
+        with col3:
+            st.markdown("""
+            <div class="service-card">
+                <h3>⛓️ Blockchain Trust</h3>
+                <p>Immutable service records with 100% transparency and fraud prevention</p>
+            </div>
+            """, unsafe_allow_html=True)
+        
+        return
+    
+    # Route to appropriate page
+    render_page(page)
@@ -0,0 +1,121 @@
+"""About page"""
+
+import streamlit as st
+import pandas as pd
+
+def render_about_page():
+    """About VW NexaServe AI"""
+    
+    st.markdown('<div class="sub-header">ℹ️ About VW NexaServe AI</div>', unsafe_allow_html=True)
+    
+    st.markdown("""
+    ## 🚗 VW NexaServe AI - Multimodal Intelligent After-Sales Ecosystem
+    
+    **"Where Every Customer Conversation Becomes a Service Revolution"**
+    
+    ### 🎯 Solution Overview
+    
+    VW NexaServe AI is a groundbreaking multimodal, intelligent after-sales ecosystem designed to revolutionize 
+    automotive customer service by transforming reactive support into a proactive, smart, and emotionally aware experience.
+    
+    ### 🏆 Key Innovations
+    
+    #### 1️⃣ Multimodal AI Intelligence
+    - **Text + Voice + Visual + AR** in one integrated platform
+    - Seamless interaction across multiple channels
+    - Natural language understanding in multiple languages
+    
+    #### 2️⃣ Emotional Intelligence Layer
+    - Real-time sentiment analysis detecting frustration/satisfaction
+    - Automatic escalation when customer frustration exceeds threshold
+    - Tone-aware responses adapting to customer emotions
+    
+    #### 3️⃣ Digital Twin Technology
+    - Real-time virtual replica of every vehicle
+    - Predictive maintenance alerts before failures occur
+    - ML-powered health monitoring of all systems
+    
+    #### 4️⃣ Blockchain Service Ledger
+    - Immutable service records eliminating fraud
+    - 100% transparent service history
+    - Smart contract automation for warranty claims
+    
+    #### 5️⃣ AR Remote Assistance
+    - See-what-I-see expert support
+    - Real-time AR annotations and guidance
+    - 60% reduction in service center visits
+    
+    #### 6️⃣ Edge + Cloud Hybrid
+    - Works offline with on-device AI
+    - Sub-200ms response times
+    - Auto-sync when connectivity restored
+    
+    #### 7️⃣ Privacy-First Architecture
+    - Federated learning keeps data on-device
+    - No sensitive data collection
+    - GDPR compliant design
+    
+    ### 📊 Impact Metrics
+    
+    - **85%+** First-contact resolution rate
+    - **60%** Reduction in service visits via remote AR diagnosis
+    - **80%** Faster warranty claim processing
+    - **90%** Prevention of negative reviews through emotion detection
+    - **24/7** Availability with multilingual support
+    
+    ### 🛠️ Technology Stack
+    
+    **Frontend:** Streamlit, React Native (Mobile)  
+    **AI/ML:** OpenAI GPT-4, Gemini Pro, Hume AI (Emotion)  
+    **Backend:** Node.js, Python FastAPI, GraphQL  
+    **Blockchain:** Hyperledger Fabric, Smart Contracts  
+    **Edge Computing:** TensorFlow Lite, ONNX Runtime  
+    **AR Platform:** ARCore/ARKit, Unity AR Foundation  
+    **Cloud:** Multi-cloud (AWS/Azure/GCP)  
+    
+    ### 👥 Team & Hackathon
+    
+    **Event:** i.mobilothon 5.0 by Volkswagen  
+    **Problem Statement:** Transforming After-Sales Support  
+    **Solution:** VW NexaServe AI  
+    
+    ### 📞 Support
+    
+    For technical support or inquiries about NexaServe AI:
+    - Email: support@vw-nexaserve.ai
+    - Phone: 1800-123-VWAI (1800-123-8924)
+    - WhatsApp: Available through integrated chat
+    
+    ---
+    
+    **Built with ❤️ for Volkswagen's Future of Mobility**
+    """)
+    
+    # Technology Architecture Diagram
+    st.markdown("### 🏗️ System Architecture")
+    
+    architecture_layers = {
+        'Layer': [
+            'Layer 1: User Interface',
+            'Layer 2: API Gateway & Edge',
+            'Layer 3: Multimodal AI Engine',
+            'Layer 4: Core Services',
+            'Layer 5: Blockchain Layer',
+            'Layer 6: Data & ML',
+            'Layer 7: Integration',
+            'Layer 8: Infrastructure'
+        ],
+        'Components': [
+            'Mobile Apps, Web, WhatsApp, Voice, AR Glasses',
+            'Load Balancing, Authentication, Edge AI Processing',
+            'GPT-4, Gemini Pro, Computer Vision, Emotion AI',
+            'Service Orchestration, Digital Twin, AR Support, Automation',
+            'Hyperledger Fabric, Smart Contracts, Service Records',
+            'Federated Learning, Predictive Models, Vector DB',
+            'VW Service Systems, Inventory, CRM, Telematics',
+            'Multi-cloud, Edge Nodes, Monitoring'
+        ]
+    }
+    
+    df_arch = pd.DataFrame(architecture_layers)
+    st.dataframe(df_arch, use_container_width=True, hide_index=True)
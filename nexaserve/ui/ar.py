@@ -0,0 +1,94 @@
+"""AR remote assistance page"""
+
+import streamlit as st
+
+from ..ledger import create_service_record
+from ..ar import activate_ar_session
+
+def render_ar_interface():
+    """AR Remote Assistance Interface"""
+
+    st.markdown('<div class="sub-header">🎥 AR Remote Assistance</div>', unsafe_allow_html=True)
+
+    if not st.session_state.ar_session_active:
+        st.markdown("""
+        <div class="service-card">
+            <h3>🎯 See-What-I-See AR Support</h3>
+            <p>Connect with our expert technicians through augmented reality for real-time visual guidance.</p>
+            <h4>Features:</h4>
+            <ul>
+                <li>✅ Live camera feed sharing</li>
+                <li>✅ Real-time expert annotations</li>
+                <li>✅ 3D component overlays</li>
+                <li>✅ Step-by-step AR instructions</li>
+                <li>✅ AI + Expert hybrid diagnostics</li>
+            </ul>
+        </div>
+        """, unsafe_allow_html=True)
+
+        if st.button("🚀 Start AR Session", type="primary"):
+            ar_session = activate_ar_session()
+            st.session_state.ar_session_data = ar_session
+            st.session_state.ar_session_active = True
+            st.success("AR Session activated!")
+            st.rerun()
+    else:
+        ar_data = st.session_state.ar_session_data
+        if ar_data:
+            st.markdown(f"""
+            <div class="ar-active">
+                <h3>🔴 LIVE AR SESSION</h3>
+                <p><strong>Session ID:</strong> {ar_data['session_id']}</p>
+                <p><strong>Expert:</strong> {ar_data['expert_assigned']}</p>
+                <p><strong>Connection:</strong> {ar_data['connection_quality']}</p>
+            </div>
+            """, unsafe_allow_html=True)
+
+            col1, col2 = st.columns([2, 1])
+
+            with col1:
+                st.markdown("### 📹 Live Camera Feed (Simulated)")
+                st.info("📱 In production, this displays your device's camera feed with AR overlays")
+                st.image("https://www.shutterstock.com/image-photo/explore-complexities-modern-engine-compartments-260nw-2669845105.jpg",
+                         caption="AR View: Engine Bay with Component Highlighting",
+                         use_container_width=True)
+
+                st.markdown("""
+                <div class="service-card">
+                    <h4>🎯 AR Annotations Active:</h4>
+                    <ul>
+                        <li>🔴 Battery terminals highlighted</li>
+                        <li>🟢 Oil dipstick location marked</li>
+                        <li>🟡 Air filter compartment outlined</li>
+                    </ul>
+                </div>
+                """, unsafe_allow_html=True)
+
+            with col2:
+                st.markdown("### 🛠️ AR Tools")
+                for feature in ar_data['ar_features']:
+                    st.success(f"✅ {feature}")
+
+                st.markdown("---")
+                st.markdown("### 💬 Expert Chat")
+                expert_messages = [
+                    "Expert: I can see the battery terminals. Let's check the connections.",
+                    "You: Should I disconnect it?",
+                    "Expert: Not yet. First, check if the terminals are corroded."
+                ]
+                for msg in expert_messages:
+                    st.text(msg)
+                st.text_input("Message expert:", key="ar_chat")
+
+            if st.button("🛑 End AR Session"):
+                st.session_state.ar_session_active = False
+                st.session_state.ar_session_data = None
+                create_service_record(
+                    'AR Remote Assistance',
+                    f"Session with {ar_data['expert_assigned']} - Issue diagnosed remotely",
+                    0
+                )
+                st.success("AR session ended. Diagnostic report saved to your service history.")
+                st.rerun()
+        else:
+            st.info("AR session data is not initialized. Please start a new AR session to proceed.")
@@ -0,0 +1,79 @@
+"""Appointment booking page"""
+
+import streamlit as st
+import pandas as pd
+from datetime import datetime, timedelta
+
+from ..jobs import submit_job, render_job_progress
+from ..booking import (
+    SERVICE_TYPES, SERVICE_CENTERS, get_slot_inventory, booking_idempotency_key, booking_job,
+    finish_booking_job
+)
+
+def render_appointment_booking():
+    """Smart appointment booking interface"""
+    
+    st.markdown('<div class="sub-header">📅 AI-Powered Appointment Scheduling</div>', unsafe_allow_html=True)
+    
+    col1, col2 = st.columns([2, 1])
+    
+    with col1:
+        st.markdown("### Schedule Your Service")
+        
+        service_type = st.selectbox("Service Type", SERVICE_TYPES)
+        
+        preferred_date = st.date_input(
+            "Preferred Date",
+            min_value=datetime.now().date(),
+            max_value=datetime.now().date() + timedelta(days=60)
+        )
+        
+        location = st.selectbox("Service Center Location", list(SERVICE_CENTERS))
+        
+        issue_description = st.text_area(
+            "Describe the issue or service needed",
+            placeholder="E.g., Strange noise from engine, regular 10,000 km service, brake pads replacement..."
+        )
+        
+        if st.button("🔍 Find Optimal Slot", type="primary", disabled='booking' in st.session_state.jobs):
+            request = (preferred_date.strftime('%Y-%m-%d'), service_type, location)
+            submit_job(
+                'booking', "AI is finding the best slot for you...", booking_job, get_slot_inventory(),
+                *request, booking_idempotency_key(*request, issue_description), st.session_state.session_id,
+                on_done=lambda result: finish_booking_job(result, service_type)
+            )
+        
+        render_job_progress('booking')
+        
+        appointment = st.session_state.last_appointment
+        if appointment is not None:
+            if not appointment['found']:
+                st.warning("⚠️ No free slots within two weeks of that date at this center. Please try another date or location.")
+            elif appointment['replayed']:
+                st.info("ℹ️ This request was already booked; showing your existing appointment.")
+            else:
+                st.success("✅ Optimal slot found!")
+            
+            if appointment['found']:
+                st.markdown(f"""
+                <div class="service-card">
+                    <h3>📋 Appointment Confirmation</h3>
+                    <p><strong>Booking ID:</strong> {appointment['booking_id']}</p>
+                    <p><strong>Date & Time:</strong> {appointment['date']} at {appointment['time']}</p>
+                    <p><strong>Location:</strong> {appointment['service_center']}</p>
+                    <p><strong>Service Type:</strong> {appointment['service_type']}</p>
+                    <p><strong>Assigned Technician:</strong> {appointment['assigned_technician']}</p>
+                    <p><strong>Estimated Duration:</strong> {appointment['estimated_duration']}</p>
+                    <p><strong>Parts Status:</strong> {'✅' if appointment['parts_availability'] == 'Confirmed' else '📦'} {appointment['parts_availability']}</p>
+                    <p><strong>Estimated Cost:</strong> {appointment['total_estimated_cost']}</p>
+                    <span class="blockchain-verified">⛓️ Recorded on Blockchain</span>
+                </div>
+                """, unsafe_allow_html=True)
+    
+    with col2:
+        st.markdown("### 🗓️ Available Slots")
+        
+        slots = get_slot_inventory().availability(location)
+        
+        df_slots = pd.DataFrame(slots)
+        st.dataframe(df_slots, use_container_width=True)
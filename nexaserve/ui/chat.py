@@ -0,0 +1,247 @@
+"""Chat page: windowed transcript and text, image and voice input"""
+
+import streamlit as st
+import threading
+from collections import OrderedDict
+import html
+
+from ..config import (
+    STREAM_AI_RESPONSES, VISION_MAX_UPLOADS, STT_MAX_SECONDS, HISTORY_PAGE_SIZE, CHAT_LIVE_WINDOW,
+    CHAT_HTML_CACHE_SIZE
+)
+from ..session import append_chat_message, load_earlier_messages
+from ..chat import (
+    build_response_context, submit_context_summary, stream_ai_response, submit_turn_analysis,
+    run_chat_turn, apply_turn_analysis, append_turn_recommendations
+)
+from ..jobs import submit_job, render_job_progress
+from ..vision import prepared_uploads, analyze_images_job, finish_image_diagnosis
+from ..voice import AUDIO_UPLOAD_TYPES, transcribe_voice_job, finish_voice_transcription
+
+# ================================
+# CONCURRENT TURN PIPELINE
+# ================================
+
+def stream_chat_turn(user_message, placeholder):
+    """Stream the reply into a placeholder while sentiment and classification run in the background"""
+    
+    context = build_response_context()
+    join_analysis = submit_turn_analysis(user_message)
+    
+    ai_response = ""
+    for delta in stream_ai_response(user_message, context):
+        ai_response += delta
+        placeholder.markdown(chat_message_html("assistant", ai_response + "▌"), unsafe_allow_html=True)
+    submit_context_summary(context)
+    
+    sentiment_data, issue_classification = join_analysis()
+    
+    return {
+        'sentiment': sentiment_data,
+        'classification': issue_classification,
+        'response': ai_response
+    }
+
+# ================================
+# MAIN APPLICATION
+# ================================
+
+def chat_message_html(role, content):
+    """Chat bubble markup for one message, content escaped"""
+    speaker = "<strong>👤 You:</strong>" if role == "user" else "<strong>🤖 NexaServe AI:</strong>"
+    css = "user-message" if role == "user" else "assistant-message"
+    return f'<div class="chat-message {css}">\n{speaker}<br>\n{html.escape(content, quote=False)}\n</div>'
+
+@st.cache_resource
+def get_chat_html_cache():
+    """Rendered chat bubbles keyed by message id; stored messages never change"""
+    return {'bubbles': OrderedDict(), 'lock': threading.Lock()}
+
+def cached_chat_message_html(message):
+    """Chat bubble markup, rendered and escaped once per message id"""
+    cache = get_chat_html_cache()
+    key = message['id']
+    
+    with cache['lock']:
+        bubble = cache['bubbles'].get(key)
+        if bubble is not None:
+            cache['bubbles'].move_to_end(key)
+            return bubble
+    
+    bubble = chat_message_html(message['role'], message['content'])
+    
+    with cache['lock']:
+        cache['bubbles'][key] = bubble
+        while len(cache['bubbles']) > CHAT_HTML_CACHE_SIZE:
+            cache['bubbles'].popitem(last=False)
+    return bubble
+
+def render_transcript_block(messages):
+    """Emit a run of messages as a single markdown element"""
+    if messages:
+        st.markdown("\n\n".join(cached_chat_message_html(m) for m in messages), unsafe_allow_html=True)
+
+def render_chat_transcript(transcript):
+    """Last CHAT_LIVE_WINDOW messages live; older ones in seq-aligned pages rendered only when opened"""
+    if not transcript:
+        return
+    live_from = transcript[-1]['seq'] + 1 - CHAT_LIVE_WINDOW
+    older = [m for m in transcript if m['seq'] < live_from]
+    
+    pages = OrderedDict()
+    for message in older:
+        pages.setdefault(message['seq'] // HISTORY_PAGE_SIZE, []).append(message)
+    for index, page in pages.items():
+        label = f"🗂️ Messages {page[0]['seq'] + 1}–{page[-1]['seq'] + 1}"
+        # Collapsed pages cost one widget per rerun instead of their full markup
+        if st.toggle(label, key=f"transcript_page_{index}"):
+            render_transcript_block(page)
+    
+    render_transcript_block(transcript[len(older):])
+
+def respond_to_user_message(user_message, chat_container, shown_as=None):
+    """Run one chat turn: sentiment, classification and reply concurrently, then the recommendations"""
+    append_chat_message("user", shown_as or user_message)
+    
+    if STREAM_AI_RESPONSES:
+        with chat_container:
+            turn = stream_chat_turn(user_message, st.empty())
+    else:
+        with st.spinner("🤖 NexaServe AI is thinking..."):
+            turn = run_chat_turn(user_message)
+    
+    sentiment_data = turn['sentiment']
+    issue_classification = turn['classification']
+    apply_turn_analysis(sentiment_data, issue_classification)
+    
+    ai_response = append_turn_recommendations(turn['response'], sentiment_data, issue_classification)
+    append_chat_message("assistant", ai_response)
+
+def render_chat_interface():
+    """Main conversational AI interface"""
+    
+    st.markdown('<div class="sub-header">💬 Intelligent Customer Service Chat</div>', unsafe_allow_html=True)
+    
+    # Quick Action Buttons
+    st.markdown("### ⚡ Quick Actions")
+    col1, col2, col3, col4 = st.columns(4)
+    
+    with col1:
+        if st.button("🔍 Check Vehicle Health"):
+            quick_message = "Can you show me my vehicle's current health status?"
+            append_chat_message("user", quick_message)
+    
+    with col2:
+        if st.button("📅 Schedule Service"):
+            quick_message = "I want to schedule a service appointment"
+            append_chat_message("user", quick_message)
+    
+    with col3:
+        if st.button("🎥 Start AR Help"):
+            st.session_state.ar_session_active = True
+            quick_message = "I need visual guidance for my issue"
+            append_chat_message("user", quick_message)
+    
+    with col4:
+        if st.button("🧾 View Service History"):
+            quick_message = "Show me my service history"
+            append_chat_message("user", quick_message)
+    
+    st.markdown("---")
+    
+    # Chat Display Container
+    chat_container = st.container()
+    
+    with chat_container:
+        # Older pages are only fetched from the store on request
+        shown = st.session_state.earlier_messages or st.session_state.messages
+        if shown and shown[0]['seq'] > 0:
+            if st.button("⬆️ Load earlier messages"):
+                load_earlier_messages()
+        
+        render_chat_transcript(st.session_state.earlier_messages + st.session_state.messages)
+    
+    # Chat Input
+    st.markdown("---")
+    
+    # Multimodal Input Options
+    input_mode = st.radio(
+        "Input Mode:",
+        ["💬 Text", "📷 Image Upload", "🎤 Voice"],
+        horizontal=True
+    )
+    
+    if input_mode == "💬 Text":
+        user_input = st.chat_input("Type your message here... (e.g., 'My car is making a strange noise')")
+        
+        if user_input:
+            respond_to_user_message(user_input, chat_container)
+            st.rerun()
+    
+    elif input_mode == "📷 Image Upload":
+        st.markdown("### Upload Vehicle Issue Image")
+        uploaded_images = st.file_uploader(
+            "Take photos of the problem area",
+            type=['png', 'jpg', 'jpeg'],
+            accept_multiple_files=True,
+            help=f"Upload up to {VISION_MAX_UPLOADS} clear images of the issue for visual diagnosis"
+        )
+        
+        if uploaded_images:
+            if len(uploaded_images) > VISION_MAX_UPLOADS:
+                st.warning(f"Only the first {VISION_MAX_UPLOADS} photos are analyzed")
+                uploaded_images = uploaded_images[:VISION_MAX_UPLOADS]
+            images = prepared_uploads(uploaded_images)
+            
+            col1, col2 = st.columns(2)
+            
+            with col1:
+                if len(images) == 1:
+                    st.image(images[0].getvalue(), caption="Uploaded Image", use_container_width=True)
+                else:
+                    st.image(
+                        [image.getvalue() for image in images],
+                        caption=[f"Photo {i}" for i in range(1, len(images) + 1)],
+                        width=140
+                    )
+            
+            with col2:
+                if st.button("🔍 Analyze Images with AI" if len(images) > 1 else "🔍 Analyze Image with AI",
+                             disabled='image_analysis' in st.session_state.jobs):
+                    submit_job(
+                        'image_analysis', "Analyzing images with computer vision...", analyze_images_job, images,
+                        on_done=finish_image_diagnosis
+                    )
+                
+                render_job_progress('image_analysis')
+    
+    elif input_mode == "🎤 Voice":
+        st.markdown("### Voice Input")
+        recording = st.audio_input("Record a voice message")
+        uploaded_audio = st.file_uploader(
+            "Or upload an audio clip",
+            type=AUDIO_UPLOAD_TYPES,
+            help=f"Up to {STT_MAX_SECONDS} seconds of speech"
+        )
+        audio = recording or uploaded_audio
+        
+        if st.button("🎙️ Send Voice Message", disabled=audio is None or 'voice' in st.session_state.jobs):
+            # Hand the job the raw bytes; the upload widget's buffer belongs to the script thread
+            submit_job(
+                'voice', "Transcribing voice message...", transcribe_voice_job, audio.getvalue(),
+                on_done=finish_voice_transcription
+            )
+        
+        render_job_progress('voice')
+        
+        stats = st.session_state.last_transcription
+        if stats and 'voice' not in st.session_state.jobs:
+            per_second = stats['elapsed'] / stats['audio_seconds'] if stats['audio_seconds'] else 0.0
+            summary = f"{stats['audio_seconds']:.1f} s of audio in {stats['elapsed']:.2f} s ({per_second:.3f} s per audio second)"
+            st.caption(f"🎧 Transcribed {summary}" if stats['transcript'] else f"🎧 No speech detected in {summary}")
+        
+        transcript = st.session_state.voice_transcript
+        if transcript:
+            st.session_state.voice_transcript = None
+            respond_to_user_message(transcript, chat_container, shown_as=f"🎤 (Voice): {transcript}")
+            st.rerun()
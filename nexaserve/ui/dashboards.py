@@ -0,0 +1,187 @@
+"""Digital twin and sentiment analytics pages"""
+
+import streamlit as st
+import pandas as pd
+from datetime import datetime
+import plotly.express as px
+
+from ..config import HISTORY_TIERS
+from ..rules import get_rule_engine
+from ..twin import telemetry_vehicle_key
+from ..telemetry import TELEMETRY_SIGNALS, get_telemetry_hub
+from ..session import load_sentiment_history
+from ..twin_view import (
+    get_twin_fingerprint, component_health_figure_json, tire_health_figure_json, metric_label,
+    metric_trend_figure, twin_figure, refresh_twin_predictions, sync_twin_telemetry
+)
+
+def render_digital_twin_dashboard():
+    """Render comprehensive digital twin dashboard"""
+    
+    sync_twin_telemetry()
+    twin_data = refresh_twin_predictions()
+    
+    st.markdown('<div class="sub-header">🔧 Digital Twin - Real-time Vehicle Health</div>', unsafe_allow_html=True)
+    
+    hub = get_telemetry_hub()
+    if hub.error:
+        st.warning(f"⚠️ Telemetry feed stopped: {hub.error}")
+    elif hub.source_spec:
+        st.caption(f"📡 Live telemetry: {hub.ingestor.stats['frames']:,} frames ingested")
+    
+    # Overall Health Metrics
+    col1, col2, col3, col4 = st.columns(4)
+    
+    with col1:
+        st.markdown(f"""
+        <div class="metric-card">
+            <h3>Overall Health</h3>
+            <h1>{twin_data['health_score']}%</h1>
+            <p>Excellent Condition</p>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    with col2:
+        st.markdown(f"""
+        <div class="metric-card">
+            <h3>Current Mileage</h3>
+            <h1>{twin_data['mileage']:,}</h1>
+            <p>km driven</p>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    with col3:
+        days_until_service = (datetime.strptime(twin_data['next_service_due'], '%Y-%m-%d') - datetime.now()).days
+        st.markdown(f"""
+        <div class="metric-card">
+            <h3>Next Service</h3>
+            <h1>{days_until_service}</h1>
+            <p>days remaining</p>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    with col4:
+        st.markdown(f"""
+        <div class="metric-card">
+            <h3>Active Alerts</h3>
+            <h1>{len(twin_data['predictive_alerts'])}</h1>
+            <p>predictions</p>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    # Component Health Visualization
+    st.markdown("### Component Health Status")
+    
+    fingerprint = get_twin_fingerprint()
+    st.plotly_chart(twin_figure(component_health_figure_json(fingerprint, twin_data)), use_container_width=True)
+    
+    # Tire Pressure Visualization
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.markdown("### Tire Health Status")
+        st.plotly_chart(twin_figure(tire_health_figure_json(fingerprint, twin_data)), use_container_width=True)
+    
+    with col2:
+        st.markdown("### Predictive Maintenance Alerts")
+        
+        if get_rule_engine().error:
+            st.warning(f"⚠️ Maintenance rule spec could not be loaded, using the last valid rules: {get_rule_engine().error}")
+        
+        if twin_data['predictive_alerts']:
+            for alert in twin_data['predictive_alerts']:
+                severity_color = {
+                    'Low': '#10b981',
+                    'Medium': '#f59e0b',
+                    'High': '#ef4444',
+                    'Critical': '#dc2626'
+                }
+                
+                interval_text = ""
+                if alert.get('confidence_interval'):
+                    interval_text = f" (95% range {alert['confidence_interval'][0]} to {alert['confidence_interval'][1]})"
+                
+                st.markdown(f"""
+                <div class="service-card" style="border-left-color: {severity_color[alert['severity']]};">
+                    <h4>⚠️ {alert['component']}</h4>
+                    <p><strong>Severity:</strong> <span style="color: {severity_color[alert['severity']]};">{alert['severity']}</span></p>
+                    <p>{alert['message']}</p>
+                    <p><strong>Predicted Service Date:</strong> {alert['predicted_date']}{interval_text}</p>
+                </div>
+                """, unsafe_allow_html=True)
+        else:
+            st.success("✅ No immediate maintenance required. All systems operating optimally!")
+    
+    # Metric Trends from the telemetry history rollups
+    st.markdown("### Component Trends")
+    
+    col1, col2 = st.columns([3, 1])
+    
+    with col1:
+        metric = st.selectbox("Metric", TELEMETRY_SIGNALS, format_func=metric_label, key="trend_metric")
+    
+    with col2:
+        tier = st.selectbox("Resolution", list(HISTORY_TIERS), index=1, key="trend_tier")
+    
+    series = hub.history.query(telemetry_vehicle_key(twin_data['vehicle_id']), metric, tier)
+    if series is None or not len(series['ts']):
+        st.info("No telemetry history for this vehicle yet. Trends appear once a telemetry feed is streaming readings.")
+    else:
+        st.plotly_chart(metric_trend_figure(series, metric), use_container_width=True)
+
+def render_sentiment_dashboard():
+    """Render emotion intelligence dashboard"""
+    
+    sentiment_history = load_sentiment_history()
+    
+    if len(sentiment_history) > 0:
+        st.markdown('<div class="sub-header">🧠 Emotional Intelligence Analytics</div>', unsafe_allow_html=True)
+        
+        # Sentiment timeline
+        df_sentiment = pd.DataFrame(sentiment_history)
+        df_sentiment['timestamp'] = pd.to_datetime(df_sentiment['timestamp'])
+        
+        fig = px.line(
+            df_sentiment, 
+            x='timestamp', 
+            y='frustration_score',
+            title='Customer Frustration Score Over Time',
+            markers=True
+        )
+        
+        fig.add_hline(
+            y=70, 
+            line_dash="dash", 
+            line_color="red",
+            annotation_text="Escalation Threshold"
+        )
+        
+        fig.update_layout(height=300, template='plotly_white')
+        st.plotly_chart(fig, use_container_width=True)
+        
+        # Current sentiment
+        col1, col2, col3 = st.columns(3)
+        
+        with col1:
+            sentiment_emoji = {
+                'positive': '😊',
+                'neutral': '😐',
+                'negative': '😟'
+            }
+            st.metric(
+                "Current Sentiment",
+                sentiment_emoji.get(st.session_state.current_sentiment, '😐') + " " + st.session_state.current_sentiment.title()
+            )
+        
+        with col2:
+            st.metric(
+                "Frustration Level",
+                f"{st.session_state.frustration_score}/100",
+                delta=None
+            )
+        
+        with col3:
+            if st.session_state.frustration_score > 70:
+                st.error("🚨 Auto-escalation triggered!")
+            else:
+                st.success("✅ Sentiment stable")
@@ -0,0 +1,65 @@
+"""Service history page: ledger records with hash-chain verification"""
+
+import streamlit as st
+
+from ..config import SERVICE_HISTORY_PAGE_SIZE, SERVICE_RECORD_TYPES
+from ..session import get_session_store
+from ..ledger import service_record_card_html, verify_vehicle_ledger
+
+def render_blockchain_ledger():
+    """Render blockchain service history"""
+    
+    st.markdown('<div class="sub-header">⛓️ Blockchain-Verified Service History</div>', unsafe_allow_html=True)
+    
+    vehicle_id = st.session_state.digital_twin_data['vehicle_id']
+    
+    # Filters reset pagination; the cursor stack lets the user page back
+    col1, col2 = st.columns(2)
+    with col1:
+        service_type = st.selectbox("Service Type", ["All"] + SERVICE_RECORD_TYPES, key="ledger_service_type")
+    with col2:
+        date_range = st.date_input("Date Range", value=(), key="ledger_date_range")
+    
+    since = date_range[0].isoformat() if len(date_range) > 0 else None
+    until = date_range[1].isoformat() if len(date_range) > 1 else since
+    filters = (service_type, since, until)
+    if st.session_state.get('ledger_filters') != filters:
+        st.session_state.ledger_filters = filters
+        st.session_state.ledger_cursors = [None]
+    
+    service_records, next_cursor = get_session_store().query_service_records(
+        vehicle_id=vehicle_id,
+        service_type=None if service_type == "All" else service_type,
+        since=since,
+        until=until,
+        cursor=st.session_state.ledger_cursors[-1],
+        limit=SERVICE_HISTORY_PAGE_SIZE
+    )
+    
+    if service_records:
+        verification = verify_vehicle_ledger(vehicle_id)
+        if verification['valid']:
+            st.caption(f"🔒 Hash chain verified ({verification['entries_rehashed']} entries rehashed)")
+        else:
+            st.error(f"⚠️ Ledger verification failed: {verification['error']}")
+        
+        for record in service_records:
+            st.markdown(service_record_card_html(record), unsafe_allow_html=True)
+    elif len(st.session_state.ledger_cursors) > 1:
+        st.info("📝 No older records match these filters.")
+    else:
+        st.info("📝 No service records yet. Your service history will appear here.")
+    
+    # Paging stays available on an empty later page, so the user can always step back
+    if service_records or len(st.session_state.ledger_cursors) > 1:
+        col1, col2, col3 = st.columns([1, 2, 1])
+        with col1:
+            if len(st.session_state.ledger_cursors) > 1 and st.button("⬅️ Newer"):
+                st.session_state.ledger_cursors.pop()
+                st.rerun()
+        with col2:
+            st.caption(f"Page {len(st.session_state.ledger_cursors)}")
+        with col3:
+            if next_cursor and st.button("Older ➡️"):
+                st.session_state.ledger_cursors.append(next_cursor)
+                st.rerun()
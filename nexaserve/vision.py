@@ -0,0 +1,339 @@
+"""Image diagnosis: upload preprocessing, perceptual-hash cache and vision backends"""
+
+import streamlit as st
+import json
+import numpy as np
+import threading
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import io
+import base64
+
+from .config import (
+    VISION_BACKEND, VISION_MODEL, VISION_MAX_EDGE, VISION_FORMAT, VISION_QUALITY, VISION_CACHE_SIZE,
+    VISION_HASH_MAX_DISTANCE, VISION_BATCH_SIZE, IMAGE_POOL_MAX_WORKERS
+)
+from .llm import get_llm_client
+from .session import append_chat_message
+from .jobs import inject_latency
+from .ledger import create_service_record
+
+# ================================
+# IMAGE DIAGNOSIS
+# ================================
+
+VISION_MIME_TYPES = {'JPEG': "image/jpeg", 'WEBP': "image/webp"}
+IMAGE_SEVERITIES = ("low", "medium", "high", "critical")
+IMAGE_SEVERITY_ICONS = {'low': "🟢", 'medium': "🟡", 'high': "🟠", 'critical': "🔴"}
+
+class PreparedImage:
+    """Model-ready copy of an upload: downscaled, re-encoded bytes and their perceptual hash"""
+    
+    def __init__(self, buffer, mime, size, source_size, phash):
+        self.buffer = buffer
+        self.mime = mime
+        self.size = size
+        self.source_size = source_size
+        self.phash = phash
+    
+    @property
+    def nbytes(self):
+        return self.buffer.getbuffer().nbytes
+    
+    def getvalue(self):
+        return self.buffer.getvalue()
+    
+    def data_url(self):
+        """Base64 data URL, encoded straight from the buffer without copying it first"""
+        with self.buffer.getbuffer() as view:
+            return f"data:{self.mime};base64," + base64.b64encode(view).decode('ascii')
+
+def perceptual_hash(image):
+    """64-bit difference hash: horizontal brightness gradients of a 9x8 grayscale thumbnail"""
+    from PIL import Image
+    
+    pixels = np.asarray(image.convert('L').resize((9, 8), Image.BILINEAR), dtype=np.int16)
+    bits = pixels[:, 1:] > pixels[:, :-1]
+    return int.from_bytes(np.packbits(bits).tobytes(), 'big')
+
+def hash_distance(a, b):
+    """Number of differing bits between two perceptual hashes"""
+    return bin(a ^ b).count('1')
+
+def prepare_image(source, max_edge=VISION_MAX_EDGE, fmt=VISION_FORMAT, quality=VISION_QUALITY):
+    """Decode an upload once at reduced scale, apply its EXIF orientation, downscale and re-encode"""
+    from PIL import Image, ImageOps
+    
+    with Image.open(source) as image:
+        source_size = image.size
+        # JPEGs decode straight to the smallest 1/2, 1/4 or 1/8 scale still covering max_edge
+        image.draft('RGB', (max_edge, max_edge))
+        image = ImageOps.exif_transpose(image).convert('RGB')
+    image.thumbnail((max_edge, max_edge), Image.LANCZOS)
+    
+    buffer = io.BytesIO()
+    image.save(buffer, fmt, quality=quality)
+    return PreparedImage(buffer, VISION_MIME_TYPES[fmt], image.size, source_size, perceptual_hash(image))
+
+def prepare_image_data(data):
+    """Pool task: prepare raw upload bytes in a worker process"""
+    return prepare_image(io.BytesIO(data))
+
+@st.cache_resource
+def get_image_pool():
+    """Worker processes for CPU-bound decoding, shared across sessions
+    
+    Workers come from a forkserver (spawn where there is none) instead of forking the
+    multi-threaded server; threads stand in where worker processes cannot be started.
+    """
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+    if context.get_start_method() == 'forkserver':
+        context.set_forkserver_preload([__name__])
+    try:
+        return ProcessPoolExecutor(max_workers=IMAGE_POOL_MAX_WORKERS, mp_context=context)
+    except (ImportError, OSError, NotImplementedError):
+        return ThreadPoolExecutor(max_workers=IMAGE_POOL_MAX_WORKERS, thread_name_prefix="nexaserve-image")
+
+def preprocess_images(datas):
+    """Prepare raw uploads in parallel on the image pool, rebuilding it once if its workers have died"""
+    pool = get_image_pool()
+    try:
+        return list(pool.map(prepare_image_data, datas))
+    except BrokenProcessPool:
+        # A worker that failed to start or was killed (e.g. out of memory) breaks the pool for good
+        pool.shutdown(wait=False)
+        if get_image_pool() is pool:
+            get_image_pool.clear()
+        return list(get_image_pool().map(prepare_image_data, datas))
+
+def normalize_image_finding(data):
+    """Coerce a model's JSON diagnosis into the finding fields the UI relies on"""
+    finding = {
+        'component': "Unidentified component",
+        'issue': "No visible defect identified",
+        'severity': "low",
+        'actions': [],
+        'estimated_cost': "",
+        'confidence': 0.5
+    }
+    for field in ('component', 'issue', 'estimated_cost'):
+        if isinstance(data.get(field), str) and data[field].strip():
+            finding[field] = data[field].strip()
+    if data.get('severity') in IMAGE_SEVERITIES:
+        finding['severity'] = data['severity']
+    if isinstance(data.get('actions'), list):
+        finding['actions'] = [str(action) for action in data['actions'] if str(action).strip()][:5]
+    if isinstance(data.get('confidence'), (int, float)):
+        finding['confidence'] = min(max(float(data['confidence']), 0.0), 1.0)
+    return finding
+
+def consolidate_findings(findings):
+    """One finding for a set of photos: the most severe result leads, the rest add components and actions"""
+    if len(findings) == 1:
+        return dict(findings[0])
+    ranked = sorted(findings, key=lambda f: (IMAGE_SEVERITIES.index(f['severity']), f['confidence']), reverse=True)
+    finding = dict(ranked[0])
+    finding['component'] = ", ".join(OrderedDict.fromkeys(f['component'] for f in ranked))
+    finding['issue'] = "; ".join(OrderedDict.fromkeys(f['issue'] for f in ranked))
+    finding['actions'] = list(OrderedDict.fromkeys(action for f in ranked for action in f['actions']))[:5]
+    return finding
+
+def format_image_finding(finding, photos=1):
+    """Chat reply for a visual diagnosis"""
+    lines = [
+        f"**Visual Diagnosis Complete ({photos} photos):**" if photos > 1 else "**Visual Diagnosis Complete:**",
+        "",
+        f"✅ **Detected Component:** {finding['component']}  ",
+        f"⚠️ **Issue Identified:** {finding['issue']}  ",
+        f"{IMAGE_SEVERITY_ICONS[finding['severity']]} **Severity:** {finding['severity'].title()}"
+    ]
+    if finding['actions'] or finding['estimated_cost']:
+        lines += ["", "**Recommended Action:**"]
+        lines += [f"{i}. {action}" for i, action in enumerate(finding['actions'], 1)]
+        if finding['estimated_cost']:
+            lines.append(f"{len(finding['actions']) + 1}. Estimated cost: {finding['estimated_cost']}")
+    lines += ["", "Would you like me to schedule an appointment?"]
+    return "\n".join(lines)
+
+VISION_SYSTEM_PROMPT = """You are a Volkswagen service technician inspecting customer photos of a vehicle problem.
+Respond ONLY with a JSON object:
+{
+    "component": "affected component",
+    "issue": "visible defect and its extent",
+    "severity": "low" | "medium" | "high" | "critical",
+    "actions": ["recommended steps, most urgent first"],
+    "estimated_cost": "repair cost range in INR",
+    "confidence": 0.0-1.0
+}"""
+
+class OpenAIVisionBackend:
+    """Diagnosis from a vision-capable chat model; every image of a request goes in one call"""
+    
+    name = "openai"
+    max_images = VISION_BATCH_SIZE
+    
+    def __init__(self, model):
+        self.model = model
+    
+    def diagnose(self, images):
+        content = [{"type": "text", "text": "Diagnose the problem shown in these photos."}]
+        content += [{"type": "image_url", "image_url": {"url": image.data_url()}} for image in images]
+        response = get_llm_client().chat_completion(
+            'vision',
+            model=self.model,
+            messages=[
+                {"role": "system", "content": VISION_SYSTEM_PROMPT},
+                {"role": "user", "content": content}
+            ],
+            temperature=0.2,
+            max_tokens=300,
+            response_format={"type": "json_object"}
+        )
+        return normalize_image_finding(json.loads(response.choices[0].message.content))
+
+# Canned findings the local stub picks from by image hash
+STUB_IMAGE_FINDINGS = (
+    {
+        'component': "Front brake disc",
+        'issue': "Excessive wear on brake pads (approx. 65%)",
+        'severity': "high",
+        'actions': ["Schedule brake pad replacement within 2 weeks", "Service duration: 2-3 hours"],
+        'estimated_cost': "₹8,500 - ₹12,000",
+        'confidence': 0.8
+    },
+    {
+        'component': "Front left tire",
+        'issue': "Uneven tread wear on the outer shoulder",
+        'severity': "medium",
+        'actions': ["Check wheel alignment", "Rotate tires at the next service"],
+        'estimated_cost': "₹1,500 - ₹3,000",
+        'confidence': 0.7
+    },
+    {
+        'component': "12V battery terminals",
+        'issue': "White corrosion build-up on the positive terminal",
+        'severity': "medium",
+        'actions': ["Clean and protect the terminals", "Test battery charge and cranking voltage"],
+        'estimated_cost': "₹500 - ₹1,200",
+        'confidence': 0.75
+    }
+)
+
+class StubVisionBackend:
+    """Deterministic local diagnosis for tests and offline demos"""
+    
+    name = "stub"
+    max_images = VISION_BATCH_SIZE
+    
+    def diagnose(self, images):
+        return dict(STUB_IMAGE_FINDINGS[images[0].phash % len(STUB_IMAGE_FINDINGS)])
+
+@st.cache_resource
+def get_vision_backend():
+    """Vision backend selected by NEXASERVE_VISION_BACKEND"""
+    if VISION_BACKEND == "stub":
+        return StubVisionBackend()
+    return OpenAIVisionBackend(VISION_MODEL)
+
+class VisionResultCache:
+    """LRU of diagnoses keyed by backend and image hashes; near-identical re-uploads also hit"""
+    
+    def __init__(self, capacity, max_distance):
+        self.capacity = capacity
+        self.max_distance = max_distance
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    def _matches(self, key, namespace, hashes):
+        return key[0] == namespace and len(key[1]) == len(hashes) and all(
+            hash_distance(a, b) <= self.max_distance for a, b in zip(key[1], hashes)
+        )
+    
+    def get(self, namespace, hashes):
+        key = (namespace, tuple(hashes))
+        with self.lock:
+            if key not in self.entries:
+                # Recompressed or resized copies land a few bits away from the original
+                key = next((k for k in reversed(self.entries) if self._matches(k, namespace, key[1])), None)
+            if key is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return dict(self.entries[key])
+    
+    def put(self, namespace, hashes, finding):
+        with self.lock:
+            self.entries[(namespace, tuple(hashes))] = dict(finding)
+            while len(self.entries) > self.capacity:
+                self.entries.popitem(last=False)
+
+@st.cache_resource
+def get_vision_cache():
+    """Diagnosis cache shared by every session in the process"""
+    return VisionResultCache(VISION_CACHE_SIZE, VISION_HASH_MAX_DISTANCE)
+
+def diagnose_images(images, report=None, backend=None, cache=None):
+    """Finding for prepared images, served from the hash cache when the same photos were seen"""
+    backend = backend or get_vision_backend()
+    cache = cache or get_vision_cache()
+    hashes = [image.phash for image in images]
+    
+    finding = cache.get(backend.name, hashes)
+    if finding is not None:
+        return finding, True
+    
+    inject_latency('image_analysis', report)
+    finding = backend.diagnose(images)
+    cache.put(backend.name, hashes, finding)
+    return finding, False
+
+def diagnose_image_batch(images, report=None, backend=None, cache=None):
+    """Consolidated finding for photos of one problem, in as few model requests as the backend allows"""
+    backend = backend or get_vision_backend()
+    
+    # Sorted by hash so the cache key does not depend on upload order; repeats are looked at once
+    distinct = []
+    for image in sorted(images, key=lambda i: i.phash):
+        if all(hash_distance(image.phash, kept.phash) > VISION_HASH_MAX_DISTANCE for kept in distinct):
+            distinct.append(image)
+    
+    findings = [
+        diagnose_images(distinct[start:start + backend.max_images], report, backend, cache)[0]
+        for start in range(0, len(distinct), backend.max_images)
+    ]
+    return consolidate_findings(findings)
+
+def prepared_uploads(uploaded_files):
+    """Preprocessed copies of uploaded files, decoded once per file and kept across reruns"""
+    prepared = st.session_state.prepared_uploads
+    missing = [f for f in uploaded_files if f.file_id not in prepared]
+    if missing:
+        prepared.update(zip([f.file_id for f in missing], preprocess_images([f.getvalue() for f in missing])))
+    
+    current = {f.file_id for f in uploaded_files}
+    for file_id in [file_id for file_id in prepared if file_id not in current]:
+        del prepared[file_id]
+    return [prepared[f.file_id] for f in uploaded_files]
+
+# ================================
+# BACKGROUND JOBS
+# ================================
+
+def analyze_images_job(report, images):
+    """Diagnose a set of prepared uploads; photos already diagnosed skip the backend"""
+    return diagnose_image_batch(images, report), len(images)
+
+def finish_image_diagnosis(result):
+    """Post the consolidated finding to the chat and the vehicle's service ledger"""
+    finding, photos = result
+    append_chat_message("assistant", format_image_finding(finding, photos))
+    create_service_record(
+        "AI Visual Diagnosis",
+        f"{finding['component']}: {finding['issue']} ({finding['severity']} severity, {photos} photo(s))"
+    )
@@ -0,0 +1,250 @@
+"""Voice input: chunked audio decoding, resampling and speech-to-text backends"""
+
+import streamlit as st
+try:
+    import soundfile
+except ImportError:
+    soundfile = None
+import time
+import numpy as np
+import zlib
+import io
+import wave
+import string
+
+from .config import (
+    STT_BACKEND, STT_MODEL, STT_SAMPLE_RATE, STT_CHUNK_SECONDS, STT_CHUNK_OVERLAP_SECONDS, STT_MAX_SECONDS,
+    STT_SILENCE_RMS
+)
+from .llm import get_llm_client
+from .jobs import inject_latency
+
+# ================================
+# VOICE INPUT
+# ================================
+
+AUDIO_UPLOAD_TYPES = ['wav'] + (['flac', 'ogg', 'mp3'] if soundfile is not None else [])
+
+class AudioFormatError(Exception):
+    """Raised when uploaded audio cannot be decoded or is too long"""
+
+def pcm_to_float(frames, sample_width, channels):
+    """Interleaved little-endian PCM bytes as mono float32 samples in [-1, 1]"""
+    if sample_width == 1:
+        samples = (np.frombuffer(frames, np.uint8).astype(np.float32) - 128) / 128
+    elif sample_width == 2:
+        samples = np.frombuffer(frames, '<i2').astype(np.float32) / 2 ** 15
+    elif sample_width == 3:
+        raw = np.frombuffer(frames, np.uint8).reshape(-1, 3).astype(np.int32)
+        samples = ((raw[:, 0] | (raw[:, 1] << 8) | (raw[:, 2] << 16)) << 8 >> 8).astype(np.float32) / 2 ** 23
+    elif sample_width == 4:
+        samples = np.frombuffer(frames, '<i4').astype(np.float32) / 2 ** 31
+    else:
+        raise AudioFormatError(f"Unsupported PCM sample width: {sample_width} bytes")
+    return samples.reshape(-1, channels).mean(axis=1, dtype=np.float32)
+
+def audio_blocks(source, block_seconds):
+    """Yield (mono float32 samples, sample rate, total seconds), decoding one block at a time"""
+    try:
+        reader = wave.open(source, 'rb')
+    except (wave.Error, EOFError):
+        if soundfile is None:
+            raise AudioFormatError("Only WAV audio is supported unless soundfile is installed")
+        source.seek(0)
+        try:
+            info = soundfile.info(source)
+        except RuntimeError as e:
+            raise AudioFormatError(str(e))
+        source.seek(0)
+        blocksize = max(int(info.samplerate * block_seconds), 1)
+        for block in soundfile.blocks(source, blocksize=blocksize, dtype='float32', always_2d=True):
+            yield block.mean(axis=1), info.samplerate, info.frames / info.samplerate
+        return
+    
+    with reader:
+        rate, channels, width = reader.getframerate(), reader.getnchannels(), reader.getsampwidth()
+        total = reader.getnframes() / rate
+        frames_per_block = max(int(rate * block_seconds), 1)
+        while True:
+            frames = reader.readframes(frames_per_block)
+            if not frames:
+                break
+            yield pcm_to_float(frames, width, channels), rate, total
+
+class StreamingResampler:
+    """Linear-interpolation resampler that carries its phase across blocks, so chunking is seamless"""
+    
+    def __init__(self, source_rate, target_rate):
+        self.step = source_rate / target_rate
+        self.position = 0.0
+        self.tail = np.zeros(0, dtype=np.float32)
+    
+    def process(self, samples):
+        buffer = np.concatenate([self.tail, samples]) if self.tail.size else samples
+        if buffer.size == 0 or self.position > buffer.size - 1:
+            self.tail = buffer
+            return np.zeros(0, dtype=np.float32)
+        
+        count = int((buffer.size - 1 - self.position) // self.step) + 1
+        positions = self.position + np.arange(count) * self.step
+        out = np.interp(positions, np.arange(buffer.size), buffer).astype(np.float32)
+        
+        # Keep the input from the next output position onwards for the following block
+        following = self.position + count * self.step
+        keep = min(int(following), buffer.size)
+        self.tail = buffer[keep:]
+        self.position = following - keep
+        return out
+    
+    def flush(self):
+        """Output still owed for the held-back input at the end of the stream, holding the last sample"""
+        out = np.zeros(0, dtype=np.float32)
+        if self.tail.size > self.position:
+            count = int(np.ceil((self.tail.size - self.position) / self.step))
+            positions = self.position + np.arange(count) * self.step
+            out = np.interp(positions, np.arange(self.tail.size), self.tail).astype(np.float32)
+        self.tail = np.zeros(0, dtype=np.float32)
+        self.position = 0.0
+        return out
+
+def wav_bytes(samples, rate):
+    """16-bit mono WAV file for a block of float samples"""
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as writer:
+        writer.setnchannels(1)
+        writer.setsampwidth(2)
+        writer.setframerate(rate)
+        writer.writeframes((np.clip(samples, -1, 1) * 32767).astype('<i2').tobytes())
+    return buffer.getvalue()
+
+class OpenAITranscriptionBackend:
+    """Whisper transcription, one request per chunk; the transcript so far is the prompt for continuity"""
+    
+    name = "openai"
+    
+    def __init__(self, model):
+        self.model = model
+    
+    def transcribe(self, samples, rate, prompt):
+        request = {'model': self.model, 'file': ("chunk.wav", wav_bytes(samples, rate))}
+        if prompt:
+            request['prompt'] = prompt[-500:]
+        return get_llm_client().transcription(**request).text
+
+# What the local stub "hears": one of these per chunk with sound in it
+STUB_TRANSCRIPTS = (
+    "My car's engine is making a clicking sound.",
+    "The check engine light came on this morning.",
+    "I need to schedule my regular service.",
+    "There's a burning smell from the brakes."
+)
+
+class StubTranscriptionBackend:
+    """Deterministic local transcription for tests and offline demos"""
+    
+    name = "stub"
+    
+    def transcribe(self, samples, rate, prompt):
+        if samples.size == 0 or np.sqrt(np.mean(np.square(samples))) < STT_SILENCE_RMS:
+            return ""
+        digest = zlib.crc32(np.round(samples[:rate] * 100).astype(np.int8).tobytes())
+        return STUB_TRANSCRIPTS[digest % len(STUB_TRANSCRIPTS)]
+
+@st.cache_resource
+def get_stt_backend():
+    """Speech-to-text backend selected by NEXASERVE_STT_BACKEND"""
+    if STT_BACKEND == "stub":
+        return StubTranscriptionBackend()
+    return OpenAITranscriptionBackend(STT_MODEL)
+
+# Longest run of words an overlapping chunk may repeat from the end of the transcript
+OVERLAP_MAX_WORDS = 16
+
+def normalize_word(word):
+    return word.strip(string.punctuation).lower()
+
+def merge_transcripts(transcript, text):
+    """Append the text of an overlapping chunk, dropping the words it repeats from the transcript's end
+    
+    A word cut at a chunk boundary is heard as a fragment: the end of one chunk may hold the
+    start of a word the next completes, and the next may open with the end of one already
+    heard. Fragments of at least three letters match the whole word at either edge.
+    """
+    previous, words = transcript.split(), text.split()
+    if not previous or not words:
+        return transcript or text
+    tail = [normalize_word(word) for word in previous[-OVERLAP_MAX_WORDS:]]
+    head = [normalize_word(word) for word in words[:OVERLAP_MAX_WORDS]]
+    
+    def edge_match(whole, fragment, fits):
+        return whole == fragment or (len(fragment) >= 3 and fits(whole, fragment))
+    
+    for k in range(min(len(tail), len(head)), 0, -1):
+        left, right = tail[-k:], head[:k]
+        if not all(a and a == b for a, b in zip(left[1:-1], right[1:-1])):
+            continue
+        if k == 1:
+            if not (edge_match(left[0], right[0], str.endswith) or edge_match(right[0], left[0], str.startswith)):
+                continue
+            first = max(previous[-1], words[0], key=len)
+        else:
+            if not (edge_match(left[0], right[0], str.endswith) and edge_match(right[-1], left[-1], str.startswith)):
+                continue
+            first = previous[-k]
+        return " ".join(previous[:-k] + [first] + words[1:])
+    return f"{transcript} {text}"
+
+def transcribe_audio(source, report=None, backend=None):
+    """Decode, resample and transcribe audio in overlapping chunks, reporting the transcript so far"""
+    backend = backend or get_stt_backend()
+    start = time.perf_counter()
+    chunk = int(STT_CHUNK_SECONDS * STT_SAMPLE_RATE)
+    overlap = min(int(STT_CHUNK_OVERLAP_SECONDS * STT_SAMPLE_RATE), chunk - 1)
+    transcript = ""
+    seconds = 0.0
+    resampler = None
+    pending = np.zeros(0, dtype=np.float32)
+    # Samples at the start of pending that the previous chunk already transcribed
+    heard = 0
+    
+    def transcribe(samples):
+        text = backend.transcribe(samples, STT_SAMPLE_RATE, transcript).strip()
+        return merge_transcripts(transcript, text) if text else transcript
+    
+    for samples, rate, total in audio_blocks(source, STT_CHUNK_SECONDS):
+        if resampler is None:
+            if total > STT_MAX_SECONDS:
+                raise AudioFormatError(f"Voice messages are limited to {STT_MAX_SECONDS} seconds")
+            resampler = StreamingResampler(rate, STT_SAMPLE_RATE)
+        seconds += samples.size / rate
+        pending = np.concatenate([pending, resampler.process(samples)])
+        while pending.size >= chunk:
+            transcript = transcribe(pending[:chunk])
+            pending = pending[chunk - overlap:]
+            heard = overlap
+        if report:
+            report(min(seconds / total, 1.0) if total else 1.0, transcript)
+    
+    if resampler is not None:
+        pending = np.concatenate([pending, resampler.flush()])
+        if pending.size > heard:
+            transcript = transcribe(pending)
+            if report:
+                report(1.0, transcript)
+    
+    return {'transcript': transcript, 'audio_seconds': seconds, 'elapsed': time.perf_counter() - start}
+
+# ================================
+# BACKGROUND JOBS
+# ================================
+
+def transcribe_voice_job(report, audio):
+    """Transcribe a recorded or uploaded voice message from its raw bytes"""
+    inject_latency('voice')
+    return transcribe_audio(io.BytesIO(audio), report)
+
+def finish_voice_transcription(result):
+    """Queue the transcript as the next user turn and keep its timing for the voice panel"""
+    st.session_state.last_transcription = result
+    if result['transcript']:
+        st.session_state.voice_transcript = result['transcript']